@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+动作序列检查点
+execute_action_sequence为每个成功的动作记录检查点（动作后的页面URL），
+动作可声明expect_url作为页面状态标记；任务失败后据此计算重试时可以从哪一步继续，
+已成功且不可重复执行的动作（默认点击）不会在重试中再次执行
+"""
+
+# 各类动作默认是否可重复执行，动作中的idempotent字段优先
+DEFAULT_IDEMPOTENT = {
+    "navigate": True,
+    "input": True,        # 输入前先清空，重复执行结果相同
+    "wait": True,
+    "wait_element": True,
+    "click": False        # 点击可能提交表单，重复执行有副作用
+}
+
+def is_idempotent(action):
+    """动作是否可以安全地重复执行"""
+    if "idempotent" in action:
+        return bool(action["idempotent"])
+    return DEFAULT_IDEMPOTENT.get(action.get("type"), False)
+
+def page_matches(marker, current_url):
+    """当前页面是否符合检查点标记（标记为URL或URL片段）"""
+    return bool(marker) and bool(current_url) and marker in current_url
+
+def rewind_index(actions, index):
+    """
+    页面状态无法确认时的回退位置：
+    index之前最近的一个navigate，且从它到index之间的动作都可以重复执行；否则从头开始
+    """
+    for i in range(index - 1, -1, -1):
+        if not is_idempotent(actions[i]):
+            return 0
+        if actions[i].get("type") == "navigate":
+            return i
+    return 0
+
+def resume_failure(actions, action_results):
+    """
+    重试应从哪个失败的动作继续：
+    序列因必需动作失败或异常而停止时为该动作；只有可选动作（required: False）失败时，
+    为最后一个已成功的不可重复动作之后的第一个失败动作，更早失败的可选动作不再重试，
+    否则其后已成功的点击等动作会被重复执行
+
+    Returns:
+        失败动作的结果，没有可以安全重试的失败动作时返回None
+    """
+    for result in action_results:
+        if not result["success"] and ("error" in result or actions[result["action_index"]].get("required", True)):
+            return result
+
+    last_unsafe = max((r["action_index"] for r in action_results
+                       if r["success"] and not is_idempotent(actions[r["action_index"]])), default=-1)
+    return next((r for r in action_results if not r["success"] and r["action_index"] > last_unsafe), None)
+
+def plan_resume(actions, action_results, start_index=0, start_marker=None):
+    """
+    根据失败执行的动作结果计算重试的继续位置
+
+    Args:
+        actions: 完整动作序列
+        action_results: 本次执行的动作结果（action_index为在完整序列中的位置）
+        start_index: 本次执行的起始位置
+        start_marker: 本次执行起始位置的页面标记
+
+    Returns:
+        {"resume_from": 继续位置, "resume_fallback": 页面状态不符时的回退位置,
+         "resume_marker": 继续前应满足的页面标记}；需要从头重试时返回None
+    """
+    failed = resume_failure(actions, action_results)
+    if failed is None:
+        return None
+
+    failed_index = failed["action_index"]
+    fallback = rewind_index(actions, failed_index)
+
+    # 不可重复执行的动作执行中出现异常，可能已经部分生效，回退到安全位置
+    resume_from = failed_index
+    if "error" in failed and not is_idempotent(actions[failed_index]):
+        resume_from = fallback
+
+    if resume_from == 0:
+        return None
+    if actions[resume_from].get("type") == "navigate":
+        return {"resume_from": resume_from, "resume_fallback": 0, "resume_marker": None}
+
+    # 继续位置前一个动作的页面标记：显式的expect_url优先，其次为记录的检查点URL
+    marker = None
+    if resume_from != fallback:
+        marker = actions[resume_from - 1].get("expect_url")
+        if not marker:
+            previous = next((r for r in action_results if r["action_index"] == resume_from - 1), None)
+            if previous is not None:
+                marker = previous.get("url")
+            elif resume_from == start_index:
+                marker = start_marker
+
+        if not marker:
+            # 无法确认页面状态，只能从回退位置（navigate）继续
+            resume_from = fallback
+            if resume_from == 0:
+                return None
+
+    if resume_from == fallback:
+        # 从navigate继续，导航本身会恢复页面状态
+        return {"resume_from": fallback, "resume_fallback": 0, "resume_marker": None}
+
+    return {"resume_from": resume_from, "resume_fallback": fallback, "resume_marker": marker}
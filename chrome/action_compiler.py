@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+动作批量编译
+将连续的输入、点击、等待元素动作合并为一次注入脚本执行，省去逐步查找、清空、输入、点击的往返开销。
+点击可能触发页面跳转，总是作为一批的最后一步；声明trusted的动作（需要真实键盘/鼠标事件）
+以及脚本无法填写的元素（非input/textarea）退回逐步执行
+"""
+
+from dom_waiter import WAIT_FOR_SELECTORS_JS
+
+# 可以合并执行的动作类型
+BATCHABLE_TYPES = ("input", "click", "wait_element")
+
+# 返回Promise：每个已执行步骤的结果 {success, selector(命中的选择器序号), ms}；
+# 必需步骤失败时停止，遇到需要逐步执行的步骤时在其之前停止（该步骤不在结果中）
+BATCH_JS = """function(steps, timeoutMs) {
+    var wait = """ + WAIT_FOR_SELECTORS_JS + """;
+    var results = [];
+    function fillable(element) {
+        var tag = element.tagName;
+        return (tag === 'TEXTAREA' || (tag === 'INPUT' && element.type !== 'file')) && !element.readOnly;
+    }
+    function fill(element, text, clear) {
+        element.focus();
+        var value = clear ? text : element.value + text;
+        // 使用原型上的setter，使React等框架能感知值的变化
+        var descriptor = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(element), 'value');
+        if (descriptor && descriptor.set) {
+            descriptor.set.call(element, value);
+        } else {
+            element.value = value;
+        }
+        element.dispatchEvent(new Event('input', {bubbles: true}));
+        element.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+    function run(i) {
+        if (i >= steps.length) {
+            return results;
+        }
+        var step = steps[i];
+        var started = Date.now();
+        return wait(step.selectors, timeoutMs).then(function(match) {
+            var result = {success: false, ms: Date.now() - started};
+            if (!match) {
+                results.push(result);
+                return step.required ? results : run(i + 1);
+            }
+            var element = match[1];
+            if (step.type === 'input') {
+                if (!fillable(element)) {
+                    return results;
+                }
+                fill(element, step.text, step.clear);
+            } else if (step.type === 'click') {
+                element.scrollIntoView({block: 'center'});
+                // 点击在结果返回后执行，避免页面跳转中断脚本
+                setTimeout(function() { element.click(); }, 0);
+            }
+            result.success = true;
+            result.selector = match[0];
+            results.push(result);
+            return run(i + 1);
+        });
+    }
+    return run(0);
+}"""
+
+SELENIUM_BATCH_SCRIPT = ("var done = arguments[arguments.length - 1];\n"
+                         "(" + BATCH_JS + ")(arguments[0], arguments[1])"
+                         ".then(done, function() { done(null); });")
+
+def is_batchable(action):
+    """动作是否可以在注入脚本中执行"""
+    return (action.get("type") in BATCHABLE_TYPES and bool(action.get("selectors")) and
+            not action.get("trusted", False))
+
+def batch_end(actions, start):
+    """
+    从start开始可以合并执行的动作范围
+
+    Returns:
+        批次结束位置（不含），少于两个动作时返回start + 1
+    """
+    end = start
+    while end < len(actions) and is_batchable(actions[end]):
+        end += 1
+        # 点击可能跳转页面，声明expect_url的动作需要在执行后校验页面，均作为批次的最后一步
+        if actions[end - 1]["type"] == "click" or actions[end - 1].get("expect_url"):
+            break
+    return end if end - start >= 2 else start + 1
+
+def compile_steps(actions, start, end, selector_order=None):
+    """
+    生成批量脚本的步骤参数
+
+    Args:
+        actions: 动作序列
+        start, end: 批次范围
+        selector_order: 返回某个动作实际使用的选择器顺序的函数，None表示使用原有顺序
+    """
+    steps = []
+    for action in actions[start:end]:
+        selectors = action["selectors"]
+        if isinstance(selectors, str):
+            selectors = [selectors]
+        steps.append({
+            "type": action["type"],
+            "selectors": selector_order(action, selectors) if selector_order else list(selectors),
+            "text": action.get("text", ""),
+            "clear": True,
+            "required": action.get("required", True)
+        })
+    return steps
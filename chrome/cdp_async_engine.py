@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步CDP执行引擎
+不经过Selenium/chromedriver，直接通过WebSocket使用Chrome DevTools Protocol，
+在一个事件循环中复用多个Chrome实例和大量标签页并发执行任务。
+动作序列格式与EnhancedWebAutomation.execute_action_sequence相同。
+"""
+
+import json
+import time
+import asyncio
+import itertools
+import urllib.request
+from pathlib import Path
+from dom_waiter import WAIT_FOR_SELECTORS_JS, SCRIPT_TIMEOUT_MARGIN, NAVIGATION_RETRY_DELAY
+from resource_blocking import ResourcePolicy, BlockingCounters
+from execution_lanes import is_any_instance
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+# 在页面中等待第一个匹配的选择器出现（规则与smart_find_element相同），可同时点击或聚焦，
+# 返回Promise：命中的选择器序号，超时为-1
+FIND_ELEMENT_JS = """
+(function(selectors, action, text, timeoutMs) {
+    return (""" + WAIT_FOR_SELECTORS_JS + """)(selectors, timeoutMs).then(function(match) {
+    if (!match) {
+        return -1;
+    }
+    var element = match[1];
+    if (action === 'click') {
+        element.scrollIntoView({block: 'center'});
+        // 点击在结果返回后执行，避免页面跳转销毁执行上下文后被当作失败重试而重复点击
+        setTimeout(function() { element.click(); }, 0);
+    } else if (action === 'focus') {
+        element.focus();
+        if (text === 'clear' && 'value' in element) {
+            element.value = '';
+            element.dispatchEvent(new Event('input', {bubbles: true}));
+        }
+    }
+    return match[0];
+    });
+})
+"""
+
+class CDPError(Exception):
+    """CDP命令返回错误"""
+
+async def get_browser_ws_url(debug_port):
+    """获取Chrome实例浏览器级的WebSocket调试地址"""
+    def fetch():
+        with urllib.request.urlopen(f"http://127.0.0.1:{debug_port}/json/version", timeout=5) as response:
+            return json.loads(response.read().decode("utf-8"))["webSocketDebuggerUrl"]
+    return await asyncio.get_running_loop().run_in_executor(None, fetch)
+
+class CDPConnection:
+    def __init__(self, ws_url):
+        """
+        初始化到一个Chrome实例的浏览器级CDP连接
+        所有标签页通过flatten会话复用这一条WebSocket
+
+        Args:
+            ws_url: webSocketDebuggerUrl
+        """
+        self.ws_url = ws_url
+        self.ws = None
+        self.reader_task = None
+        self.ids = itertools.count(1)
+        self.pending = {}        # 命令ID -> Future
+        self.listeners = {}      # (session_id, method) -> [callback]
+
+    async def connect(self):
+        """建立WebSocket连接并启动消息读取任务"""
+        if websockets is None:
+            raise ImportError("异步CDP引擎需要安装websockets: pip install websockets")
+        self.ws = await websockets.connect(self.ws_url, max_size=None)
+        self.reader_task = asyncio.create_task(self._read_loop())
+        return self
+
+    async def send(self, method, params=None, session_id=None, timeout=30):
+        """发送CDP命令并等待结果"""
+        message_id = next(self.ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[message_id] = future
+        try:
+            await self.ws.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(message_id, None)
+
+    def add_listener(self, method, callback, session_id=None):
+        """注册CDP事件回调"""
+        self.listeners.setdefault((session_id, method), []).append(callback)
+
+    def remove_listener(self, method, callback, session_id=None):
+        callbacks = self.listeners.get((session_id, method), [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def wait_for_event(self, method, session_id=None):
+        """返回在下一次收到指定事件时完成的Future（需在触发事件的命令之前调用）"""
+        future = asyncio.get_running_loop().create_future()
+
+        def on_event(params):
+            self.remove_listener(method, on_event, session_id)
+            if not future.done():
+                future.set_result(params)
+
+        self.add_listener(method, on_event, session_id)
+        return future
+
+    async def _read_loop(self):
+        try:
+            async for raw in self.ws:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self.pending.get(message["id"])
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CDPError(message["error"].get("message", str(message["error"]))))
+                    else:
+                        future.set_result(message.get("result", {}))
+                    continue
+
+                key = (message.get("sessionId"), message.get("method"))
+                for callback in list(self.listeners.get(key, [])):
+                    callback(message.get("params", {}))
+        except Exception as e:
+            error = e
+        else:
+            error = CDPError("CDP连接已关闭")
+
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def close(self):
+        if self.ws:
+            await self.ws.close()
+        if self.reader_task:
+            await asyncio.gather(self.reader_task, return_exceptions=True)
+
+class CDPTab:
+    def __init__(self, connection, target_id, session_id, chrome_num, config):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+        self.chrome_num = chrome_num
+        self.config = config
+        self.operation_log = []
+        # 当前页面URL（判断第三方请求使用）
+        self.page_url = None
+        self.request_listener = None
+
+    @classmethod
+    async def open(cls, connection, chrome_num, config):
+        """新建标签页并附加flatten会话"""
+        target = await connection.send("Target.createTarget", {"url": "about:blank"})
+        attached = await connection.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        tab = cls(connection, target["targetId"], attached["sessionId"], chrome_num, config)
+        await tab.send("Page.enable")
+        return tab
+
+    async def send(self, method, params=None, timeout=30):
+        return await self.connection.send(method, params, session_id=self.session_id, timeout=timeout)
+
+    def log_operation(self, operation, message, level="INFO"):
+        """记录操作日志"""
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.operation_log.append({
+            "timestamp": timestamp,
+            "chrome_num": self.chrome_num,
+            "operation": operation,
+            "message": message,
+            "level": level
+        })
+        if level != "INFO":
+            print(f"❌ [{timestamp}] Chrome_{self.chrome_num}: {message}")
+
+    async def evaluate(self, expression, timeout=30, await_promise=False):
+        """执行JavaScript并返回值（await_promise为True时等待返回的Promise完成）"""
+        reply = await self.send("Runtime.evaluate", {"expression": expression, "returnByValue": True,
+                                                     "awaitPromise": await_promise}, timeout)
+        if "exceptionDetails" in reply:
+            raise CDPError(reply["exceptionDetails"].get("text", "JavaScript执行异常"))
+        return reply.get("result", {}).get("value")
+
+    async def apply_resource_policy(self, policy, counters):
+        """
+        通过Fetch域拦截策略中的请求（需在导航前调用）
+
+        Args:
+            policy: ResourcePolicy
+            counters: 记录拦截统计的BlockingCounters
+        """
+        patterns = policy.fetch_patterns()
+        if not patterns:
+            return
+
+        def on_request_paused(params):
+            request_id = params["requestId"]
+            resource_type = params.get("resourceType", "Other")
+            url = params["request"]["url"]
+            # 主框架文档请求（含重定向）更新页面URL
+            if resource_type == "Document" and params.get("frameId") == self.target_id:
+                self.page_url = url
+            reason = policy.should_block(url, resource_type, self.page_url)
+            if reason:
+                counters.record_blocked(resource_type, reason)
+                asyncio.create_task(self._reply_paused("Fetch.failRequest",
+                                                       {"requestId": request_id, "errorReason": "BlockedByClient"}))
+            else:
+                counters.record_allowed()
+                asyncio.create_task(self._reply_paused("Fetch.continueRequest", {"requestId": request_id}))
+
+        self.request_listener = on_request_paused
+        self.connection.add_listener("Fetch.requestPaused", on_request_paused, self.session_id)
+        await self.send("Fetch.enable", {"patterns": patterns})
+        self.log_operation("resource_policy", f"已启用资源拦截: {policy.name}")
+
+    async def _reply_paused(self, method, params):
+        """放行或拦截暂停的请求（标签页关闭后请求已不存在，忽略错误）"""
+        try:
+            await self.send(method, params)
+        except Exception:
+            pass
+
+    async def navigate(self, url):
+        """带重试的页面导航，等待load事件"""
+        max_retries = self.config.get("retry_attempts", 3)
+        timeout = self.config.get("page_load_timeout", 30)
+        self.page_url = url
+
+        for attempt in range(max_retries):
+            load_event = self.connection.wait_for_event("Page.loadEventFired", self.session_id)
+            try:
+                reply = await self.send("Page.navigate", {"url": url}, timeout)
+                if reply.get("errorText"):
+                    raise CDPError(reply["errorText"])
+                await asyncio.wait_for(load_event, timeout)
+                self.log_operation("navigate", f"成功导航到: {url}")
+                return True
+            except Exception as e:
+                load_event.cancel()
+                self.log_operation("navigate", f"导航失败 (尝试 {attempt+1}/{max_retries}): {e}", "ERROR")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(self.config.get("retry_delay", 2))
+        return False
+
+    async def find(self, selectors, action="find", text=None, timeout=None):
+        """
+        查找元素（页内MutationObserver等待所有选择器，一次脚本调用），可同时执行点击或聚焦
+
+        Returns:
+            命中的选择器，未找到返回None
+        """
+        if isinstance(selectors, str):
+            selectors = [selectors]
+        timeout = timeout or self.config.get("element_wait_timeout", 15)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            remaining = max(deadline - time.monotonic(), 0)
+            expression = (f"{FIND_ELEMENT_JS}({json.dumps(selectors)}, {json.dumps(action)}, "
+                          f"{json.dumps(text)}, {int(remaining * 1000)})")
+            try:
+                index = await self.evaluate(expression, remaining + SCRIPT_TIMEOUT_MARGIN, await_promise=True)
+            except (CDPError, asyncio.TimeoutError):
+                # 页面跳转销毁了执行上下文，在新页面上重新等待
+                index = None
+            if index is not None and index >= 0:
+                self.log_operation("find_element", f"找到元素: {selectors[index]}")
+                return selectors[index]
+            if index == -1 or time.monotonic() >= deadline:
+                self.log_operation("find_element", f"未找到任何元素: {selectors}", "ERROR")
+                return None
+            await asyncio.sleep(NAVIGATION_RETRY_DELAY)
+
+    async def click(self, selectors):
+        return await self.find(selectors, action="click") is not None
+
+    async def input(self, selectors, text, clear_first=True):
+        """聚焦元素后通过Input.insertText输入文本"""
+        if await self.find(selectors, action="focus", text="clear" if clear_first else None) is None:
+            return False
+        await self.send("Input.insertText", {"text": text})
+        self.log_operation("input", f"成功输入文本: {text[:20]}...")
+        return True
+
+    async def execute_action_sequence(self, actions):
+        """执行动作序列，结果格式与EnhancedWebAutomation一致"""
+        results = []
+
+        for i, action in enumerate(actions):
+            action_type = action.get("type")
+            success = False
+
+            try:
+                if action_type == "navigate":
+                    success = await self.navigate(action["url"])
+                elif action_type == "click":
+                    success = await self.click(action["selectors"])
+                elif action_type == "input":
+                    success = await self.input(action["selectors"], action["text"])
+                elif action_type == "wait":
+                    await asyncio.sleep(action.get("seconds", 1))
+                    success = True
+                elif action_type == "wait_element":
+                    success = await self.find(action["selectors"]) is not None
+
+                results.append({
+                    "action_index": i,
+                    "action_type": action_type,
+                    "success": success
+                })
+
+                if not success and action.get("required", True):
+                    self.log_operation("sequence", f"必需动作失败，停止执行: {action_type}", "ERROR")
+                    break
+
+            except Exception as e:
+                self.log_operation("sequence", f"动作执行异常: {e}", "ERROR")
+                results.append({
+                    "action_index": i,
+                    "action_type": action_type,
+                    "success": False,
+                    "error": str(e)
+                })
+                break
+
+        return results
+
+    async def close(self):
+        """关闭标签页"""
+        if self.request_listener:
+            self.connection.remove_listener("Fetch.requestPaused", self.request_listener, self.session_id)
+        try:
+            await self.connection.send("Target.closeTarget", {"targetId": self.target_id}, timeout=5)
+        except Exception:
+            pass
+
+class AsyncCDPEngine:
+    def __init__(self, max_concurrency=100, max_tabs_per_instance=10, config_file=None):
+        """
+        初始化异步CDP引擎
+
+        Args:
+            max_concurrency: 全局最大并发任务数
+            max_tabs_per_instance: 每个Chrome实例同时打开的最大标签页数
+            config_file: 配置文件路径（与EnhancedWebAutomation相同的配置项）
+        """
+        self.max_concurrency = max_concurrency
+        self.max_tabs_per_instance = max_tabs_per_instance
+        self.config = self.load_config(config_file)
+        self.connections = {}
+        self.instance_limits = {}
+        self.global_limit = None
+        self.connect_lock = None
+        # 各实例正在执行的任务数，任意实例任务分配给最空闲的实例
+        self.open_tabs = {}
+        # 所有任务的资源拦截统计
+        self.blocking_counters = BlockingCounters()
+
+    def load_config(self, config_file):
+        """加载配置文件"""
+        if isinstance(config_file, dict):
+            return dict(config_file)
+
+        if config_file and Path(config_file).exists():
+            with open(config_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        # 默认配置
+        return {
+            "retry_attempts": 3,
+            "retry_delay": 2,
+            "page_load_timeout": 30,
+            "element_wait_timeout": 15,
+            "task_timeout": 300,
+            "chrome_instances": [],
+            "resource_policy": None,
+            "resource_policies": {}
+        }
+
+    async def get_connection(self, chrome_num):
+        """获取（或建立）Chrome实例的CDP连接"""
+        async with self.connect_lock:
+            connection = self.connections.get(chrome_num)
+            if connection is None:
+                ws_url = await get_browser_ws_url(10000 + chrome_num)
+                connection = await CDPConnection(ws_url).connect()
+                self.connections[chrome_num] = connection
+                self.instance_limits[chrome_num] = asyncio.Semaphore(self.max_tabs_per_instance)
+                print(f"🔗 已建立CDP连接: Chrome_{chrome_num}")
+            return connection
+
+    def resolve_instance(self, chrome_num):
+        """
+        确定任务的执行实例：任意实例任务选择正在执行任务最少的实例
+
+        Returns:
+            Chrome实例编号，没有可选实例时返回None
+        """
+        if not is_any_instance(chrome_num):
+            return chrome_num
+        instances = self.config.get("chrome_instances") or sorted(self.connections)
+        if not instances:
+            return None
+        return min(instances, key=lambda num: self.open_tabs.get(num, 0))
+
+    async def run_task(self, task):
+        """在新标签页中执行单个任务，返回与TaskQueueManager一致的结果字典"""
+        task_id = task["task_id"]
+        started_at = time.time()
+        counters = BlockingCounters()
+
+        async with self.global_limit:
+            chrome_num = self.resolve_instance(task["chrome_num"])
+            if chrome_num is None:
+                print(f"❌ 任务失败: {task_id} - 未配置chrome_instances，无法为任意实例任务分配Chrome实例")
+                return {
+                    "task_id": task_id,
+                    "chrome_num": task["chrome_num"],
+                    "status": "failed",
+                    "error": "未配置chrome_instances，无法为任意实例任务分配Chrome实例",
+                    "error_type": "no_instances",
+                    "completed_at": time.time(),
+                    "duration": time.time() - started_at
+                }
+            self.open_tabs[chrome_num] = self.open_tabs.get(chrome_num, 0) + 1
+
+            try:
+                policy = ResourcePolicy.resolve(task.get("resource_policy", self.config.get("resource_policy")),
+                                                self.config.get("resource_policies"))
+                connection = await self.get_connection(chrome_num)
+                async with self.instance_limits[chrome_num]:
+                    tab = await CDPTab.open(connection, chrome_num, self.config)
+                    try:
+                        if policy:
+                            await tab.apply_resource_policy(policy, counters)
+                        timeout = task.get("task_timeout") or self.config.get("task_timeout", 300)
+                        results = await asyncio.wait_for(tab.execute_action_sequence(task["actions"]), timeout)
+                    finally:
+                        await tab.close()
+
+                total_actions = len(results)
+                successful_actions = sum(1 for r in results if r["success"])
+                success_rate = successful_actions / total_actions if total_actions > 0 else 0
+                print(f"✅ 任务完成: {task_id} (成功率: {success_rate:.1%})")
+                return {
+                    "task_id": task_id,
+                    "chrome_num": chrome_num,
+                    "status": "completed" if success_rate > 0.8 else "partial_success",
+                    "success_rate": success_rate,
+                    "total_actions": total_actions,
+                    "successful_actions": successful_actions,
+                    "results": results,
+                    "resource_policy": policy.name if policy else None,
+                    "resource_blocking": counters.summary() if policy else None,
+                    "completed_at": time.time(),
+                    "duration": time.time() - started_at
+                }
+            except Exception as e:
+                status = "timeout" if isinstance(e, asyncio.TimeoutError) else "failed"
+                print(f"❌ 任务失败: {task_id} - {status} {e}")
+                return {
+                    "task_id": task_id,
+                    "chrome_num": chrome_num,
+                    "status": status,
+                    "error": str(e),
+                    "completed_at": time.time(),
+                    "duration": time.time() - started_at
+                }
+            finally:
+                self.open_tabs[chrome_num] -= 1
+                self.blocking_counters.merge(counters)
+
+    async def run_tasks(self, tasks):
+        """并发执行所有任务"""
+        self.global_limit = asyncio.Semaphore(self.max_concurrency)
+        self.connect_lock = asyncio.Lock()
+        try:
+            return await asyncio.gather(*(self.run_task(task) for task in tasks))
+        finally:
+            await self.close()
+
+    async def close(self):
+        """关闭所有CDP连接"""
+        for connection in self.connections.values():
+            await connection.close()
+        self.connections.clear()
+
+    def run(self, tasks):
+        """同步入口：执行任务列表并返回结果列表"""
+        return asyncio.run(self.run_tasks(list(tasks)))
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='异步CDP执行引擎')
+    parser.add_argument('tasks_file', help='任务配置文件（与sample_tasks.json格式相同）')
+    parser.add_argument('--concurrency', type=int, default=100, help='全局最大并发任务数')
+    parser.add_argument('--tabs-per-instance', type=int, default=10, help='每个实例最大标签页数')
+    parser.add_argument('--output', help='结果输出文件')
+
+    args = parser.parse_args()
+
+    with open(args.tasks_file, 'r', encoding='utf-8') as f:
+        tasks = json.load(f)
+
+    start_time = time.time()
+    engine = AsyncCDPEngine(args.concurrency, args.tabs_per_instance)
+    results = engine.run(tasks)
+
+    completed = sum(1 for r in results if r["status"] == "completed")
+    print(f"\n📊 执行完成: {completed}/{len(results)} 成功，耗时 {time.time() - start_time:.1f}秒")
+    blocking = engine.blocking_counters.summary()
+    if blocking["blocked_requests"]:
+        print(f"🚫 资源拦截: {blocking['blocked_requests']} 个请求，"
+              f"约节省 {blocking['estimated_blocked_bytes'] / 1024 / 1024:.1f}MB")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📝 执行结果已保存: {args.output}")
+
+if __name__ == "__main__":
+    main()
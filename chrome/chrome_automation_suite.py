@@ -258,6 +258,7 @@ def main():
   python chrome_automation_suite.py --close 11 12 13           # 关闭指定实例
   python chrome_automation_suite.py --batch sample_tasks.json  # 运行批量任务
   python chrome_automation_suite.py --interactive              # 交互模式
+  python chrome_automation_suite.py --daemon 8765              # 常驻服务，通过本机HTTP接收任务
         """
     )
     
@@ -266,6 +267,8 @@ def main():
     parser.add_argument('--close', nargs='+', type=int, metavar='NUM', help='关闭指定Chrome实例')
     parser.add_argument('--batch', metavar='CONFIG_FILE', help='运行批量任务')
     parser.add_argument('--interactive', action='store_true', help='进入交互模式')
+    parser.add_argument('--daemon', nargs='?', type=int, const=8765, metavar='PORT',
+                        help='以守护进程运行，通过本机HTTP接口接收任务 (默认端口8765)')
     
     args = parser.parse_args()
     
@@ -282,6 +285,9 @@ def main():
         suite.run_batch_tasks(args.batch)
     elif args.interactive:
         suite.interactive_mode()
+    elif args.daemon:
+        from task_daemon import TaskDaemon
+        TaskDaemon(manager=suite.task_manager, port=args.daemon).serve_forever()
     else:
         # 默认显示状态并进入交互模式
         suite.show_status()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应并发控制
+按主机压力（CPU、内存、Chrome进程内存）和任务延迟、错误率调整有效并发数（AIMD：
+无压力且并发已用满时加法增加，出现压力时乘法减少）；内存即将耗尽时暂停派发新任务
+"""
+
+import threading
+from collections import deque
+
+class AdaptiveConcurrencyController:
+    def __init__(self, max_limit, min_limit=1, initial_limit=None, metrics_source=None,
+                 adjust_interval=10, cpu_high=85, memory_high=85, memory_critical=95,
+                 min_available_gb=0.5, max_chrome_memory_mb=None, error_rate_high=0.3,
+                 latency_tolerance=2.0, additive_step=1, decrease_factor=0.7, window=50):
+        """
+        初始化并发控制器
+
+        Args:
+            max_limit: 并发上限（TaskQueueManager的max_workers）
+            min_limit: 并发下限
+            initial_limit: 初始并发数，默认为上限的一半
+            metrics_source: 返回系统指标的函数，格式同OperationMonitor.collect_system_metrics，
+                            默认使用全局OperationMonitor
+            adjust_interval: 调整间隔（秒）
+            cpu_high, memory_high: CPU/内存使用率超过该百分比时视为有压力
+            memory_critical: 内存使用率超过该百分比时暂停派发新任务
+            min_available_gb: 可用内存低于该值（GB）时暂停派发新任务
+            max_chrome_memory_mb: Chrome进程总内存超过该值时视为有压力，None表示不检查
+            error_rate_high: 最近任务失败率超过该值时视为有压力
+            latency_tolerance: 最近任务耗时中位数超过基线的倍数时视为有压力
+            additive_step: 每次增加的并发数
+            decrease_factor: 有压力时并发数乘以该系数
+            window: 统计延迟和错误率的最近任务数
+        """
+        self.max_limit = max_limit
+        self.min_limit = max(1, min(min_limit, max_limit))
+        self.limit = max(self.min_limit, min(initial_limit or (max_limit + 1) // 2, max_limit))
+        self.metrics_source = metrics_source
+        self.adjust_interval = adjust_interval
+
+        self.cpu_high = cpu_high
+        self.memory_high = memory_high
+        self.memory_critical = memory_critical
+        self.min_available_gb = min_available_gb
+        self.max_chrome_memory_mb = max_chrome_memory_mb
+        self.error_rate_high = error_rate_high
+        self.latency_tolerance = latency_tolerance
+        self.additive_step = additive_step
+        self.decrease_factor = decrease_factor
+
+        # 最近任务 (耗时, 是否成功)
+        self.recent = deque(maxlen=window)
+        # 观察到的最低耗时中位数，作为延迟基线
+        self.latency_baseline = None
+        self.peak_in_flight = 0
+        self.admission_open = True
+        self.last_reason = None
+        self.last_metrics = None
+
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def record_result(self, duration, success):
+        """记录一个任务的耗时和结果"""
+        with self.lock:
+            self.recent.append((duration or 0.0, success))
+
+    def note_in_flight(self, in_flight):
+        """记录调整周期内的最大并发数（用于判断并发是否已用满）"""
+        with self.lock:
+            self.peak_in_flight = max(self.peak_in_flight, in_flight)
+
+    def _task_signals(self):
+        """最近任务的 (失败率, 耗时中位数)"""
+        if not self.recent:
+            return 0.0, None
+        durations = sorted(duration for duration, _ in self.recent)
+        error_rate = sum(1 for _, success in self.recent if not success) / len(self.recent)
+        return error_rate, durations[len(durations) // 2]
+
+    def adjust(self, metrics=None):
+        """
+        执行一次调整
+
+        Args:
+            metrics: 系统指标字典，None表示只按任务延迟和错误率调整
+
+        Returns:
+            调整后的并发数
+        """
+        system = (metrics or {}).get("system", {})
+        chrome = (metrics or {}).get("chrome_processes", {})
+
+        with self.lock:
+            error_rate, median_latency = self._task_signals()
+            if median_latency and len(self.recent) >= self.recent.maxlen // 2:
+                if self.latency_baseline is None or median_latency < self.latency_baseline:
+                    self.latency_baseline = median_latency
+
+            # 内存即将耗尽：暂停派发
+            memory_percent = system.get("memory_percent", 0)
+            available_gb = system.get("memory_available_gb")
+            critical = (memory_percent >= self.memory_critical or
+                        (available_gb is not None and available_gb < self.min_available_gb))
+            if critical and self.admission_open:
+                print(f"🛑 内存即将耗尽，暂停派发新任务 (内存 {memory_percent:.0f}%)")
+            elif not critical and not self.admission_open:
+                print("▶️ 内存压力解除，恢复派发任务")
+            self.admission_open = not critical
+
+            reasons = []
+            if critical or memory_percent >= self.memory_high:
+                reasons.append(f"内存 {memory_percent:.0f}%")
+            if system.get("cpu_percent", 0) >= self.cpu_high:
+                reasons.append(f"CPU {system['cpu_percent']:.0f}%")
+            if self.max_chrome_memory_mb and chrome.get("total_memory_mb", 0) >= self.max_chrome_memory_mb:
+                reasons.append(f"Chrome内存 {chrome['total_memory_mb']:.0f}MB")
+            if self.recent and error_rate >= self.error_rate_high:
+                reasons.append(f"失败率 {error_rate:.0%}")
+            if (median_latency and self.latency_baseline and
+                    median_latency > self.latency_baseline * self.latency_tolerance):
+                reasons.append(f"耗时 {median_latency:.1f}秒 (基线 {self.latency_baseline:.1f}秒)")
+
+            old_limit = self.limit
+            if reasons:
+                self.limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+                # 压力下的结果不再参与下一次判断
+                self.recent.clear()
+            elif self.peak_in_flight >= self.limit:
+                self.limit = min(self.max_limit, self.limit + self.additive_step)
+
+            self.peak_in_flight = 0
+            self.last_reason = ", ".join(reasons) or None
+            self.last_metrics = system or None
+
+        if self.limit != old_limit:
+            detail = f" ({self.last_reason})" if self.last_reason else ""
+            print(f"🎚️ 并发数调整: {old_limit} -> {self.limit}{detail}")
+        return self.limit
+
+    def start(self):
+        """启动后台调整线程"""
+        if self.thread and self.thread.is_alive():
+            return
+        if self.metrics_source is None:
+            from operation_monitor import get_monitor
+            self.metrics_source = get_monitor().collect_system_metrics
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.wait(self.adjust_interval):
+            try:
+                self.adjust(self.metrics_source())
+            except Exception as e:
+                print(f"❌ 并发调整失败: {e}")
+
+    def stop(self):
+        """停止后台调整线程"""
+        self.stop_event.set()
+
+    def get_stats(self):
+        """控制器状态"""
+        with self.lock:
+            error_rate, median_latency = self._task_signals()
+            return {
+                "limit": self.limit,
+                "max_limit": self.max_limit,
+                "admission_open": self.admission_open,
+                "last_reason": self.last_reason,
+                "error_rate": error_rate,
+                "median_latency": median_latency,
+                "latency_baseline": self.latency_baseline,
+                "system": self.last_metrics
+            }
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页内事件驱动等待
+在页面中注入MutationObserver（元素出现）或readystatechange监听（页面加载），
+条件满足时立即结束一个异步脚本调用，代替通过WebDriver协议每500ms轮询一次；
+页面跳转会中断脚本，此时在新页面上重新等待，直到截止时间
+"""
+
+import time
+from selector_resolver import RESOLVE_SELECTORS_JS
+
+try:
+    from selenium.common.exceptions import JavascriptException, StaleElementReferenceException
+    # 页面跳转中断脚本时的错误，在新页面上重新等待
+    NAVIGATION_ERRORS = (JavascriptException, StaleElementReferenceException)
+except ImportError:
+    # 只使用页内脚本（如CDP异步引擎）时不需要selenium
+    NAVIGATION_ERRORS = ()
+
+# 返回Promise：任一选择器命中时resolve为 [序号, 元素]，超时resolve为null
+WAIT_FOR_SELECTORS_JS = """function(selectors, timeoutMs) {
+    var resolve = """ + RESOLVE_SELECTORS_JS + """;
+    return new Promise(function(done) {
+        var match = resolve(selectors);
+        if (match || timeoutMs <= 0) {
+            done(match);
+            return;
+        }
+        var timer = null;
+        var observer = new MutationObserver(function() {
+            var match = resolve(selectors);
+            if (match) {
+                finish(match);
+            }
+        });
+        function finish(result) {
+            observer.disconnect();
+            clearTimeout(timer);
+            done(result);
+        }
+        observer.observe(document, {childList: true, subtree: true, attributes: true});
+        timer = setTimeout(function() {
+            finish(resolve(selectors));
+        }, timeoutMs);
+    });
+}"""
+
+# 返回Promise：页面达到指定readyState时resolve为true，超时resolve为false
+WAIT_FOR_READY_STATE_JS = """function(state, timeoutMs) {
+    function reached() {
+        return state === 'interactive' ? document.readyState !== 'loading' : document.readyState === 'complete';
+    }
+    return new Promise(function(done) {
+        if (reached()) {
+            done(true);
+            return;
+        }
+        var timer = setTimeout(function() {
+            done(reached());
+        }, timeoutMs);
+        document.addEventListener('readystatechange', function listener() {
+            if (reached()) {
+                clearTimeout(timer);
+                document.removeEventListener('readystatechange', listener);
+                done(true);
+            }
+        });
+    });
+}"""
+
+def _async_script(wait_js):
+    """包装为execute_async_script脚本，最后一个参数为超时毫秒数"""
+    return ("var done = arguments[arguments.length - 1];\n"
+            "(" + wait_js + ").apply(null, Array.prototype.slice.call(arguments, 0, -1))"
+            ".then(done, function() { done(null); });")
+
+SELENIUM_WAIT_FOR_SELECTORS = _async_script(WAIT_FOR_SELECTORS_JS)
+SELENIUM_WAIT_FOR_READY_STATE = _async_script(WAIT_FOR_READY_STATE_JS)
+
+# 脚本超时比页内等待多留的余量（秒），保证页内超时先触发
+SCRIPT_TIMEOUT_MARGIN = 5
+# 页面跳转中断脚本后重新注入前的间隔（秒）
+NAVIGATION_RETRY_DELAY = 0.05
+
+def _wait_in_page(driver, script, timeout, *args):
+    """
+    执行页内等待脚本，返回脚本结果；超时返回None
+    只在页面跳转中断脚本时重新等待，会话失效（如任务被看门狗中断）等其他错误直接抛出
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = max(deadline - time.monotonic(), 0)
+        try:
+            driver.set_script_timeout(remaining + SCRIPT_TIMEOUT_MARGIN)
+            return driver.execute_async_script(script, *args, int(remaining * 1000))
+        except NAVIGATION_ERRORS:
+            # 页面跳转时旧文档的脚本被中断，在新页面上重新等待
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(NAVIGATION_RETRY_DELAY)
+
+def wait_for_selectors(driver, selectors, timeout=15):
+    """
+    等待任一选择器命中
+
+    Args:
+        driver: WebDriver
+        selectors: 选择器列表（按优先级排列，规则同resolve_selectors）
+        timeout: 整个列表的等待时间（秒）
+
+    Returns:
+        (元素, 命中的选择器)，超时返回 (None, None)
+    """
+    if isinstance(selectors, str):
+        selectors = [selectors]
+    match = _wait_in_page(driver, SELENIUM_WAIT_FOR_SELECTORS, timeout, list(selectors))
+    if not match:
+        return None, None
+    index, element = match
+    return element, selectors[index]
+
+def wait_for_ready_state(driver, timeout=30, state="complete"):
+    """
+    等待页面加载到指定状态
+
+    Args:
+        state: complete（全部资源加载完成）或interactive（DOM解析完成）
+
+    Returns:
+        是否在超时前达到
+    """
+    return bool(_wait_in_page(driver, SELENIUM_WAIT_FOR_READY_STATE, timeout, state))
+
+def by_to_selector(by, value):
+    """
+    将Selenium定位方式转换为resolve_selectors的选择器，无法转换时返回None
+
+    Args:
+        by: By常量（"id"、"xpath"、"css selector"等）
+        value: 定位值
+    """
+    if by == "css selector" or by == "tag name":
+        return value
+    if by == "xpath":
+        if value.startswith("//") or value.startswith("(/"):
+            return value
+        # 绝对路径加括号后仍为等价的XPath，且能被识别为XPath
+        return f"({value})" if value.startswith("/") else None
+    if '"' in value:
+        return None
+    if by == "id":
+        return f'//*[@id="{value}"]'
+    if by == "name":
+        return f'//*[@name="{value}"]'
+    if by == "class name":
+        return f".{value}" if value.replace("-", "").replace("_", "").isalnum() else None
+    if by == "link text":
+        return f'//a[normalize-space(.)="{value}"]'
+    if by == "partial link text":
+        return f'//a[contains(., "{value}")]'
+    return None
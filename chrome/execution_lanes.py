@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chrome实例执行通道
+每个Chrome实例一个执行通道，同一实例上的任务串行执行；
+不限定实例的任务在空闲通道间均衡分配，空闲通道可从繁忙通道窃取任务
+"""
+
+import threading
+from task_scheduler import PriorityTaskScheduler
+
+# 任务chrome_num取以下值时表示可在任意实例上执行
+ANY_INSTANCE = "any"
+
+def is_any_instance(chrome_num):
+    """判断任务是否不限定Chrome实例"""
+    return chrome_num is None or chrome_num == ANY_INSTANCE
+
+class ExecutionLane:
+    def __init__(self, chrome_num, scheduler_factory):
+        """
+        初始化执行通道
+
+        Args:
+            chrome_num: Chrome实例编号
+            scheduler_factory: 创建优先级队列的工厂函数
+        """
+        self.chrome_num = chrome_num
+        # 指定本实例的任务，只能在本通道执行
+        self.pinned = scheduler_factory()
+        # 分配到本通道的任意实例任务，可被其他通道窃取
+        self.shared = scheduler_factory()
+        self.busy = False
+        self.current_task_id = None
+        self.executed_count = 0
+        self.stolen_count = 0
+
+    def pending(self):
+        """通道内待执行任务数"""
+        return len(self.pinned) + len(self.shared)
+
+    def load(self):
+        """通道负载（待执行 + 执行中）"""
+        return self.pending() + (1 if self.busy else 0)
+
+    def pop_next(self):
+        """取出通道内优先级最高的任务"""
+        pinned_head = self.pinned.peek()
+        shared_head = self.shared.peek()
+
+        if pinned_head is None and shared_head is None:
+            return None
+        if shared_head is None or (pinned_head is not None and pinned_head[0] <= shared_head[0]):
+            return self.pinned.pop()
+        return self.shared.pop()
+
+class LaneScheduler:
+    def __init__(self, scheduler_factory=PriorityTaskScheduler, chrome_instances=None, health=None):
+        """
+        初始化通道调度器
+
+        Args:
+            scheduler_factory: 创建通道内优先级队列的工厂函数
+            chrome_instances: 预先创建通道的Chrome实例编号列表
+            health: 实例健康监控（InstanceHealthMonitor），熔断打开的实例不再获得任务
+        """
+        self.scheduler_factory = scheduler_factory
+        self.health = health
+        self.lanes = {}
+        # 尚无可用通道时暂存的任意实例任务
+        self.unassigned = scheduler_factory()
+        self.next_lane_index = 0
+        self.lock = threading.Lock()
+
+        for chrome_num in chrome_instances or []:
+            self.add_lane(chrome_num)
+
+    def add_lane(self, chrome_num):
+        """添加Chrome实例执行通道"""
+        with self.lock:
+            return self._get_lane(chrome_num)
+
+    def _get_lane(self, chrome_num):
+        lane = self.lanes.get(chrome_num)
+        if lane is None:
+            lane = ExecutionLane(chrome_num, self.scheduler_factory)
+            self.lanes[chrome_num] = lane
+        return lane
+
+    def push(self, task):
+        """任务入队：指定实例的任务进入对应通道，任意实例任务分配给负载最低的通道"""
+        with self.lock:
+            if not is_any_instance(task["chrome_num"]):
+                self._get_lane(task["chrome_num"]).pinned.push(task)
+            else:
+                lanes = [lane for lane in self.lanes.values() if self._available(lane)]
+                if lanes:
+                    lane = min(lanes, key=lambda l: (l.load(), -self._health_score(l)))
+                    lane.shared.push(task)
+                else:
+                    self.unassigned.push(task)
+
+    def _available(self, lane):
+        """通道对应的实例是否可以接收任务"""
+        return self.health is None or self.health.can_dispatch(lane.chrome_num)
+
+    def _health_score(self, lane):
+        return 1.0 if self.health is None else self.health.health_score(lane.chrome_num)
+
+    def pop(self):
+        """
+        为某个空闲通道取出下一个任务并将通道标记为繁忙
+        在所有空闲通道可执行的任务（本通道任务、待分配任务、可从其他通道窃取的任务）中选择优先级最高的，
+        优先级相同时空闲通道按轮询顺序获得任务
+
+        Returns:
+            任务字典（assigned_chrome为执行实例），没有可执行任务时返回None
+        """
+        with self.lock:
+            lanes = list(self.lanes.values())
+            if not lanes:
+                return None
+
+            # 轮询起点，使空闲通道轮流获得任务
+            start = self.next_lane_index % len(lanes)
+            self.next_lane_index += 1
+            lanes = lanes[start:] + lanes[:start]
+            idle = [lane for lane in lanes if not lane.busy and self._available(lane)]
+            if not idle:
+                return None
+
+            # 候选队列 (队列, 轮询顺序, 来源: 0本通道 1待分配 2窃取, 执行通道)
+            candidates = []
+            for order, lane in enumerate(idle):
+                candidates.append((lane.pinned, order, 0, lane))
+                candidates.append((lane.shared, order, 0, lane))
+            candidates.append((self.unassigned, 0, 1, idle[0]))
+            idle_lanes = set(id(lane) for lane in idle)
+            for lane in lanes:
+                if id(lane) not in idle_lanes:
+                    # 繁忙或不可用通道中的可迁移任务
+                    candidates.append((lane.shared, 0, 2, idle[0]))
+
+            best = None
+            for scheduler, order, source, lane in candidates:
+                head = scheduler.peek()
+                if head is None:
+                    continue
+                rank = (head[0], order, source)
+                if best is None or rank < best[0]:
+                    best = (rank, scheduler, lane)
+            if best is None:
+                return None
+
+            rank, scheduler, lane = best
+            task = scheduler.pop()
+            if rank[2] == 2:
+                lane.stolen_count += 1
+            lane.busy = True
+            lane.current_task_id = task["task_id"]
+            lane.executed_count += 1
+            task["assigned_chrome"] = lane.chrome_num
+            return task
+
+    def release(self, task, executed=True):
+        """
+        任务结束后释放其执行通道
+
+        Args:
+            task: pop返回的任务
+            executed: 任务未执行（如被限流延后）时为False，不计入通道执行次数
+        """
+        with self.lock:
+            lane = self.lanes.get(task.get("assigned_chrome"))
+            if lane is not None:
+                lane.busy = False
+                lane.current_task_id = None
+                if not executed:
+                    lane.executed_count -= 1
+
+    def evict_lane(self, chrome_num):
+        """
+        清空不可用实例的通道：可迁移任务移回待分配队列，返回只能在该实例执行的任务
+        """
+        with self.lock:
+            lane = self.lanes.get(chrome_num)
+            if lane is None:
+                return []
+            task = lane.shared.pop()
+            while task is not None:
+                self.unassigned.push(task)
+                task = lane.shared.pop()
+
+        tasks = []
+        task = lane.pinned.pop()
+        while task is not None:
+            tasks.append(task)
+            task = lane.pinned.pop()
+        return tasks
+
+    def take_unroutable(self):
+        """
+        没有任何执行通道时取出待分配的任意实例任务（这些任务永远无法派发）
+
+        Returns:
+            任务列表，已有通道时返回空列表
+        """
+        with self.lock:
+            if self.lanes:
+                return []
+            tasks = []
+            task = self.unassigned.pop()
+            while task is not None:
+                tasks.append(task)
+                task = self.unassigned.pop()
+            return tasks
+
+    def drain(self):
+        """取出所有待调度的任务（不占用通道）"""
+        with self.lock:
+            schedulers = [self.unassigned]
+            for lane in self.lanes.values():
+                schedulers.extend([lane.pinned, lane.shared])
+
+        tasks = []
+        for scheduler in schedulers:
+            task = scheduler.pop()
+            while task is not None:
+                tasks.append(task)
+                task = scheduler.pop()
+        return tasks
+
+    def qsize(self):
+        """待调度任务数"""
+        with self.lock:
+            return len(self.unassigned) + sum(lane.pending() for lane in self.lanes.values())
+
+    def empty(self):
+        """是否没有待调度任务"""
+        return self.qsize() == 0
+
+    def __len__(self):
+        return self.qsize()
+
+    def category_sizes(self):
+        """各类别的待调度任务数"""
+        with self.lock:
+            schedulers = [self.unassigned]
+            for lane in self.lanes.values():
+                schedulers.extend([lane.pinned, lane.shared])
+
+        sizes = {}
+        for scheduler in schedulers:
+            for category, count in scheduler.category_sizes().items():
+                sizes[category] = sizes.get(category, 0) + count
+        return sizes
+
+    def lane_status(self):
+        """各通道状态"""
+        with self.lock:
+            return {
+                chrome_num: {
+                    "busy": lane.busy,
+                    "current_task": lane.current_task_id,
+                    "pending": lane.pending(),
+                    "executed": lane.executed_count,
+                    "stolen": lane.stolen_count
+                }
+                for chrome_num, lane in self.lanes.items()
+            }
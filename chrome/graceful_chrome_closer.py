@@ -5,15 +5,18 @@
 通过Selenium优雅关闭，避免"要恢复页面吗？"对话框
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 import time
 import psutil
 from close_specific_chrome import SpecificChromeCloser
+from webdriver_pool import get_session_pool
+
+# 关闭前借用会话的最长等待时间（秒），会话被任务占用时不长时间阻塞，改为强制关闭
+CHECKOUT_TIMEOUT = 3
 
 class GracefulChromeCloser:
     def __init__(self):
         self.fallback_closer = SpecificChromeCloser()
+        self.session_pool = get_session_pool()
     
     def graceful_close_chrome(self, chrome_numbers):
         """优雅关闭Chrome实例"""
@@ -49,11 +52,9 @@ class GracefulChromeCloser:
         port = 10000 + chrome_num
         
         try:
-            # 连接到Chrome实例
-            chrome_options = Options()
-            chrome_options.add_experimental_option('debuggerAddress', f'127.0.0.1:{port}')
-            
-            driver = webdriver.Chrome(options=chrome_options)
+            # 连接到Chrome实例（浏览器即将关闭，先丢弃该端口的空闲会话）
+            self.session_pool.invalidate(port)
+            driver = self.session_pool.checkout(port, timeout=CHECKOUT_TIMEOUT)
             print(f"  🔗 已连接到Chrome_{chrome_num}")
             
             # 获取所有标签页
@@ -82,12 +83,14 @@ class GracefulChromeCloser:
                     print(f"  🧹 已清除会话数据")
                     
                     # 优雅退出
-                    driver.quit()
+                    self.session_pool.discard(driver)
                     print(f"  🚪 已发送退出命令")
                     
                 except Exception as e:
                     print(f"  ⚠️ 退出时出错: {e}")
-                    driver.quit()
+                    self.session_pool.discard(driver)
+            else:
+                self.session_pool.discard(driver)
             
             # 等待进程完全关闭
             time.sleep(2)
@@ -127,10 +130,8 @@ class GracefulChromeCloser:
             
             try:
                 # 连接并清理会话
-                chrome_options = Options()
-                chrome_options.add_experimental_option('debuggerAddress', f'127.0.0.1:{port}')
-                
-                driver = webdriver.Chrome(options=chrome_options)
+                self.session_pool.invalidate(port)
+                driver = self.session_pool.checkout(port, timeout=CHECKOUT_TIMEOUT)
                 
                 # 在所有标签页中清理会话
                 handles = driver.window_handles
@@ -160,7 +161,7 @@ class GracefulChromeCloser:
                         pass
                 
                 print(f"  🧹 Chrome_{chrome_num}会话数据已清理")
-                driver.quit()
+                self.session_pool.discard(driver)
                 
             except Exception as e:
                 print(f"  ⚠️ Chrome_{chrome_num}会话清理失败: {e}")
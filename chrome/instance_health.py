@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chrome实例健康状态与熔断
+每个实例一个熔断器（关闭、打开、半开）：连接失败和超时连续出现、或最近任务失败率过高时打开，
+打开期间调度器绕过该实例；冷却后放行一个试探任务，成功则恢复。
+后台并发探测所有调试端口（/json/version），探测失败直接打开熔断器
+"""
+
+import time
+import json
+import threading
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 视为实例故障（计入连续失败）的错误类型
+HARD_FAILURES = ("connect", "timeout")
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=3, failure_rate_threshold=0.6, window=20,
+                 open_seconds=30, max_open_seconds=300, clock=time.monotonic):
+        """
+        初始化熔断器
+
+        Args:
+            failure_threshold: 连续故障（连接失败、超时）达到该次数时打开
+            failure_rate_threshold: 最近任务失败率达到该值时打开
+            window: 统计失败率的最近任务数（至少有一半样本才判断）
+            open_seconds: 打开后的冷却时间，之后进入半开状态
+            max_open_seconds: 半开试探反复失败时冷却时间翻倍的上限
+            clock: 时钟函数
+        """
+        self.failure_threshold = failure_threshold
+        self.failure_rate_threshold = failure_rate_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.clock = clock
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.recent = deque(maxlen=window)
+        self.opened_at = None
+        # 本次连续打开的起始时间（半开试探失败重新打开时不重置）
+        self.down_since = None
+        self.cooldown = open_seconds
+        self.trial_in_flight = False
+        self.trip_count = 0
+
+    def can_dispatch(self):
+        """是否可以派发任务（不改变状态）"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return self.clock() - self.opened_at >= self.cooldown
+        return not self.trial_in_flight
+
+    def on_dispatch(self):
+        """任务已派发：冷却结束的熔断器进入半开状态，派发的任务作为试探"""
+        if self.state == OPEN and self.clock() - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            self.trial_in_flight = True
+
+    def record_success(self):
+        self.recent.append(True)
+        self.consecutive_failures = 0
+        # 打开期间结束的任务是熔断前派发的，只有试探成功才恢复
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self.cooldown = self.open_seconds
+            self.down_since = None
+            self.trial_in_flight = False
+
+    def record_failure(self, hard=True):
+        """
+        记录失败
+
+        Args:
+            hard: 实例故障（连接失败、超时）为True，动作失败为False（只计入失败率）
+        """
+        self.recent.append(False)
+        if hard:
+            self.consecutive_failures += 1
+
+        if self.state == HALF_OPEN:
+            # 试探失败，冷却时间翻倍
+            self.cooldown = min(self.cooldown * 2, self.max_open_seconds)
+            self.trip(reset_cooldown=False)
+            return
+
+        if self.state == CLOSED and (self.consecutive_failures >= self.failure_threshold or
+                                     self._failure_rate_exceeded()):
+            self.trip()
+
+    def _failure_rate_exceeded(self):
+        if len(self.recent) < max(1, self.recent.maxlen // 2):
+            return False
+        failures = sum(1 for ok in self.recent if not ok)
+        return failures / len(self.recent) >= self.failure_rate_threshold
+
+    def trip(self, reset_cooldown=True):
+        """打开熔断器"""
+        if reset_cooldown and self.state == CLOSED:
+            self.cooldown = self.open_seconds
+        if self.down_since is None:
+            self.down_since = self.clock()
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self.trial_in_flight = False
+        self.trip_count += 1
+        self.recent.clear()
+
+    def down_for(self):
+        """连续不可用的秒数，可用时返回0"""
+        if self.down_since is None:
+            return 0.0
+        return self.clock() - self.down_since
+
+    def success_rate(self):
+        if not self.recent:
+            return 1.0
+        return sum(1 for ok in self.recent if ok) / len(self.recent)
+
+def probe_chrome(debug_port, timeout=3):
+    """
+    探测Chrome调试端口
+
+    Returns:
+        响应耗时（秒），不可用时返回None
+    """
+    started = time.monotonic()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{debug_port}/json/version", timeout=timeout) as response:
+            json.loads(response.read().decode("utf-8"))
+        return time.monotonic() - started
+    except Exception:
+        return None
+
+class InstanceHealthMonitor:
+    def __init__(self, base_port=10000, probe_interval=30, probe_timeout=3, give_up_seconds=600,
+                 probe=probe_chrome, clock=time.monotonic, **breaker_settings):
+        """
+        初始化实例健康监控
+
+        Args:
+            base_port: 调试端口基数（端口 = base_port + chrome_num）
+            probe_interval: 后台探测间隔（秒），0表示不在后台探测
+            probe_timeout: 单次探测超时（秒）
+            give_up_seconds: 实例连续不可用超过该秒数时放弃其专属任务
+            probe: 探测函数 probe(debug_port, timeout) -> 耗时或None
+            clock: 时钟函数
+            breaker_settings: 传给CircuitBreaker的参数
+        """
+        self.base_port = base_port
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.give_up_seconds = give_up_seconds
+        self.probe = probe
+        self.clock = clock
+        self.breaker_settings = breaker_settings
+
+        self.breakers = {}
+        self.probe_latency = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _breaker(self, chrome_num):
+        breaker = self.breakers.get(chrome_num)
+        if breaker is None:
+            breaker = CircuitBreaker(clock=self.clock, **self.breaker_settings)
+            self.breakers[chrome_num] = breaker
+        return breaker
+
+    def can_dispatch(self, chrome_num):
+        """是否可以向该实例派发任务"""
+        with self.lock:
+            return self._breaker(chrome_num).can_dispatch()
+
+    def on_dispatch(self, chrome_num):
+        with self.lock:
+            self._breaker(chrome_num).on_dispatch()
+
+    def health_score(self, chrome_num):
+        """
+        健康分 (0~1)：最近任务成功率，半开状态减半，打开状态为0
+        """
+        with self.lock:
+            breaker = self._breaker(chrome_num)
+            if breaker.state == OPEN:
+                return 0.0
+            score = breaker.success_rate()
+            return score / 2 if breaker.state == HALF_OPEN else score
+
+    def record_result(self, chrome_num, result):
+        """根据任务结果更新熔断器"""
+        status = result.get("status")
+        with self.lock:
+            breaker = self._breaker(chrome_num)
+            old_state = breaker.state
+            if status == "completed":
+                breaker.record_success()
+            else:
+                breaker.record_failure(hard=result.get("error_type") in HARD_FAILURES)
+            new_state = breaker.state
+        self._report_transition(chrome_num, old_state, new_state)
+
+    def _report_transition(self, chrome_num, old_state, new_state):
+        if old_state == new_state:
+            return
+        if new_state == OPEN:
+            print(f"🔌 Chrome_{chrome_num} 熔断器打开，暂停向该实例派发任务")
+        elif new_state == CLOSED:
+            print(f"🔋 Chrome_{chrome_num} 已恢复，熔断器关闭")
+
+    def is_given_up(self, chrome_num):
+        """实例是否已连续不可用超过give_up_seconds"""
+        with self.lock:
+            breaker = self.breakers.get(chrome_num)
+            return (breaker is not None and breaker.state != CLOSED and
+                    breaker.down_for() >= self.give_up_seconds)
+
+    def probe_all(self, chrome_nums):
+        """
+        并发探测所有实例的调试端口
+
+        Returns:
+            {chrome_num: 耗时或None}
+        """
+        chrome_nums = list(chrome_nums)
+        if not chrome_nums:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(32, len(chrome_nums))) as executor:
+            latencies = dict(zip(chrome_nums, executor.map(
+                lambda num: self.probe(self.base_port + num, self.probe_timeout), chrome_nums
+            )))
+
+        for chrome_num, latency in latencies.items():
+            with self.lock:
+                breaker = self._breaker(chrome_num)
+                old_state = breaker.state
+                self.probe_latency[chrome_num] = latency
+                if latency is None:
+                    if breaker.state != OPEN:
+                        breaker.trip()
+                elif breaker.state == OPEN:
+                    # 端口已恢复响应，立即允许试探任务
+                    breaker.opened_at = self.clock() - breaker.cooldown
+                new_state = breaker.state
+            self._report_transition(chrome_num, old_state, new_state)
+        return latencies
+
+    def start(self, chrome_nums_source):
+        """
+        启动后台探测线程
+
+        Args:
+            chrome_nums_source: 返回当前需要探测的实例编号列表的函数
+        """
+        if not self.probe_interval or (self.thread and self.thread.is_alive()):
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, args=(chrome_nums_source,), daemon=True)
+        self.thread.start()
+
+    def _run(self, chrome_nums_source):
+        while not self.stop_event.wait(self.probe_interval):
+            try:
+                self.probe_all(chrome_nums_source())
+            except Exception as e:
+                print(f"❌ 实例健康探测失败: {e}")
+
+    def stop(self):
+        """停止后台探测"""
+        self.stop_event.set()
+
+    def get_status(self):
+        """各实例的熔断状态和健康分"""
+        with self.lock:
+            chrome_nums = list(self.breakers)
+        status = {}
+        for chrome_num in chrome_nums:
+            score = self.health_score(chrome_num)
+            with self.lock:
+                breaker = self.breakers[chrome_num]
+                status[chrome_num] = {
+                    "state": breaker.state,
+                    "health_score": round(score, 3),
+                    "consecutive_failures": breaker.consecutive_failures,
+                    "trip_count": breaker.trip_count,
+                    "probe_latency": self.probe_latency.get(chrome_num)
+                }
+        return status
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按域名限流
+所有Chrome实例共享的令牌桶和并发上限，按任务中navigate动作的目标域名
+（以及可选的metadata.category）限流；调度循环派发前检查，受限任务延后派发而不占用工作线程
+"""
+
+import time
+import threading
+from urllib.parse import urlparse
+
+def task_domains(task):
+    """任务中navigate动作的目标域名（去重，保持顺序）"""
+    domains = []
+    for action in task.get("actions", []):
+        if action.get("type") != "navigate":
+            continue
+        hostname = urlparse(action.get("url", "")).hostname
+        if hostname and hostname not in domains:
+            domains.append(hostname)
+    return domains
+
+class TokenBucket:
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            burst: 桶容量（允许的突发次数）
+            clock: 时钟函数
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated_at = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self):
+        """
+        预订一个令牌（令牌不足时记为欠额，后来者排在其后）
+
+        Returns:
+            令牌可用前需要等待的秒数
+        """
+        self._refill()
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+class DomainRateLimiter:
+    def __init__(self, default=None, domains=None, categories=None, concurrency_retry_interval=1.0,
+                 clock=time.monotonic):
+        """
+        初始化限流器
+
+        Args:
+            default: 未单独配置的域名使用的限制，如 {"rate": 1, "burst": 2, "max_concurrent": 4}，None表示不限制
+            domains: 按域名的限制，键为域名（同时匹配其子域名），如 {"google.com": {"rate": 0.5}}
+            categories: 按metadata.category的限制
+            concurrency_retry_interval: 并发已满时任务延后的秒数
+            clock: 时钟函数
+        """
+        self.default = default
+        self.domains = domains or {}
+        self.categories = categories or {}
+        self.concurrency_retry_interval = concurrency_retry_interval
+        self.clock = clock
+
+        self.buckets = {}      # 限流键 -> TokenBucket
+        self.active = {}       # 限流键 -> 执行中的任务数
+        self.deferred = {}     # 限流键 -> 被延后的次数
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """从TaskQueueManager的rate_limits配置创建限流器"""
+        return cls(
+            default=config.get("default"),
+            domains=config.get("domains"),
+            categories=config.get("categories"),
+            concurrency_retry_interval=config.get("concurrency_retry_interval", 1.0)
+        )
+
+    def _domain_limit(self, hostname):
+        """查找域名的限制配置，返回 (限流键, 限制)"""
+        parts = hostname.split(".")
+        for i in range(len(parts) - 1):
+            suffix = ".".join(parts[i:])
+            if suffix in self.domains:
+                return f"domain:{suffix}", self.domains[suffix]
+        if self.default:
+            return f"domain:{hostname}", self.default
+        return None, None
+
+    def limits_for(self, task):
+        """任务涉及的限流键和限制"""
+        limits = []
+        for hostname in task_domains(task):
+            key, limit = self._domain_limit(hostname)
+            if key and (key, limit) not in limits:
+                limits.append((key, limit))
+
+        category = (task.get("metadata") or {}).get("category")
+        if category in self.categories:
+            limits.append((f"category:{category}", self.categories[category]))
+        return limits
+
+    def _bucket(self, key, limit):
+        bucket = self.buckets.get(key)
+        if bucket is None and limit.get("rate"):
+            bucket = TokenBucket(limit["rate"], limit.get("burst", 1), self.clock)
+            self.buckets[key] = bucket
+        return bucket
+
+    def acquire(self, task):
+        """
+        尝试为任务获取执行许可
+        令牌不足时预订令牌并返回等待时间，延后的任务到期再次检查时不重复扣除，
+        因此大量任务受同一域名限制时按预订顺序依次派发
+
+        Returns:
+            0表示已获得许可；否则为建议延后的秒数
+        """
+        limits = self.limits_for(task)
+        if not limits:
+            return 0.0
+
+        with self.lock:
+            # 之前被延后时已预订令牌的限流键
+            reserved = set(task.pop("rate_limit_reserved", []))
+            wait_time = 0.0
+            for key, limit in limits:
+                bucket = self._bucket(key, limit)
+                if bucket is not None and key not in reserved:
+                    wait_time = max(wait_time, bucket.reserve())
+                    reserved.add(key)
+
+                max_concurrent = limit.get("max_concurrent")
+                if max_concurrent and self.active.get(key, 0) >= max_concurrent:
+                    wait_time = max(wait_time, self.concurrency_retry_interval)
+
+            if wait_time > 0:
+                task["rate_limit_reserved"] = sorted(reserved)
+                for key, _ in limits:
+                    self.deferred[key] = self.deferred.get(key, 0) + 1
+                return wait_time
+
+            for key, _ in limits:
+                self.active[key] = self.active.get(key, 0) + 1
+            return 0.0
+
+    def release(self, task):
+        """任务结束后释放并发名额"""
+        limits = self.limits_for(task)
+        if not limits:
+            return
+        with self.lock:
+            for key, _ in limits:
+                if self.active.get(key, 0) > 0:
+                    self.active[key] -= 1
+
+    def get_stats(self):
+        """各限流键的执行中任务数和被延后次数"""
+        with self.lock:
+            keys = set(self.active) | set(self.deferred)
+            return {
+                key: {"active": self.active.get(key, 0), "deferred": self.deferred.get(key, 0)}
+                for key in sorted(keys)
+            }
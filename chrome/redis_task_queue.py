@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Redis分布式任务队列
+多台主机（各自驱动本机的Chrome实例）从同一个Redis队列领取任务：
+- 可靠队列：领取的任务移入处理中列表并设置可见性超时，超时未确认的任务重新入队
+- 指定Chrome实例的任务放在各实例自己的待执行列表中，主机只领取自己实例的任务和任意实例任务
+- 批量推送使用脚本，每批一次往返；任务ID重复的任务被拒绝
+- 执行结果写入共享的Redis Stream
+"""
+
+import time
+import json
+import socket
+from execution_lanes import is_any_instance
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# 推送任务：ARGV为 (任务ID, 任务JSON, 待执行列表) 三元组；任务ID已存在时拒绝，返回被拒绝的任务ID
+# KEYS: 任务内容hash, 任务所在待执行列表hash, 实例待执行列表集合, 任意实例待执行列表
+PUSH_SCRIPT = """
+local rejected = {}
+for i = 1, #ARGV, 3 do
+    local task_id, pending_key = ARGV[i], ARGV[i + 2]
+    if redis.call('HSETNX', KEYS[1], task_id, ARGV[i + 1]) == 1 then
+        redis.call('HSET', KEYS[2], task_id, pending_key)
+        if pending_key ~= KEYS[4] then
+            redis.call('SADD', KEYS[3], pending_key)
+        end
+        redis.call('LPUSH', pending_key, task_id)
+    else
+        table.insert(rejected, task_id)
+    end
+end
+return rejected
+"""
+
+# 领取任务：依次从各待执行列表移到处理中列表并登记可见性截止时间（原子操作）
+# KEYS: 处理中列表, 可见性截止时间zset, 任务内容hash, 待执行列表...
+CLAIM_SCRIPT = """
+local claimed = {}
+local count = tonumber(ARGV[2])
+for k = 4, #KEYS do
+    while #claimed < count * 2 do
+        local task_id = redis.call('RPOPLPUSH', KEYS[k], KEYS[1])
+        if not task_id then
+            break
+        end
+        redis.call('ZADD', KEYS[2], ARGV[1], task_id)
+        table.insert(claimed, task_id)
+        table.insert(claimed, redis.call('HGET', KEYS[3], task_id) or '')
+    end
+end
+return claimed
+"""
+
+# 重新入队可见性超时的任务（放回任务原来的待执行列表）
+# KEYS: 任意实例待执行列表, 处理中列表, 可见性截止时间zset, 任务所在待执行列表hash
+REQUEUE_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[1])
+for _, task_id in ipairs(expired) do
+    redis.call('LREM', KEYS[2], 0, task_id)
+    redis.call('ZREM', KEYS[3], task_id)
+    redis.call('RPUSH', redis.call('HGET', KEYS[4], task_id) or KEYS[1], task_id)
+end
+return #expired
+"""
+
+# 确认任务：从处理中列表和待执行列表（确认前可能已超时重新入队）移除，删除任务内容并写入结果流
+# KEYS: 处理中列表, 可见性截止时间zset, 任务内容hash, 任务所在待执行列表hash, 任意实例待执行列表, 结果流
+# ARGV: 任务ID, 结果流最大长度, 状态, 执行者, 结果JSON
+ACK_SCRIPT = """
+local task_id = ARGV[1]
+redis.call('LREM', redis.call('HGET', KEYS[4], task_id) or KEYS[5], 0, task_id)
+redis.call('LREM', KEYS[1], 0, task_id)
+redis.call('ZREM', KEYS[2], task_id)
+redis.call('HDEL', KEYS[3], task_id)
+redis.call('HDEL', KEYS[4], task_id)
+return redis.call('XADD', KEYS[6], 'MAXLEN', '~', ARGV[2], '*',
+                  'task_id', task_id, 'status', ARGV[3], 'worker', ARGV[4], 'result', ARGV[5])
+"""
+
+class RedisTaskQueue:
+    def __init__(self, host='localhost', port=6379, db=0, password=None, namespace="rpa_tasks",
+                 visibility_timeout=600, results_maxlen=100000, client=None):
+        """
+        初始化Redis任务队列
+
+        Args:
+            host, port, db, password: Redis连接参数
+            namespace: 键名前缀，不同批次可使用不同前缀
+            visibility_timeout: 领取后多少秒未确认则重新入队
+            results_maxlen: 结果流保留的最大条目数（近似）
+            client: 已有的redis.Redis客户端
+        """
+        if client is None:
+            if redis is None:
+                raise ImportError("使用Redis任务队列需要安装redis: pip install redis")
+            client = redis.Redis(host=host, port=port, db=db, password=password, decode_responses=True)
+
+        self.client = client
+        self.namespace = namespace
+        self.visibility_timeout = visibility_timeout
+        self.results_maxlen = results_maxlen
+        self.worker_id = f"{socket.gethostname()}:{id(self)}"
+
+        self.pending_key = f"{namespace}:pending"
+        self.processing_key = f"{namespace}:processing"
+        self.deadlines_key = f"{namespace}:deadlines"
+        self.tasks_key = f"{namespace}:tasks"
+        self.routes_key = f"{namespace}:routes"
+        self.instance_lists_key = f"{namespace}:instance_lists"
+        self.results_key = f"{namespace}:results"
+
+        self.push_script = self.client.register_script(PUSH_SCRIPT)
+        self.claim_script = self.client.register_script(CLAIM_SCRIPT)
+        self.requeue_script = self.client.register_script(REQUEUE_SCRIPT)
+        self.ack_script = self.client.register_script(ACK_SCRIPT)
+
+    def instance_pending_key(self, chrome_num):
+        """指定Chrome实例的任务所在的待执行列表"""
+        return f"{self.pending_key}:{chrome_num}"
+
+    def _task_pending_key(self, task):
+        chrome_num = task.get("chrome_num")
+        if is_any_instance(chrome_num):
+            return self.pending_key
+        return self.instance_pending_key(chrome_num)
+
+    def push_tasks(self, tasks, batch_size=1000):
+        """
+        批量推送任务（每batch_size个任务一次往返）
+        任务ID已在队列中（待执行或处理中）的任务被拒绝，不覆盖原任务
+
+        Args:
+            tasks: 任务字典的可迭代对象
+            batch_size: 每批包含的任务数
+
+        Returns:
+            推送的任务数（不含被拒绝的任务）
+        """
+        pushed = 0
+        rejected = []
+        batch = []
+        for task in tasks:
+            batch.extend([task["task_id"], json.dumps(task, ensure_ascii=False), self._task_pending_key(task)])
+            if len(batch) >= batch_size * 3:
+                pushed, rejected = self._push_batch(batch, pushed, rejected)
+                batch = []
+        if batch:
+            pushed, rejected = self._push_batch(batch, pushed, rejected)
+
+        if rejected:
+            print(f"⚠️ {len(rejected)} 个任务ID已在Redis队列中，已拒绝: {', '.join(rejected[:10])}")
+        return pushed
+
+    def _push_batch(self, batch, pushed, rejected):
+        reply = self.push_script(
+            keys=[self.tasks_key, self.routes_key, self.instance_lists_key, self.pending_key],
+            args=batch
+        )
+        return pushed + len(batch) // 3 - len(reply), rejected + list(reply)
+
+    def _claimable_keys(self, chrome_instances):
+        """可领取的待执行列表：本机实例的列表在前，任意实例列表在后；chrome_instances为None时包括所有列表"""
+        if chrome_instances is None:
+            keys = sorted(self.client.smembers(self.instance_lists_key))
+        else:
+            keys = [self.instance_pending_key(chrome_num) for chrome_num in chrome_instances]
+        return keys + [self.pending_key]
+
+    def claim(self, count=1, chrome_instances=None):
+        """
+        领取最多count个任务
+
+        Args:
+            count: 最多领取的任务数
+            chrome_instances: 本机的Chrome实例编号，只领取指定这些实例的任务和任意实例任务；
+                              None表示不限制
+
+        Returns:
+            任务字典列表
+        """
+        deadline = time.time() + self.visibility_timeout
+        reply = self.claim_script(
+            keys=[self.processing_key, self.deadlines_key, self.tasks_key] + self._claimable_keys(chrome_instances),
+            args=[deadline, count]
+        )
+
+        tasks = []
+        for task_id, payload in zip(reply[0::2], reply[1::2]):
+            if not payload:
+                # 任务内容缺失，直接确认丢弃
+                self.ack(task_id, {"task_id": task_id, "status": "error", "error": "任务内容缺失"})
+                continue
+            task = json.loads(payload)
+            task["remote_id"] = task_id
+            tasks.append(task)
+        return tasks
+
+    def extend(self, task_ids):
+        """延长已领取任务的可见性超时（心跳）"""
+        if not task_ids:
+            return
+        deadline = time.time() + self.visibility_timeout
+        self.client.zadd(self.deadlines_key, {task_id: deadline for task_id in task_ids}, xx=True)
+
+    def ack(self, task_id, result):
+        """确认任务完成，并将结果写入结果流（任务已超时重新入队时一并从待执行列表移除）"""
+        self.ack_script(
+            keys=[self.processing_key, self.deadlines_key, self.tasks_key, self.routes_key,
+                  self.pending_key, self.results_key],
+            args=[task_id, self.results_maxlen, result.get("status", ""), self.worker_id,
+                  json.dumps(result, ensure_ascii=False)]
+        )
+
+    def requeue_expired(self):
+        """将可见性超时的任务放回待执行列表，返回数量"""
+        return self.requeue_script(
+            keys=[self.pending_key, self.processing_key, self.deadlines_key, self.routes_key],
+            args=[time.time()]
+        )
+
+    def read_results(self, last_id="0-0", count=100, block=None):
+        """
+        读取结果流
+
+        Args:
+            last_id: 从该条目之后开始读取
+            count: 最多读取条数
+            block: 阻塞等待的毫秒数，None表示不阻塞
+
+        Returns:
+            (最后一条的ID, 结果字典列表)
+        """
+        reply = self.client.xread({self.results_key: last_id}, count=count, block=block)
+        results = []
+        for _, entries in reply or []:
+            for entry_id, fields in entries:
+                last_id = entry_id
+                results.append(json.loads(fields["result"]))
+        return last_id, results
+
+    def pending_count(self, chrome_instances=None):
+        """
+        待领取的任务数
+
+        Args:
+            chrome_instances: 只统计这些实例可领取的任务，None表示全部
+        """
+        pipe = self.client.pipeline(transaction=False)
+        for key in self._claimable_keys(chrome_instances):
+            pipe.llen(key)
+        return sum(pipe.execute())
+
+    def get_stats(self):
+        """队列统计"""
+        pending = self.pending_count()
+        pipe = self.client.pipeline(transaction=False)
+        pipe.llen(self.processing_key)
+        pipe.xlen(self.results_key)
+        processing, results = pipe.execute()
+        return {"pending": pending, "processing": processing, "results": results}
+
+    def clear(self):
+        """删除本命名空间下的所有键"""
+        instance_lists = list(self.client.smembers(self.instance_lists_key))
+        self.client.delete(self.pending_key, self.processing_key, self.deadlines_key, self.tasks_key,
+                           self.routes_key, self.instance_lists_key, self.results_key, *instance_lists)
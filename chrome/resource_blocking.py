@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网络资源拦截策略
+任务或模板可指定资源策略（预设名、预设名列表或策略字典），通过CDP拦截图片、媒体、字体、
+第三方请求和指定URL模式，减少页面加载时间、带宽和渲染进程内存。
+
+WebDriver路径使用Network.setBlockedURLs（只能按URL模式拦截，类型按文件扩展名近似，不支持第三方判断和
+allow_urls，也不报告拦截了哪些请求）；异步CDP引擎使用Fetch域按资源类型和来源逐个判断，并统计拦截的请求数。
+拦截统计（BlockingCounters）因此只有CDP异步引擎提供。
+被拦截的请求不会下载，拦截字节数按各资源类型的典型大小估算
+"""
+
+import threading
+from fnmatch import fnmatchcase
+from urllib.parse import urlparse
+
+# 按扩展名近似资源类型（用于只支持URL模式的Network.setBlockedURLs）
+RESOURCE_TYPE_EXTENSIONS = {
+    "Image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"],
+    "Font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "Media": ["mp4", "webm", "ogg", "mp3", "m4a", "m3u8", "ts"],
+    "Stylesheet": ["css"]
+}
+
+# 各资源类型的典型大小（字节），用于估算拦截的流量
+ESTIMATED_BYTES = {
+    "Image": 40 * 1024,
+    "Font": 35 * 1024,
+    "Media": 500 * 1024,
+    "Stylesheet": 20 * 1024,
+    "Script": 30 * 1024,
+    "XHR": 5 * 1024,
+    "Fetch": 5 * 1024,
+    "Other": 10 * 1024
+}
+
+# WebDriver路径结果和状态报告中的说明
+WEBDRIVER_BLOCKING_NOTE = "拦截统计仅由CDP异步引擎提供，WebDriver路径不统计拦截的请求"
+
+# 内置预设
+PRESETS = {
+    "text_only": {"block_types": ["Image", "Media", "Font"]},
+    "no_media": {"block_types": ["Media"]},
+    "no_third_party": {"block_third_party": True},
+    "minimal": {"block_types": ["Image", "Media", "Font"], "block_third_party": True}
+}
+
+def site_of(url):
+    """
+    站点（主机名的最后两段，如 www.google.com -> google.com）
+    未使用公共后缀列表，co.uk这类二级后缀会被视为同一站点
+    """
+    host = (urlparse(url).hostname or "").lower()
+    parts = host.split(".")
+    if len(parts) <= 2 or parts[-1].isdigit():
+        return host
+    return ".".join(parts[-2:])
+
+def is_third_party(url, page_url):
+    """请求是否来自页面所在站点之外"""
+    if not page_url or not url.startswith(("http://", "https://")):
+        return False
+    return site_of(url) != site_of(page_url)
+
+class ResourcePolicy:
+    def __init__(self, block_types=None, block_third_party=False, block_urls=None, allow_urls=None, name=None):
+        """
+        初始化资源策略
+
+        Args:
+            block_types: 拦截的CDP资源类型（Image、Media、Font、Stylesheet、Script等）
+            block_third_party: 是否拦截第三方请求（页面文档本身不拦截，仅Fetch路径）
+            block_urls: 拦截的URL模式（*为通配符，如 *doubleclick.net*）
+            allow_urls: 不拦截的URL模式，优先于其他规则（仅Fetch路径）
+            name: 策略名称（日志和统计使用）
+        """
+        self.block_types = set(block_types or [])
+        self.block_third_party = block_third_party
+        self.block_urls = list(block_urls or [])
+        self.allow_urls = list(allow_urls or [])
+        self.name = name or "custom"
+
+    def webdriver_ignored_rules(self):
+        """WebDriver路径（Network.setBlockedURLs）无法执行的规则"""
+        ignored = []
+        if self.block_third_party:
+            ignored.append("block_third_party")
+        if self.allow_urls:
+            ignored.append("allow_urls")
+        return ignored
+
+    @classmethod
+    def resolve(cls, spec, presets=None):
+        """
+        由策略描述构建策略
+
+        Args:
+            spec: None、预设名、预设名列表或策略字典（字典可用extends引用预设）
+            presets: 自定义预设（与内置预设合并，同名时覆盖）
+
+        Returns:
+            ResourcePolicy，spec为空时返回None
+
+        Raises:
+            ValueError: 未知的预设名或无效的策略字典
+        """
+        if not spec:
+            return None
+        available = dict(PRESETS, **(presets or {}))
+
+        if isinstance(spec, str):
+            if spec not in available:
+                raise ValueError(f"未知的资源策略: {spec}")
+            policy = cls.resolve(available[spec], presets)
+            policy.name = spec
+            return policy
+
+        if isinstance(spec, (list, tuple)):
+            policies = [cls.resolve(item, presets) for item in spec]
+            merged = cls(name="+".join(policy.name for policy in policies))
+            for policy in policies:
+                merged.merge(policy)
+            return merged
+
+        spec = dict(spec)
+        base = spec.pop("extends", None)
+        try:
+            policy = cls(**spec)
+        except TypeError as e:
+            raise ValueError(f"无效的资源策略: {e}")
+        if base:
+            policy.merge(cls.resolve(base, presets))
+        return policy
+
+    def merge(self, other):
+        """合并另一个策略的拦截规则"""
+        self.block_types |= other.block_types
+        self.block_third_party = self.block_third_party or other.block_third_party
+        self.block_urls += [pattern for pattern in other.block_urls if pattern not in self.block_urls]
+        self.allow_urls += [pattern for pattern in other.allow_urls if pattern not in self.allow_urls]
+
+    def blocked_url_patterns(self):
+        """Network.setBlockedURLs使用的URL模式（资源类型按扩展名近似）"""
+        patterns = list(self.block_urls)
+        for resource_type in sorted(self.block_types):
+            for extension in RESOURCE_TYPE_EXTENSIONS.get(resource_type, []):
+                patterns.extend([f"*.{extension}", f"*.{extension}?*"])
+        return patterns
+
+    def fetch_patterns(self):
+        """Fetch.enable的请求拦截模式，只暂停需要判断的请求"""
+        if self.block_third_party or self.block_urls:
+            return [{"urlPattern": "*", "requestStage": "Request"}]
+        return [{"urlPattern": "*", "resourceType": resource_type, "requestStage": "Request"}
+                for resource_type in sorted(self.block_types)]
+
+    def should_block(self, url, resource_type, page_url=None):
+        """
+        判断请求是否拦截
+
+        Returns:
+            拦截原因（type、third_party、url），不拦截返回None
+        """
+        if resource_type == "Document" or any(fnmatchcase(url, pattern) for pattern in self.allow_urls):
+            return None
+        if resource_type in self.block_types:
+            return "type"
+        if any(fnmatchcase(url, pattern) for pattern in self.block_urls):
+            return "url"
+        if self.block_third_party and is_third_party(url, page_url):
+            return "third_party"
+        return None
+
+class BlockingCounters:
+    def __init__(self):
+        """拦截统计（由CDP异步引擎的Fetch拦截记录）"""
+        self.blocked_requests = 0
+        self.allowed_requests = 0
+        self.by_type = {}
+        self.by_reason = {}
+        self.estimated_bytes = 0
+        self.lock = threading.Lock()
+
+    def record_blocked(self, resource_type, reason):
+        with self.lock:
+            self.blocked_requests += 1
+            self.by_type[resource_type] = self.by_type.get(resource_type, 0) + 1
+            self.by_reason[reason] = self.by_reason.get(reason, 0) + 1
+            self.estimated_bytes += ESTIMATED_BYTES.get(resource_type, ESTIMATED_BYTES["Other"])
+
+    def record_allowed(self):
+        with self.lock:
+            self.allowed_requests += 1
+
+    def merge(self, other):
+        """累加另一组统计"""
+        summary = other.summary()
+        with self.lock:
+            self.blocked_requests += summary["blocked_requests"]
+            self.allowed_requests += summary["allowed_requests"]
+            self.estimated_bytes += summary["estimated_blocked_bytes"]
+            for resource_type, count in summary["by_type"].items():
+                self.by_type[resource_type] = self.by_type.get(resource_type, 0) + count
+            for reason, count in summary["by_reason"].items():
+                self.by_reason[reason] = self.by_reason.get(reason, 0) + count
+
+    def summary(self):
+        with self.lock:
+            return {
+                "blocked_requests": self.blocked_requests,
+                "allowed_requests": self.allowed_requests,
+                "by_type": dict(self.by_type),
+                "by_reason": dict(self.by_reason),
+                "estimated_blocked_bytes": self.estimated_bytes
+            }
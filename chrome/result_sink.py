@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务结果流式输出
+每个任务结束时将结果追加写入按大小滚动的JSONL文件，内存中只保留汇总计数；
+读取接口可从结果文件重新统计汇总信息
+"""
+
+import time
+import json
+import threading
+from pathlib import Path
+
+class ResultCounters:
+    def __init__(self):
+        """滚动汇总计数（不保存单个任务结果）"""
+        self.completed = 0
+        # 未成功的执行次数（含随后重试的执行）
+        self.failed = 0
+        self.retried = 0
+        self.skipped = 0
+        self.by_status = {}
+        self.by_error_type = {}
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, state, result):
+        """
+        计入一个任务结果
+
+        Args:
+            state: completed、failed、retried或skipped
+            result: 任务结果字典
+        """
+        status = result.get("status", state)
+        error_type = result.get("error_type")
+        duration = result.get("duration") or 0.0
+
+        with self.lock:
+            if state == "completed":
+                self.completed += 1
+            else:
+                self.failed += 1
+                if state == "retried":
+                    self.retried += 1
+                elif state == "skipped":
+                    self.skipped += 1
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+            if error_type:
+                self.by_error_type[error_type] = self.by_error_type.get(error_type, 0) + 1
+            self.total_duration += duration
+            self.max_duration = max(self.max_duration, duration)
+
+    def summary(self):
+        """汇总信息（与save_results的summary字段一致）"""
+        with self.lock:
+            total = self.completed + self.failed
+            return {
+                "total_tasks": total,
+                "completed_tasks": self.completed,
+                "failed_tasks": self.failed,
+                "retried_tasks": self.retried,
+                "skipped_tasks": self.skipped,
+                "success_rate": self.completed / total if total > 0 else 0,
+                "by_status": dict(self.by_status),
+                "by_error_type": dict(self.by_error_type),
+                "average_duration": self.total_duration / total if total > 0 else 0,
+                "max_duration": self.max_duration
+            }
+
+class JsonlResultSink:
+    def __init__(self, directory="results", prefix="results", max_file_size=100 * 1024 * 1024,
+                 include_actions=False):
+        """
+        初始化结果输出
+
+        Args:
+            directory: 结果文件目录
+            prefix: 结果文件名前缀
+            max_file_size: 单个文件的最大字节数，超过后滚动到新文件
+            include_actions: 是否写入逐个动作的结果
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_file_size = max_file_size
+        self.include_actions = include_actions
+
+        self.run_id = time.strftime("%Y%m%d_%H%M%S")
+        self.segment = 0
+        self.file = None
+        self.file_size = 0
+        self.written = 0
+        self.lock = threading.Lock()
+
+    def _open_segment(self):
+        self.segment += 1
+        path = self.directory / f"{self.prefix}_{self.run_id}_{self.segment:04d}.jsonl"
+        self.file = open(path, 'a', encoding='utf-8')
+        self.file_size = path.stat().st_size
+
+    def write(self, state, result):
+        """追加一条任务结果"""
+        if not self.include_actions:
+            result = {key: value for key, value in result.items() if key != "results"}
+        line = json.dumps({"state": state, **result}, ensure_ascii=False, separators=(',', ':')) + "\n"
+        data_size = len(line.encode('utf-8'))
+
+        with self.lock:
+            if self.file is None or self.file_size + data_size > self.max_file_size > 0:
+                if self.file is not None:
+                    self.file.close()
+                self._open_segment()
+            self.file.write(line)
+            self.file_size += data_size
+            self.written += 1
+
+    def flush(self):
+        """将缓冲写入磁盘"""
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+
+    def close(self):
+        """关闭当前文件"""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def files(self):
+        """本次运行写入的结果文件"""
+        return sorted(self.directory.glob(f"{self.prefix}_{self.run_id}_*.jsonl"))
+
+def read_results(directory="results", prefix="results", state=None):
+    """
+    逐条读取结果文件
+
+    Args:
+        directory: 结果文件目录
+        prefix: 结果文件名前缀（可包含运行编号以只读取某次运行）
+        state: 只返回指定状态的结果
+
+    Yields:
+        结果字典（含state字段）
+    """
+    for path in sorted(Path(directory).glob(f"{prefix}_*.jsonl")):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    # 进程中断时最后一行可能不完整
+                    continue
+                if state is None or result.get("state") == state:
+                    yield result
+
+def rebuild_summary(directory="results", prefix="results"):
+    """从结果文件重新统计汇总信息"""
+    counters = ResultCounters()
+    for result in read_results(directory, prefix):
+        counters.add(result.get("state", "failed"), result)
+    return counters.summary()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务重试策略
+指数退避加随机抖动，可按错误类型分别配置
+"""
+
+import random
+
+class RetryPolicy:
+    def __init__(self, base_delay=5, multiplier=2, max_delay=300, jitter=0.5, max_retries=2, error_types=None):
+        """
+        初始化重试策略
+
+        Args:
+            base_delay: 第一次重试的延迟（秒）
+            multiplier: 每次重试延迟的倍数
+            max_delay: 延迟上限（秒）
+            jitter: 抖动比例 (0~1)，实际延迟在 [delay*(1-jitter), delay] 之间随机
+            max_retries: 最大重试次数
+            error_types: 按错误类型覆盖以上参数，例如 {"connect": {"base_delay": 15}}
+        """
+        self.defaults = {
+            "base_delay": base_delay,
+            "multiplier": multiplier,
+            "max_delay": max_delay,
+            "jitter": jitter,
+            "max_retries": max_retries
+        }
+        self.error_types = error_types or {}
+
+    @classmethod
+    def from_config(cls, config):
+        """从TaskQueueManager配置创建重试策略"""
+        policy = config.get("retry_policy", {})
+        return cls(
+            base_delay=policy.get("base_delay", config.get("retry_delay", 5)),
+            multiplier=policy.get("multiplier", 2),
+            max_delay=policy.get("max_delay", 300),
+            jitter=policy.get("jitter", 0.5),
+            max_retries=policy.get("max_retries", config.get("max_retries", 2)),
+            error_types=policy.get("error_types")
+        )
+
+    def settings_for(self, error_type):
+        """获取指定错误类型的重试参数"""
+        settings = dict(self.defaults)
+        settings.update(self.error_types.get(error_type, {}))
+        return settings
+
+    def should_retry(self, retry_count, error_type):
+        """已重试retry_count次后是否还应重试"""
+        return retry_count < self.settings_for(error_type)["max_retries"]
+
+    def compute_delay(self, retry_count, error_type):
+        """
+        计算第retry_count次重试（从1开始）的延迟
+
+        Returns:
+            延迟秒数
+        """
+        settings = self.settings_for(error_type)
+        delay = settings["base_delay"] * settings["multiplier"] ** max(retry_count - 1, 0)
+        delay = min(delay, settings["max_delay"])
+        return random.uniform(delay * (1 - settings["jitter"]), delay)
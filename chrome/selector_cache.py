@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+选择器排名缓存
+按页面URL模式、动作类型和候选选择器组记录每次命中的选择器及耗时，
+下次查找时将历史命中最多的选择器排在最前；命中次数随时间衰减，过时的排名会被重新评估。
+缓存保存为JSON文件，跨运行持续积累
+"""
+
+import os
+import re
+import time
+import json
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+# URL路径中视为可变参数的片段（数字、十六进制ID、UUID）
+_VARIABLE_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8,}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$", re.I)
+
+def url_pattern(url):
+    """
+    URL模式：域名加路径，可变片段替换为*，忽略查询参数
+    例如 https://shop.com/item/123?ref=a -> shop.com/item/*
+    """
+    if not url:
+        return "*"
+    parsed = urlparse(url)
+    segments = ["*" if _VARIABLE_SEGMENT.match(segment) else segment
+                for segment in parsed.path.split("/") if segment]
+    return "/".join([parsed.netloc or "*"] + segments)
+
+class SelectorCache:
+    def __init__(self, path="selector_cache.json", half_life=7 * 86400, save_interval=30,
+                 max_entries=10000, clock=time.time):
+        """
+        初始化选择器排名缓存
+
+        Args:
+            path: 缓存文件路径，None表示只保存在内存中
+            half_life: 命中次数衰减一半所需的秒数
+            save_interval: 有更新时自动保存的最短间隔（秒）
+            max_entries: 最多保存的条目数，超出时淘汰最久未使用的条目
+            clock: 时钟函数
+        """
+        self.path = Path(path) if path else None
+        self.half_life = half_life
+        self.save_interval = save_interval
+        self.max_entries = max_entries
+        self.clock = clock
+
+        # 条目键 -> {"selectors": {选择器: {"score", "updated_at", "wins", "avg_ms"}}, "used_at"}
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.not_found = 0
+        self.dirty = False
+        self.last_save = clock()
+        self.lock = threading.Lock()
+
+        self.load()
+
+    def _key(self, url, action, selectors):
+        return f"{url_pattern(url)}|{action}|{json.dumps(sorted(selectors), ensure_ascii=False)}"
+
+    def _decayed(self, stats, now):
+        age = max(0, now - stats["updated_at"])
+        return stats["score"] * 0.5 ** (age / self.half_life)
+
+    def rank(self, url, action, selectors):
+        """
+        按历史命中排序选择器（无记录的保持原有顺序，排在有记录的之后）
+
+        Returns:
+            排序后的选择器列表
+        """
+        if isinstance(selectors, str):
+            selectors = [selectors]
+        with self.lock:
+            entry = self.entries.get(self._key(url, action, selectors))
+            if entry is None:
+                return list(selectors)
+            now = self.clock()
+            scores = {selector: self._decayed(stats, now) for selector, stats in entry["selectors"].items()}
+        return sorted(selectors, key=lambda selector: -scores.get(selector, 0.0))
+
+    def record(self, url, action, selectors, tried_first, winner, duration):
+        """
+        记录一次查找结果
+
+        Args:
+            url: 查找时的页面URL
+            action: 动作类型
+            selectors: 任务中的候选选择器
+            tried_first: 本次排在最前的选择器
+            winner: 命中的选择器，未找到为None
+            duration: 查找耗时（秒）
+        """
+        if isinstance(selectors, str):
+            selectors = [selectors]
+        now = self.clock()
+        with self.lock:
+            if winner is None:
+                self.not_found += 1
+                return
+            if winner == tried_first:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+            key = self._key(url, action, selectors)
+            entry = self.entries.setdefault(key, {"selectors": {}, "used_at": now})
+            entry["used_at"] = now
+            stats = entry["selectors"].setdefault(winner, {"score": 0.0, "updated_at": now, "wins": 0, "avg_ms": None})
+            stats["score"] = self._decayed(stats, now) + 1
+            stats["updated_at"] = now
+            stats["wins"] += 1
+            duration_ms = duration * 1000
+            stats["avg_ms"] = duration_ms if stats["avg_ms"] is None else stats["avg_ms"] * 0.8 + duration_ms * 0.2
+
+            if len(self.entries) > self.max_entries:
+                oldest = min(self.entries, key=lambda k: self.entries[k]["used_at"])
+                del self.entries[oldest]
+            self.dirty = True
+            save_due = self.path is not None and now - self.last_save >= self.save_interval
+
+        if save_due:
+            self.save()
+
+    def load(self):
+        """从缓存文件加载"""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self.lock:
+                self.entries = data.get("entries", {})
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 选择器缓存读取失败，重新开始积累: {e}")
+
+    def save(self):
+        """写入缓存文件（先写临时文件再替换，避免中断时损坏）"""
+        if self.path is None:
+            return
+        with self.lock:
+            if not self.dirty:
+                return
+            data = json.dumps({"entries": self.entries}, ensure_ascii=False)
+            self.dirty = False
+            self.last_save = self.clock()
+
+        temp_path = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"❌ 保存选择器缓存失败: {e}")
+
+    def get_stats(self):
+        """命中统计：hits为历史最优选择器排在最前且命中的次数，misses为由后备选择器命中的次数"""
+        with self.lock:
+            found = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_found": self.not_found,
+                "hit_rate": self.hits / found if found else 0,
+                "entries": len(self.entries)
+            }
+
+_global_caches = {}
+_global_caches_lock = threading.Lock()
+
+def get_selector_cache(path="selector_cache.json", **settings):
+    """
+    获取全局选择器缓存（同一文件在进程内共用一个实例）
+    """
+    key = str(Path(path).resolve()) if path else None
+    with _global_caches_lock:
+        cache = _global_caches.get(key)
+        if cache is None:
+            cache = SelectorCache(path, **settings)
+            _global_caches[key] = cache
+        return cache
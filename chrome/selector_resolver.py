@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多选择器元素解析
+每次轮询注入一个脚本按顺序检查全部选择器（XPath、#id、.class、CSS），返回第一个命中的元素和选择器；
+整个选择器列表共用一个截止时间，不再为每个选择器单独等待，也不受implicitly_wait影响
+"""
+
+import time
+
+# 返回 [命中的选择器序号, 元素]，均未命中时返回null
+RESOLVE_SELECTORS_JS = """function(selectors) {
+    function resolve(selector) {
+        try {
+            if (selector.startsWith('//') || selector.startsWith('(/')) {
+                return document.evaluate(selector, document, null,
+                    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            }
+            if (/^#[\\w-]+$/.test(selector)) {
+                return document.getElementById(selector.slice(1));
+            }
+            if (/^\\.[\\w-]+$/.test(selector)) {
+                return document.getElementsByClassName(selector.slice(1))[0] || null;
+            }
+            return document.querySelector(selector);
+        } catch (e) {
+            return null;
+        }
+    }
+    for (var i = 0; i < selectors.length; i++) {
+        var element = resolve(selectors[i]);
+        if (element) {
+            return [i, element];
+        }
+    }
+    return null;
+}"""
+
+SELENIUM_RESOLVE_SCRIPT = "return (" + RESOLVE_SELECTORS_JS + ")(arguments[0]);"
+
+def resolve_selectors(driver, selectors, timeout=15, poll_interval=0.1):
+    """
+    在截止时间内轮询查找元素
+
+    Args:
+        driver: WebDriver
+        selectors: 选择器列表（按优先级排列）
+        timeout: 整个列表的等待时间（秒）
+        poll_interval: 轮询间隔（秒）
+
+    Returns:
+        (元素, 命中的选择器)，超时未找到返回 (None, None)
+    """
+    if isinstance(selectors, str):
+        selectors = [selectors]
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            match = driver.execute_script(SELENIUM_RESOLVE_SCRIPT, list(selectors))
+        except Exception:
+            # 页面跳转中脚本可能执行失败，下次轮询重试
+            match = None
+        if match:
+            index, element = match
+            return element, selectors[index]
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None, None
+        time.sleep(min(poll_interval, remaining))
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程分片执行器
+每个子进程负责固定的一组Chrome实例并运行自己的TaskQueueManager（通道调度器），
+父进程通过进程间队列派发任务并汇总结果，避免所有实例争用同一个GIL
+"""
+
+import re
+import time
+import threading
+import multiprocessing
+from queue import Empty
+from collections import deque
+from execution_lanes import is_any_instance
+
+# 子进程内重试任务的ID格式（与TaskQueueManager._schedule_retry一致）
+_RETRY_SUFFIX = re.compile(r"^(.*)_retry_\d+$")
+# 等待结果时检查子进程存活的间隔（秒）
+DEAD_SHARD_CHECK_INTERVAL = 1.0
+# 关闭时等待子进程退出的时间（秒）
+SHUTDOWN_TIMEOUT = 10
+
+def assign_shards(chrome_instances, num_shards):
+    """
+    将Chrome实例固定分配到各分片
+
+    Returns:
+        {chrome_num: 分片序号}
+    """
+    return {chrome_num: i % num_shards for i, chrome_num in enumerate(sorted(chrome_instances))}
+
+def _run_shard(shard_index, chrome_instances, config, max_workers, task_queue, result_queue):
+    """子进程入口：运行本分片的任务调度循环"""
+    from task_queue_manager import TaskQueueManager
+
+    config = dict(config)
+    config["chrome_instances"] = chrome_instances
+    # 任务日志、Redis队列、任务去重和结果文件由父进程负责，子进程只执行任务；
+    # 多个进程不能同时写同一个结果文件或选择器缓存文件
+    config["journal_file"] = None
+    config["redis_queue"] = None
+    config["task_dedup"] = None
+    config["result_sink"] = None
+    config["selector_cache"] = None
+
+    manager = TaskQueueManager(max_workers=max_workers, config_file=config)
+    manager.add_result_listener(
+        lambda state, result: result_queue.put(("result", shard_index, state, result))
+    )
+
+    def feed_tasks():
+        while True:
+            task = task_queue.get()
+            if task is None:
+                manager.finish()
+                return
+            manager.enqueue_task(task, force=True)
+
+    feeder = threading.Thread(target=feed_tasks, daemon=True)
+    feeder.start()
+
+    try:
+        manager.run_tasks(keep_alive=True)
+    finally:
+        result_queue.put(("done", shard_index, None, None))
+
+class ShardedTaskRunner:
+    def __init__(self, num_shards, chrome_instances, config=None, workers_per_shard=None, shard_target=_run_shard):
+        """
+        初始化分片执行器
+
+        Args:
+            num_shards: 子进程数
+            chrome_instances: 参与执行的Chrome实例编号
+            config: 传给子进程TaskQueueManager的配置字典
+            workers_per_shard: 每个子进程的并发数，默认为分片内的实例数
+            shard_target: 子进程入口，参数与_run_shard相同（需可被pickle）
+        """
+        self.num_shards = max(1, min(num_shards, len(chrome_instances) or 1))
+        self.shard_map = assign_shards(chrome_instances, self.num_shards)
+        self.config = config or {}
+        self.workers_per_shard = workers_per_shard
+        self.shard_target = shard_target
+
+        # 各分片已派发但未完成的任务数，用于分配任意实例任务
+        self.outstanding = [0] * self.num_shards
+        # 已派发未完成的任务：原任务ID -> (分片序号, 任务)
+        self.submitted = {}
+        # 子进程异常退出时为其未完成任务生成的失败结果
+        self.ready = deque()
+        self.running = set()
+
+        # 使用spawn，与Windows上的行为一致
+        self.context = multiprocessing.get_context("spawn")
+        self.task_queues = []
+        self.result_queue = None
+        self.processes = []
+
+    @property
+    def in_flight(self):
+        """已派发但尚未返回结果的任务数"""
+        return len(self.submitted)
+
+    def shard_workers(self, shard_index):
+        """分片的并发数"""
+        instances = [num for num, shard in self.shard_map.items() if shard == shard_index]
+        return self.workers_per_shard or max(1, len(instances))
+
+    def start(self):
+        """启动子进程"""
+        self.result_queue = self.context.Queue()
+        for shard_index in range(self.num_shards):
+            instances = [num for num, shard in self.shard_map.items() if shard == shard_index]
+
+            task_queue = self.context.Queue()
+            process = self.context.Process(
+                target=self.shard_target,
+                args=(shard_index, instances, self.config, self.shard_workers(shard_index),
+                      task_queue, self.result_queue),
+                name=f"shard-{shard_index}",
+                daemon=True
+            )
+            process.start()
+
+            self.task_queues.append(task_queue)
+            self.processes.append(process)
+            self.running.add(shard_index)
+            print(f"🧩 分片 {shard_index} 已启动 (PID: {process.pid}, 实例: {instances})")
+
+    def submit(self, task):
+        """按实例将任务派发到对应分片，任意实例任务派发给积压最少的分片"""
+        chrome_num = task["chrome_num"]
+        if is_any_instance(chrome_num):
+            shard_index = self.outstanding.index(min(self.outstanding))
+        else:
+            if chrome_num not in self.shard_map:
+                # 新出现的实例固定分配给当前积压最少的分片
+                self.shard_map[chrome_num] = self.outstanding.index(min(self.outstanding))
+            shard_index = self.shard_map[chrome_num]
+
+        self.outstanding[shard_index] += 1
+        self.submitted[task.get("retry_of", task["task_id"])] = (shard_index, task)
+        self.task_queues[shard_index].put(task)
+        return shard_index
+
+    def _take_submitted(self, task_id):
+        """按结果中的任务ID找到派发的任务（子进程内的重试任务ID带_retry_N后缀）"""
+        entry = self.submitted.pop(task_id, None)
+        if entry is None:
+            match = _RETRY_SUFFIX.match(task_id)
+            if match:
+                entry = self.submitted.pop(match.group(1), None)
+        if entry is not None:
+            self.outstanding[entry[0]] -= 1
+        return entry
+
+    def get_result(self, timeout=None):
+        """
+        等待下一个任务结果
+
+        Returns:
+            (任务, state, result)，超时返回None
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            if self.ready:
+                return self.ready.popleft()
+            if not self.submitted:
+                return None
+
+            wait_time = DEAD_SHARD_CHECK_INTERVAL
+            if deadline is not None:
+                wait_time = min(wait_time, deadline - time.monotonic())
+                if wait_time <= 0:
+                    return None
+            try:
+                kind, shard_index, state, result = self.result_queue.get(timeout=wait_time)
+            except Empty:
+                self._check_shards()
+                continue
+
+            if kind == "done":
+                self._shard_exited(shard_index)
+                continue
+            entry = self._take_submitted(result["task_id"])
+            if entry is None:
+                print(f"⚠️ 收到未知任务的结果: {result['task_id']}")
+                continue
+            return entry[1], state, result
+
+    def _check_shards(self):
+        """发现异常退出（未发送done）的子进程"""
+        for shard_index in list(self.running):
+            if not self.processes[shard_index].is_alive():
+                self._shard_exited(shard_index)
+
+    def _shard_exited(self, shard_index):
+        """子进程退出，其未完成的任务记为失败"""
+        self.running.discard(shard_index)
+        lost = [task_id for task_id, (index, _) in self.submitted.items() if index == shard_index]
+        if lost:
+            print(f"❌ 分片 {shard_index} 已退出，{len(lost)} 个任务未完成")
+        for task_id in lost:
+            _, task = self._take_submitted(task_id)
+            self.ready.append((task, "failed", {
+                "task_id": task["task_id"],
+                "chrome_num": task["chrome_num"],
+                "status": "failed",
+                "error": f"分片 {shard_index} 进程已退出",
+                "error_type": "shard_exited",
+                "completed_at": time.time()
+            }))
+
+    def close(self):
+        """通知子进程执行完已派发的任务后退出，并等待其结束"""
+        for shard_index in self.running:
+            self.task_queues[shard_index].put(None)
+
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        while self.running and time.monotonic() < deadline:
+            try:
+                kind, shard_index, _, _ = self.result_queue.get(timeout=DEAD_SHARD_CHECK_INTERVAL)
+            except Empty:
+                self._check_shards()
+                continue
+            if kind == "done":
+                self.running.discard(shard_index)
+
+        for process in self.processes:
+            process.join(timeout=SHUTDOWN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+
+    def run(self, tasks, max_in_flight=None):
+        """
+        执行任务并逐个产出结果，同时在途的任务数有上限，任务按需从tasks中读取
+
+        Args:
+            tasks: 任务字典的可迭代对象
+            max_in_flight: 同时派发的最大任务数，默认为所有分片并发数之和的两倍
+
+        Yields:
+            (任务, state, result)，state为completed、failed或skipped
+        """
+        if max_in_flight is None:
+            max_in_flight = sum(self.shard_workers(i) for i in range(self.num_shards)) * 2
+        tasks = iter(tasks)
+        exhausted = False
+
+        self.start()
+        try:
+            while True:
+                while not exhausted and self.in_flight < max_in_flight:
+                    task = next(tasks, None)
+                    if task is None:
+                        exhausted = True
+                        break
+                    self.submit(task)
+
+                item = self.get_result()
+                if item is None:
+                    if exhausted:
+                        return
+                    continue
+                yield item
+        finally:
+            self.close()
@@ -15,8 +15,7 @@ from close_specific_chrome import SpecificChromeCloser
 from graceful_chrome_closer import GracefulChromeCloser
 from batch_chrome_launcher import ChromeBatchLauncher
 from auto_dialog_handler import ChromeDialogHandler
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from webdriver_pool import get_session_pool
 
 class SmartChromeManager:
     def __init__(self):
@@ -76,14 +75,8 @@ class SmartChromeManager:
     def get_tab_count(self, chrome_num):
         """获取Chrome实例的标签页数量"""
         try:
-            chrome_options = Options()
-            chrome_options.add_experimental_option('debuggerAddress', f'127.0.0.1:{10000 + chrome_num}')
-            
-            driver = webdriver.Chrome(options=chrome_options)
-            tab_count = len(driver.window_handles)
-            driver.quit()
-            
-            return tab_count
+            with get_session_pool().session(10000 + chrome_num) as driver:
+                return len(driver.window_handles)
         except Exception as e:
             print(f"  ⚠️ 无法获取Chrome_{chrome_num}标签页数量: {e}")
             return 0
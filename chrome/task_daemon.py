@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务守护进程
+常驻的TaskQueueManager服务：调度循环以keep_alive模式持续运行，WebDriver会话池和配置保持加载，
+通过本机HTTP接口提交任务、查询状态和获取结果，省去每个小批次启动进程、导入Selenium和重连实例的开销
+
+接口:
+  POST /tasks              提交任务（单个任务、任务列表或 {"tasks": [...]}，格式同sample_tasks.json）
+  GET  /status             调度器状态报告
+  GET  /results            结果（?since=序号&wait=秒 长轮询，?task_id=a,b 过滤，?stream=1 持续推送JSONL）
+  POST /shutdown           停止服务（?drain=1 执行完已提交的任务后停止）
+"""
+
+import time
+import json
+import threading
+import urllib.error
+import urllib.request
+from collections import deque
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from queue import Full
+
+from task_loader import validate_task_config
+from task_queue_manager import TaskQueueManager, TASK_OPTIONS
+
+def matches_task(result, task_ids):
+    """结果是否属于指定任务（含其重试）"""
+    task_id = result.get("task_id", "")
+    return any(task_id == wanted or task_id.startswith(f"{wanted}_retry_") for wanted in task_ids)
+
+class TaskDaemon:
+    def __init__(self, manager=None, host="127.0.0.1", port=8765, max_workers=5, config_file=None,
+                 result_buffer=10000, include_actions=False):
+        """
+        初始化任务守护进程
+
+        Args:
+            manager: 已创建的TaskQueueManager，None时按max_workers和config_file创建
+            host: 监听地址（默认只接受本机连接）
+            port: 监听端口，0表示随机端口
+            max_workers: 最大并发数
+            config_file: 配置文件路径或配置字典
+            result_buffer: 内存中保留的最近结果数
+            include_actions: 结果中是否包含逐个动作的结果
+        """
+        self.manager = manager or TaskQueueManager(max_workers=max_workers, config_file=config_file)
+        self.include_actions = include_actions
+
+        # 最近的任务结果 (序号, 结果)，供长轮询和流式读取
+        self.results = deque(maxlen=result_buffer)
+        self.next_seq = 1
+        self.results_changed = threading.Condition()
+        self.manager.add_result_listener(self._on_result)
+        
+        # 已接受的任务ID，重复提交的任务被拒绝（启用任务日志时日志中登记过的任务同样被拒绝）
+        self.submitted_task_ids = set()
+        self.submit_lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.runner = None
+        self.stopping = threading.Event()
+        self.closed = False
+        self.close_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _on_result(self, state, result):
+        """任务到达终态（调度线程）"""
+        if not self.include_actions:
+            result = {key: value for key, value in result.items() if key != "results"}
+        with self.results_changed:
+            self.results.append((self.next_seq, dict(result, state=state, seq=self.next_seq)))
+            self.next_seq += 1
+            self.results_changed.notify_all()
+
+    def submit(self, task_configs):
+        """
+        提交任务
+
+        Returns:
+            (已接受的任务ID列表, 被拒绝的任务列表 [{"task_id", "error"}])
+        """
+        accepted, rejected = [], []
+        with self.submit_lock:
+            for task_config in task_configs:
+                error = validate_task_config(task_config)
+                task_id = task_config.get("task_id") if isinstance(task_config, dict) else None
+                if error:
+                    rejected.append({"task_id": task_id, "error": error})
+                    continue
+                if task_id in self.submitted_task_ids:
+                    rejected.append({"task_id": task_id, "error": "duplicate_task_id"})
+                    continue
+                try:
+                    added = self.manager.add_task(
+                        task_id,
+                        task_config["chrome_num"],
+                        task_config["actions"],
+                        task_config.get("priority", 1),
+                        task_config.get("metadata"),
+                        block=False,
+                        **{key: task_config[key] for key in TASK_OPTIONS if key in task_config}
+                    )
+                    if added:
+                        accepted.append(task_id)
+                        self.submitted_task_ids.add(task_id)
+                    else:
+                        rejected.append({"task_id": task_id, "error": "duplicate_task_id"})
+                except Full:
+                    rejected.append({"task_id": task_id, "error": "queue_full"})
+                except ValueError as e:
+                    rejected.append({"task_id": task_id, "error": str(e)})
+        return accepted, rejected
+
+    def get_results(self, since=0, task_ids=None, wait=0):
+        """
+        获取序号大于since的结果，没有时最多等待wait秒
+
+        Returns:
+            (结果列表, 下次查询使用的since, 是否有结果因缓冲区已满被丢弃)
+        """
+        deadline = time.time() + wait
+        with self.results_changed:
+            while True:
+                results = [result for seq, result in self.results if seq > since]
+                if task_ids:
+                    results = [result for result in results if matches_task(result, task_ids)]
+                remaining = deadline - time.time()
+                if results or remaining <= 0 or self.stopping.is_set():
+                    break
+                self.results_changed.wait(remaining)
+
+            dropped = bool(self.results) and self.results[0][0] > since + 1
+            return results, self.next_seq - 1, dropped
+
+    def start(self):
+        """启动调度循环和HTTP服务（后台线程）"""
+        self.runner = threading.Thread(target=self.manager.run_tasks, kwargs={"keep_alive": True}, daemon=True)
+        self.runner.start()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"🛰️ 任务守护进程已启动: {self.url}")
+
+    def serve_forever(self):
+        """启动并阻塞直到收到停止请求或Ctrl+C"""
+        self.start()
+        try:
+            while self.runner.is_alive():
+                self.runner.join(1)
+        except KeyboardInterrupt:
+            print("\n⏹️ 收到中断信号，停止守护进程")
+            self.shutdown(drain=False)
+        self._close()
+
+    def shutdown(self, drain=True):
+        """
+        停止服务
+
+        Args:
+            drain: 执行完已提交的任务后再停止调度循环
+        """
+        self.stopping.set()
+        with self.results_changed:
+            self.results_changed.notify_all()
+        if drain:
+            self.manager.finish()
+        else:
+            self.manager.stop()
+        if self.runner:
+            self.runner.join()
+        self._close()
+
+    def _close(self):
+        with self.close_lock:
+            if self.closed:
+                return
+            self.closed = True
+        if self.runner:
+            self.server.shutdown()
+        self.server.server_close()
+        if self.manager.result_sink:
+            self.manager.result_sink.close()
+        print("🛑 任务守护进程已停止")
+
+    def _make_handler(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path == "/status":
+                    self._send_json(200, daemon.manager.get_status_report())
+                elif url.path == "/results":
+                    try:
+                        since = int(query.get("since", ["0"])[0])
+                        wait = min(float(query.get("wait", ["0"])[0]), 300)
+                    except ValueError as e:
+                        self._send_json(400, {"error": f"参数错误: {e}"})
+                        return
+                    task_ids = [t for t in ",".join(query.get("task_id", [])).split(",") if t]
+                    if query.get("stream", ["0"])[0] == "1":
+                        self._stream_results(since, task_ids)
+                    else:
+                        results, last_seq, dropped = daemon.get_results(since, task_ids, wait)
+                        self._send_json(200, {"results": results, "next": last_seq, "dropped": dropped})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def _stream_results(self, since, task_ids):
+                """持续推送结果（每行一个JSON），客户端断开或服务停止时结束"""
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+                self.end_headers()
+                try:
+                    while not daemon.stopping.is_set():
+                        results, since, _ = daemon.get_results(since, task_ids, wait=5)
+                        for result in results:
+                            self.wfile.write((json.dumps(result, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path == "/tasks":
+                    try:
+                        length = int(self.headers.get("Content-Length", 0))
+                        payload = json.loads(self.rfile.read(length).decode("utf-8"))
+                    except (ValueError, UnicodeDecodeError) as e:
+                        self._send_json(400, {"error": f"JSON格式错误: {e}"})
+                        return
+                    if isinstance(payload, dict):
+                        payload = payload.get("tasks", [payload])
+                    if not isinstance(payload, list):
+                        self._send_json(400, {"error": "请求应为任务、任务列表或 {\"tasks\": [...]}"})
+                        return
+                    if daemon.stopping.is_set():
+                        self._send_json(503, {"error": "守护进程正在停止"})
+                        return
+                    accepted, rejected = daemon.submit(payload)
+                    queue_full = any(item["error"] == "queue_full" for item in rejected)
+                    status = 200 if accepted or not rejected else (429 if queue_full else 400)
+                    self._send_json(status, {"accepted": accepted, "rejected": rejected})
+                elif url.path == "/shutdown":
+                    drain = query.get("drain", ["1"])[0] == "1"
+                    self._send_json(200, {"stopping": True, "drain": drain})
+                    threading.Thread(target=daemon.shutdown, args=(drain,), daemon=True).start()
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+        return Handler
+
+class TaskDaemonClient:
+    def __init__(self, url="http://127.0.0.1:8765", timeout=30):
+        """
+        任务守护进程客户端
+
+        Args:
+            url: 守护进程地址
+            timeout: 请求超时（秒）
+        """
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, path, payload=None, timeout=None):
+        data = None
+        headers = {}
+        if payload is not None:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        request = urllib.request.Request(self.url + path, data=data, headers=headers,
+                                         method="POST" if data is not None else "GET")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            return json.loads(e.read().decode("utf-8"))
+
+    def submit(self, tasks):
+        """提交任务，返回 {"accepted": [...], "rejected": [...]}"""
+        return self._request("/tasks", {"tasks": list(tasks)})
+
+    def status(self):
+        return self._request("/status")
+
+    def results(self, since=0, task_ids=None, wait=0):
+        path = f"/results?since={since}&wait={wait}"
+        if task_ids:
+            path += "&task_id=" + ",".join(task_ids)
+        return self._request(path, timeout=wait + self.timeout)
+
+    def wait_for(self, task_ids, timeout=None):
+        """
+        等待指定任务全部到达终态
+
+        Returns:
+            {task_id: 结果}，超时时只包含已结束的任务
+        """
+        pending = set(task_ids)
+        finished = {}
+        since = 0
+        deadline = time.time() + timeout if timeout else None
+        while pending:
+            wait = 30 if deadline is None else min(30, deadline - time.time())
+            if wait <= 0:
+                break
+            response = self.results(since, sorted(pending), wait)
+            since = response["next"]
+            for result in response["results"]:
+                for task_id in list(pending):
+                    if matches_task(result, [task_id]):
+                        finished[task_id] = result
+                        pending.discard(task_id)
+        return finished
+
+    def shutdown(self, drain=True):
+        return self._request(f"/shutdown?drain={1 if drain else 0}", {})
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='任务守护进程')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口')
+    parser.add_argument('--workers', type=int, default=5, help='最大并发数')
+    parser.add_argument('--config', help='配置文件')
+
+    args = parser.parse_args()
+
+    daemon = TaskDaemon(host=args.host, port=args.port, max_workers=args.workers, config_file=args.config)
+    daemon.serve_forever()
+
+if __name__ == "__main__":
+    main()
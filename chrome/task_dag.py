@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务依赖图
+任务通过depends_on声明依赖的任务ID，所有依赖成功完成后才进入调度队列；
+任一依赖最终失败时，下游任务直接跳过而不执行
+"""
+
+import threading
+
+class TaskDependencyGraph:
+    def __init__(self):
+        """初始化依赖图"""
+        self.waiting = {}      # 任务ID -> 等待依赖的任务
+        self.remaining = {}    # 任务ID -> 尚未完成的依赖ID集合
+        self.children = {}     # 依赖ID -> 等待它的任务ID集合
+        self.finished = {}     # 已到达终态的任务ID -> 是否成功
+        self.lock = threading.Lock()
+
+    def add(self, task):
+        """
+        登记任务
+
+        Returns:
+            ("ready", None)      依赖已全部成功（或没有依赖），可以入队
+            ("waiting", None)    等待依赖完成
+            ("skipped", 依赖ID)  某个依赖已失败
+        """
+        task_id = task["task_id"]
+        depends_on = task.get("depends_on") or []
+        if task_id in depends_on:
+            raise ValueError(f"任务不能依赖自身: {task_id}")
+
+        with self.lock:
+            remaining = set()
+            for parent_id in depends_on:
+                succeeded = self.finished.get(parent_id)
+                if succeeded is False:
+                    return "skipped", parent_id
+                if succeeded is None:
+                    remaining.add(parent_id)
+
+            if not remaining:
+                return "ready", None
+
+            self.waiting[task_id] = task
+            self.remaining[task_id] = remaining
+            for parent_id in remaining:
+                self.children.setdefault(parent_id, set()).add(task_id)
+            return "waiting", None
+
+    def resolve(self, task_id, succeeded):
+        """
+        任务到达终态
+
+        Args:
+            task_id: 任务ID（重试任务使用原任务ID）
+            succeeded: 是否成功完成
+
+        Returns:
+            (依赖已全部满足的任务列表, 因本任务失败而需要跳过的任务列表)
+        """
+        ready = []
+        skipped = []
+        with self.lock:
+            self.finished[task_id] = succeeded
+            for child_id in self.children.pop(task_id, ()):
+                child = self.waiting.get(child_id)
+                if child is None:
+                    continue
+
+                if not succeeded:
+                    skipped.append(self._remove(child_id))
+                    continue
+
+                remaining = self.remaining[child_id]
+                remaining.discard(task_id)
+                if not remaining:
+                    ready.append(self._remove(child_id))
+
+        return ready, skipped
+
+    def _remove(self, task_id):
+        task = self.waiting.pop(task_id)
+        for parent_id in self.remaining.pop(task_id):
+            siblings = self.children.get(parent_id)
+            if siblings is not None:
+                siblings.discard(task_id)
+                if not siblings:
+                    del self.children[parent_id]
+        return task
+
+    def unresolved(self):
+        """
+        仍在等待依赖的任务
+
+        Returns:
+            {任务ID: [未完成的依赖ID]}
+        """
+        with self.lock:
+            return {task_id: sorted(remaining) for task_id, remaining in self.remaining.items()}
+
+    def __len__(self):
+        return len(self.waiting)
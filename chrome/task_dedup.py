@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务去重与合并
+按任务内容计算幂等键：
+- 相同键的任务在排队或执行中时，后来的任务不再执行，直接共享首个任务（领头任务）的结果
+- 成功结果在一段时间内缓存，重复提交立即返回缓存结果
+重试任务沿用领头任务的身份，不参与去重
+"""
+
+import time
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+def compute_idempotency_key(task):
+    """
+    计算任务幂等键：任务指定了idempotency_key时直接使用，
+    否则为Chrome实例和动作序列的内容哈希（任意实例任务不区分实例）
+    """
+    if task.get("idempotency_key"):
+        return str(task["idempotency_key"])
+
+    content = json.dumps(
+        {"chrome_num": task["chrome_num"], "actions": task["actions"]},
+        sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+class TaskDeduplicator:
+    def __init__(self, result_ttl=600, max_cache_size=100000, clock=time.monotonic):
+        """
+        初始化任务去重器
+
+        Args:
+            result_ttl: 成功结果的缓存秒数，0表示不缓存
+            max_cache_size: 最多缓存的结果数
+            clock: 时钟函数
+        """
+        self.result_ttl = result_ttl
+        self.max_cache_size = max_cache_size
+        self.clock = clock
+
+        self.leaders = {}           # 幂等键 -> 领头任务ID
+        self.followers = {}         # 幂等键 -> [等待领头任务结果的任务]
+        self.cache = OrderedDict()  # 幂等键 -> (过期时间, 结果)
+        self.lock = threading.Lock()
+
+        self.cache_hits = 0
+        self.coalesced = 0
+
+    def admit(self, task):
+        """
+        登记新任务
+
+        Returns:
+            ("run", None)        需要执行（成为领头任务）
+            ("cached", 结果)     命中结果缓存
+            ("coalesced", 领头任务ID) 已合并到执行中的相同任务
+        """
+        key = compute_idempotency_key(task)
+        task["idempotency_key"] = key
+
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                if cached[0] > self.clock():
+                    self.cache_hits += 1
+                    return "cached", cached[1]
+                del self.cache[key]
+
+            leader_id = self.leaders.get(key)
+            if leader_id is not None:
+                self.followers.setdefault(key, []).append(task)
+                self.coalesced += 1
+                return "coalesced", leader_id
+
+            self.leaders[key] = task["task_id"]
+            return "run", None
+
+    def is_leader(self, task):
+        """任务（或其重试）是否为某个幂等键的领头任务"""
+        key = task.get("idempotency_key")
+        if key is None:
+            return False
+        with self.lock:
+            return self.leaders.get(key) == task.get("retry_of", task["task_id"])
+
+    def complete(self, task, state, result):
+        """
+        领头任务到达终态
+
+        Returns:
+            合并到该任务的其他任务列表
+        """
+        key = task["idempotency_key"]
+        with self.lock:
+            self.leaders.pop(key, None)
+            followers = self.followers.pop(key, [])
+
+            if state == "completed" and self.result_ttl > 0:
+                self.cache[key] = (self.clock() + self.result_ttl, result)
+                self.cache.move_to_end(key)
+                self._evict()
+
+        return followers
+
+    def _evict(self):
+        now = self.clock()
+        while self.cache:
+            key, (expires_at, _) = next(iter(self.cache.items()))
+            if expires_at > now and len(self.cache) <= self.max_cache_size:
+                break
+            del self.cache[key]
+
+    def get_stats(self):
+        """去重统计"""
+        with self.lock:
+            return {
+                "leaders": len(self.leaders),
+                "waiting_followers": sum(len(tasks) for tasks in self.followers.values()),
+                "cached_results": len(self.cache),
+                "cache_hits": self.cache_hits,
+                "coalesced": self.coalesced
+            }
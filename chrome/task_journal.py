@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务日志（SQLite预写日志）
+记录任务状态变化，进程崩溃或中断后可恢复未完成的任务并跳过已完成的任务
+"""
+
+import time
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+# 可恢复（需要重新执行）的任务状态
+RECOVERABLE_STATES = ("pending", "running")
+# 终态
+FINAL_STATES = ("completed", "failed", "retried", "skipped")
+
+class TaskJournal:
+    def __init__(self, db_file, batch_size=200, flush_interval=1.0):
+        """
+        初始化任务日志
+
+        Args:
+            db_file: SQLite数据库文件路径
+            batch_size: 缓冲多少条记录后写入一次
+            flush_interval: 距离上次写入超过该秒数时写入
+        """
+        self.db_file = Path(db_file)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.buffer = []
+        self.last_flush = time.time()
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                task TEXT,
+                result TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+        # 之前运行中已登记过的任务，重新添加时跳过
+        self.known_task_ids = {row[0] for row in self.conn.execute("SELECT task_id FROM tasks")}
+
+    def record(self, task_id, state, task=None, result=None):
+        """
+        登记任务状态变化（先写入缓冲区，批量提交）
+
+        Args:
+            task_id: 任务ID
+            state: 新状态 (pending, running, completed, failed, retried, skipped)
+            task: 任务字典，登记后可用于恢复
+            result: 结果摘要字典
+        """
+        entry = (
+            task_id,
+            state,
+            json.dumps(task, ensure_ascii=False) if task is not None else None,
+            json.dumps(result, ensure_ascii=False) if result is not None else None,
+            time.time()
+        )
+        with self.lock:
+            self.buffer.append(entry)
+            should_flush = (len(self.buffer) >= self.batch_size or
+                            time.time() - self.last_flush >= self.flush_interval)
+        if should_flush:
+            self.flush()
+
+    def flush_if_due(self):
+        """距离上次写入超过flush_interval时写入"""
+        if self.buffer and time.time() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """在一个事务中写入所有缓冲的记录"""
+        with self.lock:
+            entries, self.buffer = self.buffer, []
+            self.last_flush = time.time()
+            if not entries:
+                return
+            try:
+                with self.conn:
+                    self.conn.executemany("""
+                        INSERT INTO tasks (task_id, state, task, result, updated_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(task_id) DO UPDATE SET
+                            state = excluded.state,
+                            task = COALESCE(excluded.task, tasks.task),
+                            result = COALESCE(excluded.result, tasks.result),
+                            updated_at = excluded.updated_at
+                    """, entries)
+            except sqlite3.Error as e:
+                print(f"❌ 写入任务日志失败: {e}")
+
+    def load_recoverable_tasks(self):
+        """
+        读取需要恢复的任务（待执行及中断时正在执行的任务）
+
+        Returns:
+            任务字典列表，按登记顺序排列
+        """
+        self.flush()
+        placeholders = ",".join("?" * len(RECOVERABLE_STATES))
+        rows = self.conn.execute(
+            f"SELECT task FROM tasks WHERE state IN ({placeholders}) AND task IS NOT NULL ORDER BY rowid",
+            RECOVERABLE_STATES
+        )
+
+        tasks = []
+        for (payload,) in rows:
+            task = json.loads(payload)
+            task["status"] = "pending"
+            task.pop("started_at", None)
+            task.pop("assigned_chrome", None)
+            tasks.append(task)
+        return tasks
+
+    def get_final_state(self, task_id):
+        """
+        查询任务（含其重试任务）最近一次登记的状态
+
+        Returns:
+            状态字符串，未登记时返回None
+        """
+        self.flush()
+        retry_prefix = f"{task_id}_retry_"
+        row = self.conn.execute(
+            "SELECT state FROM tasks WHERE task_id = ? OR substr(task_id, 1, ?) = ? "
+            "ORDER BY updated_at DESC LIMIT 1",
+            (task_id, len(retry_prefix), retry_prefix)
+        ).fetchone()
+        return row[0] if row else None
+
+    def state_counts(self):
+        """各状态的任务数"""
+        self.flush()
+        return dict(self.conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state"))
+
+    def close(self):
+        """写入剩余记录并关闭数据库"""
+        self.flush()
+        with self.lock:
+            self.conn.close()
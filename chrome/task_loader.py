@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量任务流式加载
+逐条读取任务文件（JSON数组、JSONL，均支持gzip压缩），读取时才校验任务，
+调度循环按需从任务来源补充队列，大文件无需整体载入内存
+"""
+
+import gzip
+import json
+from pathlib import Path
+
+# 每次从文件读取的字符数
+READ_CHUNK_SIZE = 1 << 16
+# 最多打印多少条无效任务的详情
+MAX_INVALID_REPORTS = 10
+
+def open_task_file(path):
+    """以文本方式打开任务文件，.gz结尾时自动解压"""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+def is_jsonl_file(path):
+    """根据扩展名判断是否为JSONL文件（忽略.gz）"""
+    path = Path(path)
+    if path.suffix == ".gz":
+        path = path.with_suffix("")
+    return path.suffix in (".jsonl", ".ndjson")
+
+def iter_json_array(f, chunk_size=READ_CHUNK_SIZE):
+    """逐个解析JSON数组中的元素，不读入整个数组"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("任务文件应为JSON数组")
+    buffer = buffer[1:]
+    eof = False
+
+    while True:
+        buffer = buffer.lstrip()
+        if buffer.startswith(','):
+            buffer = buffer[1:].lstrip()
+        if buffer.startswith(']'):
+            return
+
+        if buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield item
+                buffer = buffer[end:]
+                continue
+        elif eof:
+            raise ValueError("JSON数组不完整")
+
+        # 当前缓冲区内没有完整的元素，继续读取
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+
+def iter_jsonl(f):
+    """逐行解析JSONL，跳过空行，无法解析的行返回None"""
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield None
+
+def validate_task_config(task_config):
+    """
+    校验单个任务配置
+
+    Returns:
+        错误描述，有效时返回None
+    """
+    if task_config is None:
+        return "JSON格式错误"
+    if not isinstance(task_config, dict):
+        return "任务配置应为字典"
+    for key in ("task_id", "chrome_num", "actions"):
+        if key not in task_config:
+            return f"缺少字段: {key}"
+    actions = task_config["actions"]
+    if not isinstance(actions, list) or not actions:
+        return "actions应为非空列表"
+    for i, action in enumerate(actions):
+        if not isinstance(action, dict) or "type" not in action:
+            return f"第{i+1}个动作缺少type"
+    return None
+
+class TaskSource:
+    def __init__(self, source, progress_interval=10000):
+        """
+        初始化任务来源
+
+        Args:
+            source: 任务文件路径（.json/.jsonl，可带.gz）或任务配置的可迭代对象
+            progress_interval: 每载入多少个任务打印一次进度，0表示不打印
+        """
+        self.source = source
+        self.name = str(source) if isinstance(source, (str, Path)) else "任务列表"
+        self.progress_interval = progress_interval
+        self.loaded = 0
+        self.invalid = 0
+        self.exhausted = False
+        self.iterator = self._iter_valid()
+
+    def _iter_raw(self):
+        if not isinstance(self.source, (str, Path)):
+            yield from self.source
+            return
+
+        with open_task_file(self.source) as f:
+            if is_jsonl_file(self.source):
+                yield from iter_jsonl(f)
+            else:
+                yield from iter_json_array(f)
+
+    def _iter_valid(self):
+        for index, task_config in enumerate(self._iter_raw()):
+            error = validate_task_config(task_config)
+            if error:
+                self.invalid += 1
+                if self.invalid <= MAX_INVALID_REPORTS:
+                    print(f"⚠️ 跳过无效任务 ({self.name} 第{index+1}条): {error}")
+                continue
+
+            self.loaded += 1
+            if self.progress_interval and self.loaded % self.progress_interval == 0:
+                print(f"📥 已载入 {self.loaded} 个任务 ({self.name})")
+            yield task_config
+
+    def take(self, count):
+        """
+        读取最多count个有效任务配置
+
+        Returns:
+            任务配置列表，来源读完后exhausted为True
+        """
+        batch = []
+        while len(batch) < count and not self.exhausted:
+            try:
+                batch.append(next(self.iterator))
+            except StopIteration:
+                self.exhausted = True
+            except (OSError, ValueError) as e:
+                print(f"❌ 读取任务来源失败: {self.name} - {e}")
+                self.exhausted = True
+        return batch
+
+    def __iter__(self):
+        while not self.exhausted:
+            batch = self.take(1000)
+            yield from batch
@@ -8,10 +8,34 @@
 import time
 import json
 import threading
-from queue import Queue, Empty
+from queue import Queue, Full
+from collections import deque
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from web_automation_enhanced import EnhancedWebAutomation
+from task_scheduler import PriorityTaskScheduler, DelayedTaskQueue
+from execution_lanes import LaneScheduler, is_any_instance
+from webdriver_pool import get_session_pool
+from retry_policy import RetryPolicy
+from task_watchdog import TaskWatchdog
+from task_journal import TaskJournal
+from redis_task_queue import RedisTaskQueue
+from result_sink import ResultCounters, JsonlResultSink
+from task_loader import TaskSource, validate_task_config
+from task_dedup import TaskDeduplicator
+from rate_limiter import DomainRateLimiter
+from task_dag import TaskDependencyGraph
+from concurrency_controller import AdaptiveConcurrencyController
+from instance_health import InstanceHealthMonitor
+from selector_cache import get_selector_cache
+from resource_blocking import ResourcePolicy, WEBDRIVER_BLOCKING_NOTE
+from action_checkpoint import plan_resume, resume_failure
+
+# 任务配置中除基本字段外可选的任务级选项
+TASK_OPTIONS = ("task_timeout", "idempotency_key", "depends_on", "batch_actions", "resource_policy")
+
+class ChromeConnectionError(Exception):
+    """无法连接到Chrome实例"""
 
 class TaskQueueManager:
     def __init__(self, max_workers=5, config_file=None):
@@ -20,10 +44,9 @@ class TaskQueueManager:
         
         Args:
             max_workers: 最大并发工作线程数
-            config_file: 配置文件路径
+            config_file: 配置文件路径或配置字典
         """
         self.max_workers = max_workers
-        self.task_queue = Queue()
         self.result_queue = Queue()
         self.active_tasks = {}
         self.completed_tasks = []
@@ -31,37 +54,435 @@ class TaskQueueManager:
         
         # 加载配置
         self.config = self.load_config(config_file)
+        # 全局资源策略无效时立即报错，避免每个任务执行时失败
+        ResourcePolicy.resolve(self.config.get("resource_policy"), self.config.get("resource_policies"))
+        
+        # 可选的实例熔断与健康探测，熔断打开的实例不再获得任务
+        self.instance_health = None
+        health_config = self._feature_config("instance_health")
+        if health_config is not None:
+            self.instance_health = InstanceHealthMonitor(**health_config)
+        
+        # 按Chrome实例划分执行通道，通道内为优先级调度队列（支持老化和类别公平）
+        self.task_queue = LaneScheduler(
+            scheduler_factory=lambda: PriorityTaskScheduler(
+                aging_seconds=self.config.get("priority_aging_seconds", 60),
+                category_weights=self.config.get("category_weights")
+            ),
+            chrome_instances=self.config.get("chrome_instances"),
+            health=self.instance_health
+        )
         
         # 线程锁
         self.lock = threading.Lock()
         
+        # 等待重试的任务（到期后重新入队，不阻塞调度循环）
+        self.retry_queue = DelayedTaskQueue()
+        self.retry_policy = RetryPolicy.from_config(self.config)
+        
+        # 任务级超时看门狗
+        self.watchdog = TaskWatchdog(on_timeout=self._on_task_timeout)
+        self.expired_task_ids = set()
+        # 已记为超时但线程尚未退出的任务，线程退出前其实例通道保持繁忙
+        self.stuck_tasks = {}
+        
+        # 可选的SQLite任务日志，用于崩溃后恢复
+        self.journal = None
+        if self.config.get("journal_file"):
+            self.journal = TaskJournal(
+                self.config["journal_file"],
+                batch_size=self.config.get("journal_batch_size", 200),
+                flush_interval=self.config.get("journal_flush_interval", 1.0)
+            )
+        
+        # 可选的Redis共享队列，多台主机从同一队列领取任务
+        self.redis_queue = None
+        self.remote_task_ids = set()
+        self.last_remote_claim = 0
+        self.last_remote_heartbeat = 0
+        if self.config.get("redis_queue"):
+            self.attach_redis_queue(RedisTaskQueue(**self.config["redis_queue"]))
+        
+        # 按调试端口复用WebDriver会话
+        self.session_pool = None
+        if self.config.get("reuse_sessions", True):
+            self.session_pool = get_session_pool(**self.config.get("session_pool", {}))
+        
+        # 可选的选择器排名缓存，跨运行记录各页面上命中的选择器
+        self.selector_cache = None
+        cache_config = self._feature_config("selector_cache")
+        if cache_config is not None:
+            self.selector_cache = get_selector_cache(**cache_config)
+        
+        # 可选的自适应并发控制，max_workers作为并发上限
+        self.concurrency = None
+        concurrency_config = self._feature_config("adaptive_concurrency")
+        if concurrency_config is not None:
+            self.concurrency = AdaptiveConcurrencyController(max_workers, **concurrency_config)
+        
+        # 任务依赖图，依赖未完成的任务暂存于此
+        self.dependency_graph = TaskDependencyGraph()
+        
+        # 可选的任务去重：相同任务合并执行，成功结果短时间内缓存
+        self.deduplicator = None
+        dedup_config = self._feature_config("task_dedup")
+        if dedup_config is not None:
+            self.deduplicator = TaskDeduplicator(**dedup_config)
+        
+        # 可选的按域名限流，受限任务延后派发
+        self.rate_limiter = None
+        self.rate_limited_queue = DelayedTaskQueue()
+        if self.config.get("rate_limits"):
+            self.rate_limiter = DomainRateLimiter.from_config(self.config["rate_limits"])
+        
+        # 批量任务来源，调度循环按需从中补充队列
+        self.task_sources = []
+        
+        # 背压控制：待执行任务达到上限时add_task阻塞 (0表示不限制)
+        self.max_queue_size = self.config.get("max_queue_size", 0)
+        self.queue_not_full = threading.Condition()
+        
+        # 调度循环控制
+        self.wakeup_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.drain_event = threading.Event()
+        self.in_flight_count = 0
+        
+        # 任务到达终态时的回调 callback(state, result)
+        self.result_listeners = []
+        
+        # 结果汇总计数；启用result_sink时结果流式写入文件，不再保存在内存列表中
+        self.result_counters = ResultCounters()
+        self.result_sink = None
+        if self.config.get("result_sink"):
+            self.result_sink = JsonlResultSink(**self.config["result_sink"])
+        
+        if self.journal:
+            self.resume_from_journal()
+        
+    def _feature_config(self, key):
+        """
+        可选功能的参数字典
+        
+        Returns:
+            None或False表示未启用；True表示使用默认参数，返回{}；空字典同样表示启用
+        """
+        value = self.config.get(key)
+        if value is None or value is False:
+            return None
+        return {} if value is True else value
+    
     def load_config(self, config_file):
         """加载配置文件"""
+        if isinstance(config_file, dict):
+            return dict(config_file)
+        
         if config_file and Path(config_file).exists():
             with open(config_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
         
         # 默认配置
         return {
-            "task_timeout": 300,  # 5分钟
+            "task_timeout": 300,  # 单个任务超时 5分钟
+            "batch_timeout": None,  # 整批任务超时，None表示不限制
             "retry_failed_tasks": True,
+            "resume_from_checkpoint": True,
             "max_retries": 2,
             "retry_delay": 5,
+            "retry_policy": {
+                "multiplier": 2,
+                "max_delay": 300,
+                "jitter": 0.5,
+                "error_types": {
+                    "connect": {"base_delay": 15}
+                }
+            },
             "save_logs": True,
-            "log_directory": "logs"
+            "log_directory": "logs",
+            "journal_file": None,
+            "result_sink": None,
+            "task_dedup": None,
+            "rate_limits": None,
+            "adaptive_concurrency": None,
+            "instance_health": None,
+            "selector_cache": None,
+            "batch_actions": False,
+            "resource_policy": None,
+            "resource_policies": {},
+            "journal_batch_size": 200,
+            "journal_flush_interval": 1.0,
+            "redis_queue": None,
+            "redis_prefetch": None,
+            "redis_poll_interval": 1.0,
+            "max_queue_size": 0,
+            "batch_prefetch": None,
+            "load_progress_interval": 10000,
+            "dispatch_poll_interval": 0.5,
+            "priority_aging_seconds": 60,
+            "category_weights": {},
+            "chrome_instances": [],
+            "reuse_sessions": True,
+            "session_pool": {
+                "max_idle_seconds": 300,
+                "max_age_seconds": 1800
+            }
         }
     
-    def add_task(self, task_id, chrome_num, actions, priority=1, metadata=None):
+    def add_task(self, task_id, chrome_num, actions, priority=1, metadata=None, block=True, timeout=None,
+                 **options):
         """
         添加任务到队列
         
         Args:
             task_id: 任务唯一标识
-            chrome_num: Chrome实例编号
+            chrome_num: Chrome实例编号，"any"或None表示可在任意实例上执行
             actions: 动作序列列表
             priority: 任务优先级 (数字越小优先级越高)
             metadata: 任务元数据
+            block: 队列已满时是否阻塞等待
+            timeout: 阻塞等待的超时时间（秒），超时抛出queue.Full
+            options: 任务级选项，见TASK_OPTIONS (如task_timeout: 单个任务超时秒数)
+        
+        Returns:
+            是否接受了任务；任务ID已在日志中登记时跳过并返回False
+        """
+        if self.journal and task_id in self.journal.known_task_ids:
+            print(f"⏭️ 任务已在日志中登记，跳过: {task_id}")
+            return False
+        
+        task = self.build_task(task_id, chrome_num, actions, priority, metadata, **options)
+        if self._admit_task(task, block=block, timeout=timeout):
+            print(f"📋 已添加任务: {task_id} (Chrome_{chrome_num})")
+        elif task_id in self.dependency_graph.waiting:
+            print(f"⏳ 已添加任务，等待依赖完成: {task_id} <- {', '.join(task['depends_on'])}")
+        return True
+    
+    def _admit_task(self, task, block=True, timeout=None, force=False):
+        """
+        新任务去重后入队（重试和恢复的任务直接使用enqueue_task）
+        
+        Returns:
+            是否放入了队列；命中结果缓存或合并到相同任务时返回False
+        """
+        if task.get("depends_on") and not self._admit_dependent_task(task, enqueue=False):
+            return False
+        
+        if self.deduplicator:
+            decision, value = self.deduplicator.admit(task)
+            if decision == "cached":
+                result = dict(value, task_id=task["task_id"], cached=True)
+                print(f"♻️ 命中结果缓存: {task['task_id']}")
+                self._record_result("completed", result)
+                self._finalize_task(task, "completed", result)
+                return False
+            if decision == "coalesced":
+                print(f"🔗 相同任务正在排队或执行，合并结果: {task['task_id']} -> {value}")
+                self._journal_record(task["task_id"], "pending", task=task)
+                return False
+        
+        try:
+            self.enqueue_task(task, block=block, timeout=timeout, force=force)
+        except Full:
+            if self.deduplicator:
+                # 领头任务未能入队，已合并的任务改为各自执行
+                for follower in self.deduplicator.complete(task, "rejected", None):
+                    self.enqueue_task(follower, force=True)
+            raise
+        self._journal_record(task["task_id"], "pending", task=task)
+        return True
+    
+    def _admit_dependent_task(self, task, enqueue=True):
+        """
+        登记有依赖的任务
+        
+        Args:
+            task: 任务字典
+            enqueue: 依赖均已满足时是否直接入队
+        
+        Returns:
+            依赖是否均已满足
+        """
+        decision, parent_id = self.dependency_graph.add(task)
+        if decision == "waiting":
+            self._journal_record(task["task_id"], "pending", task=task)
+            return False
+        if decision == "skipped":
+            self._skip_task(task, parent_id)
+            return False
+        if enqueue:
+            self.enqueue_task(task, force=True)
+        return True
+    
+    def _skip_task(self, task, parent_id):
+        """依赖任务失败，跳过下游任务"""
+        result = {
+            "task_id": task["task_id"],
+            "chrome_num": task["chrome_num"],
+            "status": "skipped",
+            "error": f"依赖任务失败: {parent_id}",
+            "error_type": "dependency_failed",
+            "completed_at": time.time()
+        }
+        print(f"⏭️ 跳过任务: {task['task_id']} (依赖任务失败: {parent_id})")
+        self._record_result("skipped", result)
+        self._finalize_task(task, "skipped", result)
+    
+    def task_from_config(self, task_config):
+        """由任务配置（任务文件中的一项）构建任务字典"""
+        return self.build_task(
+            task_config["task_id"],
+            task_config["chrome_num"],
+            task_config["actions"],
+            task_config.get("priority", 1),
+            task_config.get("metadata"),
+            **{key: task_config[key] for key in TASK_OPTIONS if key in task_config}
+        )
+    
+    def resume_from_journal(self):
+        """从任务日志恢复未完成的任务（中断时正在执行的任务重新执行）"""
+        tasks = self.journal.load_recoverable_tasks()
+        
+        # 上次运行中已到达终态的依赖任务
+        recovered_ids = {task["task_id"] for task in tasks}
+        parent_ids = {parent_id for task in tasks for parent_id in task.get("depends_on") or []}
+        for parent_id in parent_ids - recovered_ids:
+            state = self.journal.get_final_state(parent_id)
+            if state in ("completed", "failed", "skipped"):
+                self.dependency_graph.resolve(parent_id, state == "completed")
+        
+        for task in tasks:
+            if task.get("depends_on"):
+                self._admit_dependent_task(task)
+            else:
+                self.enqueue_task(task, force=True)
+        
+        if tasks:
+            print(f"♻️ 已从任务日志恢复 {len(tasks)} 个未完成任务 (状态统计: {self.journal.state_counts()})")
+        return len(tasks)
+    
+    def attach_redis_queue(self, redis_queue):
+        """
+        使用Redis共享队列作为任务来源
+        
+        Args:
+            redis_queue: RedisTaskQueue实例
         """
+        self.redis_queue = redis_queue
+        print(f"🔗 已连接Redis任务队列: {redis_queue.namespace}")
+    
+    def _sync_remote_queue(self):
+        """从Redis领取任务补足本地队列，并为已领取的任务续期"""
+        if not self.redis_queue:
+            return
+        
+        now = time.time()
+        try:
+            # 心跳：续期已领取的任务，并回收其他主机超时未确认的任务
+            if now - self.last_remote_heartbeat >= self.redis_queue.visibility_timeout / 3:
+                self.last_remote_heartbeat = now
+                self.redis_queue.extend(list(self.remote_task_ids))
+                requeued = self.redis_queue.requeue_expired()
+                if requeued:
+                    print(f"♻️ {requeued} 个超时未确认的任务已重新放回Redis队列")
+            
+            prefetch = self.config.get("redis_prefetch") or self.max_workers * 2
+            missing = prefetch - self.task_queue.qsize()
+            if missing <= 0 or now - self.last_remote_claim < self.config.get("redis_poll_interval", 1.0):
+                return
+            
+            payloads = self.redis_queue.claim(missing, chrome_instances=self._redis_instances())
+            if not payloads:
+                self.last_remote_claim = now
+            for payload in payloads:
+                task = self._task_from_remote(payload)
+                if task is not None:
+                    self.remote_task_ids.add(task["remote_id"])
+                    self.enqueue_task(task, force=True)
+        except Exception as e:
+            print(f"❌ 同步Redis任务队列失败: {e}")
+    
+    def _task_from_remote(self, payload):
+        """
+        由Redis中领取的任务配置构建任务字典（格式同sample_tasks.json，缺省字段补默认值）
+        
+        Returns:
+            任务字典；配置无效时向Redis确认为失败并返回None
+        """
+        remote_id = payload.pop("remote_id")
+        error = validate_task_config(payload)
+        if error is None:
+            try:
+                task = self.task_from_config(payload)
+                task["remote_id"] = remote_id
+                return task
+            except ValueError as e:
+                error = str(e)
+        
+        print(f"⚠️ 跳过无效的Redis任务: {remote_id} - {error}")
+        self.redis_queue.ack(remote_id, {"task_id": payload.get("task_id", remote_id), "status": "failed",
+                                         "error": f"无效任务: {error}", "error_type": "invalid_task"})
+        return None
+    
+    def _redis_instances(self):
+        """从Redis只领取指定本机实例（配置的chrome_instances）的任务，未配置时不限制"""
+        return self.config.get("chrome_instances") or None
+    
+    def _has_remote_work(self):
+        """Redis队列中是否还有待领取的任务"""
+        if not self.redis_queue:
+            return False
+        try:
+            return self.redis_queue.pending_count(self._redis_instances()) > 0
+        except Exception as e:
+            print(f"❌ 查询Redis任务队列失败: {e}")
+            return False
+    
+    def _finalize_task(self, task, state, result):
+        """任务到达终态：登记任务日志，远程任务向Redis确认并发布结果，合并的相同任务共享结果，释放下游任务"""
+        summary = self._result_summary(result)
+        self._journal_record(task["task_id"], state, result=summary)
+        
+        for callback in self.result_listeners:
+            try:
+                callback(state, result)
+            except Exception as e:
+                print(f"❌ 结果回调出错: {e}")
+        
+        remote_id = task.get("remote_id")
+        if remote_id and self.redis_queue:
+            try:
+                self.redis_queue.ack(remote_id, summary)
+                self.remote_task_ids.discard(remote_id)
+            except Exception as e:
+                print(f"❌ 确认Redis任务失败: {remote_id} - {e}")
+        
+        original_id = task.get("retry_of", task["task_id"])
+        
+        # 合并到本任务的相同任务共享结果
+        if self.deduplicator and self.deduplicator.is_leader(task):
+            for follower in self.deduplicator.complete(task, state, summary):
+                follower_result = dict(summary, task_id=follower["task_id"], coalesced_with=original_id)
+                self._record_result(state, follower_result)
+                self._finalize_task(follower, state, follower_result)
+        
+        # 依赖本任务的下游任务：全部依赖满足的入队，本任务失败时跳过
+        ready, skipped = self.dependency_graph.resolve(original_id, state == "completed")
+        for child in ready:
+            self._admit_task(child, force=True)
+        for child in skipped:
+            self._skip_task(child, original_id)
+    
+    def _journal_record(self, task_id, state, task=None, result=None):
+        """登记任务状态变化（未启用任务日志时忽略）"""
+        if self.journal:
+            self.journal.record(task_id, state, task=task, result=result)
+    
+    def build_task(self, task_id, chrome_num, actions, priority=1, metadata=None, **options):
+        """构建任务字典"""
+        unknown = set(options) - set(TASK_OPTIONS)
+        if unknown:
+            raise ValueError(f"未知的任务选项: {sorted(unknown)}")
+        
         task = {
             "task_id": task_id,
             "chrome_num": chrome_num,
@@ -71,37 +492,102 @@ class TaskQueueManager:
             "created_at": time.time(),
             "status": "pending"
         }
+        task.update({key: value for key, value in options.items() if value is not None})
+        if isinstance(task.get("depends_on"), str):
+            task["depends_on"] = [task["depends_on"]]
+        if task.get("resource_policy"):
+            # 资源策略无效时入队前拒绝，而不是执行时失败并反复重试
+            ResourcePolicy.resolve(task["resource_policy"], self.config.get("resource_policies"))
+        return task
+    
+    def enqueue_task(self, task, block=True, timeout=None, force=False):
+        """
+        将任务放入队列，队列已满时按背压策略等待
+        
+        Args:
+            task: 任务字典
+            block: 队列已满时是否阻塞等待
+            timeout: 阻塞等待的超时时间（秒）
+            force: 忽略队列上限（调度线程内部重新入队使用，避免自身阻塞）
+        """
+        if self.max_queue_size and not force:
+            with self.queue_not_full:
+                has_room = self.queue_not_full.wait_for(
+                    lambda: self.task_queue.qsize() < self.max_queue_size,
+                    timeout=timeout if block else 0
+                )
+                if not has_room:
+                    raise Full(f"任务队列已满 ({self.max_queue_size})")
+                self.task_queue.push(task)
+        else:
+            self.task_queue.push(task)
         
-        self.task_queue.put((priority, task))
-        print(f"📋 已添加任务: {task_id} (Chrome_{chrome_num})")
+        # 唤醒调度循环
+        self.wakeup_event.set()
     
     def add_batch_tasks(self, tasks_config):
         """
-        批量添加任务
+        批量添加任务（流式加载，执行时按需从来源读取）
         
         Args:
-            tasks_config: 任务配置列表或配置文件路径
-        """
-        if isinstance(tasks_config, str):
-            # 从文件加载
-            with open(tasks_config, 'r', encoding='utf-8') as f:
-                tasks_config = json.load(f)
-        
-        for task_config in tasks_config:
-            self.add_task(
-                task_config["task_id"],
-                task_config["chrome_num"],
-                task_config["actions"],
-                task_config.get("priority", 1),
-                task_config.get("metadata")
-            )
+            tasks_config: 任务配置的可迭代对象，或任务文件路径（.json/.jsonl，可带.gz压缩）
+        """
+        source = TaskSource(tasks_config, progress_interval=self.config.get("load_progress_interval", 10000))
+        self.task_sources.append(source)
+        self.wakeup_event.set()
+        print(f"📋 已登记批量任务来源: {source.name}")
+        return source
+    
+    def add_template_tasks(self, template_name, matrix=None, templates_file="automation_config.json", **kwargs):
+        """
+        按参数矩阵展开任务模板并添加（流式生成，执行时按需展开）
         
-        print(f"📋 已批量添加 {len(tasks_config)} 个任务")
+        Args:
+            template_name: automation_config.json中task_templates的模板名
+            matrix: 参数矩阵，如 {"search_term": {"csv": "keywords.csv", "column": "keyword"}}
+            templates_file: 模板配置文件路径
+            kwargs: 传给TemplateLibrary.expand的参数 (chrome_num, priority, task_id_format, task_timeout)
+        
+        Raises:
+            ValueError: 未通过chrome_num或参数矩阵指定实例，且未配置chrome_instances
+                        （任意实例任务没有可分配的实例，会全部失败）
+        """
+        from task_templates import TemplateLibrary, matrix_parameter_names
+        
+        names = matrix_parameter_names(matrix)
+        if (is_any_instance(kwargs.get("chrome_num", "any")) and names is not None and "chrome_num" not in names
+                and not self.config.get("chrome_instances")):
+            raise ValueError("模板任务未指定chrome_num时需要配置chrome_instances")
+        
+        library = TemplateLibrary(templates_file)
+        return self.add_batch_tasks(library.expand(template_name, matrix, **kwargs))
+    
+    def _refill_from_sources(self):
+        """从批量任务来源补充队列，队列中保持约batch_prefetch个待执行任务"""
+        prefetch = self.config.get("batch_prefetch") or self.max_workers * 4
+        while self.task_sources:
+            missing = prefetch - self.task_queue.qsize()
+            if missing <= 0:
+                return
+            
+            source = self.task_sources[0]
+            for task_config in source.take(missing):
+                task_id = task_config["task_id"]
+                if self.journal and task_id in self.journal.known_task_ids:
+                    continue
+                try:
+                    self._admit_task(self.task_from_config(task_config), force=True)
+                except ValueError as e:
+                    print(f"⚠️ 跳过无效任务: {task_id} - {e}")
+            
+            if source.exhausted:
+                self.task_sources.pop(0)
+                print(f"📋 任务来源读取完毕: {source.name} (有效 {source.loaded} 个，无效 {source.invalid} 个)")
     
     def execute_task(self, task):
         """执行单个任务"""
         task_id = task["task_id"]
-        chrome_num = task["chrome_num"]
+        chrome_num = task.get("assigned_chrome", task["chrome_num"])
         actions = task["actions"]
         
         print(f"🚀 开始执行任务: {task_id} (Chrome_{chrome_num})")
@@ -112,14 +598,32 @@ class TaskQueueManager:
             task["status"] = "running"
             task["started_at"] = time.time()
         
+        self.watchdog.start_task(task_id, task.get("task_timeout") or self.config.get("task_timeout", 300))
+        self._journal_record(task_id, "running")
+        
         try:
             # 创建自动化实例并执行任务
-            with EnhancedWebAutomation(chrome_num) as automation:
+            with EnhancedWebAutomation(chrome_num, session_pool=self.session_pool,
+                                       selector_cache=self.selector_cache) as automation:
+                self.watchdog.register_abort(task_id, automation.abort)
                 if not automation.connect_to_chrome():
-                    raise Exception(f"无法连接到 Chrome_{chrome_num}")
+                    raise ChromeConnectionError(f"无法连接到 Chrome_{chrome_num}")
                 
-                # 执行动作序列
-                results = automation.execute_action_sequence(actions)
+                # 任务或模板指定的网络资源拦截策略，未指定时使用全局策略
+                policy = ResourcePolicy.resolve(
+                    task.get("resource_policy", self.config.get("resource_policy")),
+                    self.config.get("resource_policies")
+                )
+                automation.apply_resource_policy(policy)
+                
+                # 执行动作序列（重试任务从检查点继续）
+                results = automation.execute_action_sequence(
+                    actions,
+                    start_index=task.get("resume_from", 0),
+                    resume_marker=task.get("resume_marker"),
+                    resume_fallback=task.get("resume_fallback", 0),
+                    batch=task.get("batch_actions", self.config.get("batch_actions", False))
+                )
                 
                 # 保存日志
                 if self.config.get("save_logs", True):
@@ -137,10 +641,16 @@ class TaskQueueManager:
                     "task_id": task_id,
                     "chrome_num": chrome_num,
                     "status": "completed" if success_rate > 0.8 else "partial_success",
+                    "error_type": None if success_rate > 0.8 else "action_failed",
                     "success_rate": success_rate,
                     "total_actions": total_actions,
                     "successful_actions": successful_actions,
                     "results": results,
+                    "resumed_from": automation.start_index,
+                    "resource_policy": automation.resource_policy.name if automation.resource_policy else None,
+                    "resource_policy_ignored": policy.webdriver_ignored_rules() if policy else [],
+                    "resource_blocking": None,
+                    "resource_blocking_note": WEBDRIVER_BLOCKING_NOTE if policy else None,
                     "completed_at": time.time(),
                     "duration": time.time() - task["started_at"]
                 }
@@ -154,6 +664,7 @@ class TaskQueueManager:
                 "chrome_num": chrome_num,
                 "status": "failed",
                 "error": str(e),
+                "error_type": "connect" if isinstance(e, ChromeConnectionError) else "exception",
                 "completed_at": time.time(),
                 "duration": time.time() - task["started_at"]
             }
@@ -162,95 +673,479 @@ class TaskQueueManager:
             return task_result
         
         finally:
+            self.watchdog.finish_task(task_id)
+            
             # 清理活动任务
             with self.lock:
                 if task_id in self.active_tasks:
                     del self.active_tasks[task_id]
     
-    def run_tasks(self, timeout=None):
+    def run_tasks(self, timeout=None, keep_alive=False):
         """
-        运行所有队列中的任务
+        持续调度并运行队列中的任务
+        
+        工作线程空闲时立即从队列拉取下一个任务，执行期间新加入的任务和
+        重试任务都会在本次调用中被执行。
         
         Args:
-            timeout: 总超时时间（秒）
+            timeout: 整批任务的超时时间（秒），超时后停止派发新任务，未派发的任务保留在队列中。
+                     单个任务的超时由task_timeout控制，超时任务由看门狗中断
+            keep_alive: 队列为空时继续等待新任务，直到调用stop()或finish()
         """
-        if self.task_queue.empty():
+        if (self.task_queue.empty() and not self.task_sources and not keep_alive and
+                not self._has_remote_work()):
             print("📋 任务队列为空")
             return
         
         start_time = time.time()
-        timeout = timeout or self.config.get("task_timeout", 300)
+        if not keep_alive:
+            timeout = timeout or self.config.get("batch_timeout")
+        deadline = start_time + timeout if timeout else None
+        poll_interval = self.config.get("dispatch_poll_interval", 0.5)
         
         print(f"🚀 开始执行任务队列 (最大并发: {self.max_workers})")
         
-        # 收集所有任务
-        tasks = []
-        while not self.task_queue.empty():
-            try:
-                priority, task = self.task_queue.get_nowait()
-                tasks.append(task)
-            except Empty:
-                break
+        self.stop_event.clear()
+        in_flight = {}
+        if self.concurrency:
+            self.concurrency.start()
+        if self.instance_health:
+            self._probe_instances()
+            self.instance_health.start(self._known_instances)
         
-        # 按优先级排序
-        tasks.sort(key=lambda x: x["priority"])
-        
-        # 使用线程池执行任务
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # 提交所有任务
-            future_to_task = {
-                executor.submit(self.execute_task, task): task 
-                for task in tasks
-            }
-            
-            # 收集结果
-            for future in as_completed(future_to_task, timeout=timeout):
-                task = future_to_task[future]
-                try:
-                    result = future.result()
+        try:
+            # 额外线程用于替补被超时任务占住、尚未退出的线程
+            with ThreadPoolExecutor(max_workers=self.max_workers * 2) as executor:
+                while True:
+                    self.wakeup_event.clear()
+                
+                    # 收集已完成任务的结果
+                    for future in [f for f in in_flight if f.done()]:
+                        self._handle_task_result(in_flight.pop(future), future)
+                
+                    # 超时任务立即释放工作槽位并记录超时结果，线程退出后其结果被丢弃
+                    for future in self._pop_expired(in_flight):
+                        self._handle_task_timeout(future, in_flight.pop(future))
+                    self._release_stuck_lanes()
+                
+                    # 到期的重试任务和限流延后的任务重新入队
+                    for retry_task in self.retry_queue.pop_due() + self.rate_limited_queue.pop_due():
+                        self.enqueue_task(retry_task, force=True)
+                    
+                    self._sync_remote_queue()
+                    self._refill_from_sources()
+                
+                    if self.stop_event.is_set():
+                        print("⏹️ 调度循环已停止")
+                        break
+                    if deadline and time.time() >= deadline:
+                        print(f"⏰ 任务队列执行超时，停止派发新任务 "
+                              f"(剩余 {self.task_queue.qsize()} 个，等待重试 {len(self.retry_queue)} 个)")
+                        break
+                
+                    if self.journal:
+                        self.journal.flush_if_due()
+                    
+                    if self.instance_health:
+                        self._evict_unavailable_instances()
                     
-                    if result["status"] == "completed":
-                        self.completed_tasks.append(result)
-                    else:
-                        self.failed_tasks.append(result)
-                        
-                        # 重试失败的任务
-                        if (self.config.get("retry_failed_tasks", True) and 
-                            task.get("retry_count", 0) < self.config.get("max_retries", 2)):
-                            
-                            task["retry_count"] = task.get("retry_count", 0) + 1
-                            print(f"🔄 重试任务: {task['task_id']} (第{task['retry_count']}次)")
-                            
-                            time.sleep(self.config.get("retry_delay", 5))
-                            self.add_task(
-                                f"{task['task_id']}_retry_{task['retry_count']}",
-                                task["chrome_num"],
-                                task["actions"],
-                                task["priority"],
-                                task["metadata"]
-                            )
+                    # 没有任何Chrome实例通道时，任意实例任务无法派发，直接失败
+                    self._fail_unroutable_tasks()
                     
-                except Exception as e:
-                    print(f"❌ 任务执行异常: {task['task_id']} - {e}")
-                    self.failed_tasks.append({
-                        "task_id": task["task_id"],
-                        "chrome_num": task["chrome_num"],
-                        "status": "error",
-                        "error": str(e),
-                        "completed_at": time.time()
-                    })
+                    # 按空闲槽位派发新任务
+                    self._fill_worker_slots(executor, in_flight)
+                
+                    if (not in_flight and (not keep_alive or self.drain_event.is_set()) and
+                            self.task_queue.empty() and not self.retry_queue and
+                            not self.rate_limited_queue and not self.task_sources and not self._has_remote_work()):
+                        break
+                
+                    # 等待任务完成、新任务加入或重试任务到期
+                    wait_time = poll_interval
+                    for delayed_queue in (self.retry_queue, self.rate_limited_queue):
+                        next_due = delayed_queue.next_due_in()
+                        if next_due is not None:
+                            wait_time = min(wait_time, next_due)
+                    self.wakeup_event.wait(wait_time)
+            
+                # 等待已派发的任务结束
+                for future in list(in_flight):
+                    future.exception()
+                    self._handle_task_result(in_flight.pop(future), future)
+            
+            # 线程池关闭时已等待所有线程（含超时任务的线程）退出
+            self._release_stuck_lanes()
+        
+        finally:
+            self.drain_event.clear()
+            if self.concurrency:
+                self.concurrency.stop()
+            if self.instance_health:
+                self.instance_health.stop()
+            if self.journal:
+                self.journal.flush()
+            if self.result_sink:
+                self.result_sink.flush()
+            if self.selector_cache:
+                self.selector_cache.save()
         
         # 输出执行结果
         total_time = time.time() - start_time
-        total_tasks = len(self.completed_tasks) + len(self.failed_tasks)
-        success_rate = len(self.completed_tasks) / total_tasks if total_tasks > 0 else 0
+        summary = self.result_counters.summary()
         
         print(f"\n📊 任务执行完成:")
-        print(f"   总任务数: {total_tasks}")
-        print(f"   成功任务: {len(self.completed_tasks)}")
-        print(f"   失败任务: {len(self.failed_tasks)}")
-        print(f"   成功率: {success_rate:.1%}")
+        print(f"   总任务数: {summary['total_tasks']}")
+        print(f"   成功任务: {summary['completed_tasks']}")
+        print(f"   失败任务: {summary['failed_tasks']}")
+        print(f"   成功率: {summary['success_rate']:.1%}")
         print(f"   总耗时: {total_time:.1f}秒")
+        
+        if not keep_alive:
+            self._report_unresolved()
+    
+    def _report_unresolved(self):
+        """列出依赖未完成、未执行的任务"""
+        unresolved = self.dependency_graph.unresolved()
+        if unresolved:
+            print(f"⚠️ {len(unresolved)} 个任务的依赖未完成，未执行:")
+            for task_id, parent_ids in list(unresolved.items())[:10]:
+                print(f"   {task_id} <- {', '.join(parent_ids)}")
+    
+    def stop(self):
+        """停止调度循环（已派发的任务会执行完毕）"""
+        self.stop_event.set()
+        self.wakeup_event.set()
+    
+    def finish(self):
+        """不再等待新任务，keep_alive模式下执行完已有任务后退出调度循环"""
+        self.drain_event.set()
+        self.wakeup_event.set()
+    
+    def add_result_listener(self, callback):
+        """
+        注册任务终态回调
+        
+        Args:
+            callback: callback(state, result)，state为completed或failed
+        """
+        self.result_listeners.append(callback)
+    
+    def run_sharded(self, num_processes, workers_per_shard=None):
+        """
+        多进程分片执行队列中的所有任务
+        每个子进程负责固定的一组Chrome实例，在进程内运行自己的通道调度器；
+        去重、依赖、任务日志和Redis确认在父进程中处理，结果返回后才继续读取任务来源
+        
+        Args:
+            num_processes: 子进程数
+            workers_per_shard: 每个子进程的并发数，默认为分片内的实例数
+        
+        Raises:
+            ValueError: 有批量任务来源或Redis队列但未配置chrome_instances（分片数取决于实例数，
+                        而这些任务的实例在读取前未知）
+        """
+        from sharded_executor import ShardedTaskRunner
+        
+        if self.task_queue.empty() and not self.task_sources and not self._has_remote_work():
+            print("📋 任务队列为空")
+            return
+        
+        if (self.task_sources or self.redis_queue) and not self.config.get("chrome_instances"):
+            raise ValueError("分片执行批量任务来源或Redis队列中的任务时需要配置chrome_instances")
+        
+        start_time = time.time()
+        poll_interval = self.config.get("dispatch_poll_interval", 0.5)
+        runner = ShardedTaskRunner(
+            num_processes,
+            self._known_instances(),
+            config=self.config,
+            workers_per_shard=workers_per_shard
+        )
+        max_in_flight = self.config.get("shard_max_in_flight") or sum(
+            runner.shard_workers(i) for i in range(runner.num_shards)) * 2
+        pending = deque()
+        
+        runner.start()
+        try:
+            while True:
+                # 本地队列中是已恢复、依赖已满足、去重回退和从Redis领取的任务，其次按需读取任务来源
+                self._sync_remote_queue()
+                while runner.in_flight < max_in_flight:
+                    if not pending:
+                        self._refill_from_sources()
+                        pending.extend(self.task_queue.drain())
+                    if not pending:
+                        break
+                    runner.submit(pending.popleft())
+                
+                if not runner.in_flight:
+                    if not self.task_sources and not self._has_remote_work():
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                
+                item = runner.get_result(timeout=poll_interval)
+                if item is not None:
+                    task, state, result = item
+                    self._record_result(state, result)
+                    self._finalize_task(task, state, result)
+                if self.journal:
+                    self.journal.flush_if_due()
+        finally:
+            runner.close()
+            if self.journal:
+                self.journal.flush()
+            if self.result_sink:
+                self.result_sink.flush()
+        
+        print(f"\n📊 分片执行完成: 成功 {self.result_counters.completed}，失败 {self.result_counters.failed}，"
+              f"耗时 {time.time() - start_time:.1f}秒")
+        self._report_unresolved()
+    
+    def _fill_worker_slots(self, executor, in_flight):
+        """从队列拉取任务填满空闲的工作线程"""
+        limit = self.max_workers
+        if self.concurrency:
+            if not self.concurrency.admission_open:
+                # 内存即将耗尽，暂不派发
+                self.in_flight_count = len(in_flight)
+                return
+            limit = self.concurrency.limit
+        
+        while len(in_flight) < limit:
+            task = self.task_queue.pop()
+            if task is None:
+                break
+            
+            if self.rate_limiter:
+                delay = self.rate_limiter.acquire(task)
+                if delay > 0:
+                    # 目标域名受限，延后派发，不占用工作线程
+                    self.task_queue.release(task, executed=False)
+                    self.rate_limited_queue.push(task, delay)
+                    continue
+            
+            if self.instance_health:
+                self.instance_health.on_dispatch(task["assigned_chrome"])
+            
+            with self.queue_not_full:
+                self.queue_not_full.notify_all()
+            
+            future = executor.submit(self.execute_task, task)
+            future.add_done_callback(lambda f: self.wakeup_event.set())
+            in_flight[future] = task
+        
+        self.in_flight_count = len(in_flight)
+        if self.concurrency:
+            self.concurrency.note_in_flight(len(in_flight))
+    
+    def _known_instances(self):
+        """已知的Chrome实例编号（配置的实例和已创建通道的实例）"""
+        instances = set(self.config.get("chrome_instances") or [])
+        instances.update(self.task_queue.lanes.keys())
+        return sorted(instances)
+    
+    def _probe_instances(self):
+        """开始执行前并发探测所有实例"""
+        latencies = self.instance_health.probe_all(self._known_instances())
+        down = [chrome_num for chrome_num, latency in latencies.items() if latency is None]
+        print(f"🩺 实例健康探测: 可用 {len(latencies) - len(down)}/{len(latencies)}")
+        if down:
+            print(f"   不可用: {', '.join(f'Chrome_{n}' for n in down)}")
+    
+    def _evict_unavailable_instances(self):
+        """实例连续不可用超过give_up_seconds时，其专属任务直接失败（不再重试）"""
+        for chrome_num in list(self.task_queue.lanes):
+            if not self.instance_health.is_given_up(chrome_num):
+                continue
+            tasks = self.task_queue.evict_lane(chrome_num)
+            if tasks:
+                print(f"🚫 Chrome_{chrome_num} 持续不可用，放弃 {len(tasks)} 个指定该实例的任务")
+            for task in tasks:
+                result = {
+                    "task_id": task["task_id"],
+                    "chrome_num": chrome_num,
+                    "status": "failed",
+                    "error": f"Chrome_{chrome_num} 持续不可用",
+                    "error_type": "instance_unavailable",
+                    "completed_at": time.time()
+                }
+                self._record_result("failed", result)
+                self._finalize_task(task, "failed", result)
+    
+    def _fail_unroutable_tasks(self):
+        """未配置chrome_instances且没有指定实例的任务时，chrome_num为any的任务直接失败（不再重试）"""
+        tasks = self.task_queue.take_unroutable()
+        if tasks:
+            print(f"❌ 没有可用的Chrome实例，{len(tasks)} 个任意实例任务无法执行 (请在配置中设置chrome_instances)")
+        for task in tasks:
+            result = {
+                "task_id": task["task_id"],
+                "chrome_num": task["chrome_num"],
+                "status": "failed",
+                "error": "未配置chrome_instances，无法为任意实例任务分配Chrome实例",
+                "error_type": "no_instances",
+                "completed_at": time.time()
+            }
+            self._record_result("failed", result)
+            self._finalize_task(task, "failed", result)
+    
+    def _handle_task_result(self, task, future):
+        """处理单个任务的执行结果，失败时安排重试"""
+        self.task_queue.release(task)
+        if self.rate_limiter:
+            self.rate_limiter.release(task)
+        
+        try:
+            result = future.result()
+            
+            if self.concurrency:
+                self.concurrency.record_result(result.get("duration"), result["status"] == "completed")
+            if self.instance_health:
+                self.instance_health.record_result(task["assigned_chrome"], result)
+            
+            if result["status"] == "completed":
+                self._record_result("completed", result)
+                self._finalize_task(task, "completed", result)
+            else:
+                self._retry_or_fail(task, result)
+            
+        except Exception as e:
+            print(f"❌ 任务执行异常: {task['task_id']} - {e}")
+            result = {
+                "task_id": task["task_id"],
+                "chrome_num": task.get("assigned_chrome", task["chrome_num"]),
+                "status": "error",
+                "error": str(e),
+                "error_type": "exception",
+                "completed_at": time.time()
+            }
+            if self.instance_health:
+                self.instance_health.record_result(task["assigned_chrome"], result)
+            self._record_result("failed", result)
+            self._finalize_task(task, "failed", result)
+    
+    def _retry_or_fail(self, task, result):
+        """失败任务按重试策略安排重试，否则登记为最终失败"""
+        error_type = result.get("error_type") or "exception"
+        # 只有可选动作失败且都在已成功的点击等不可重复动作之前时，重试只会重复这些动作，不再重试
+        retryable = not result.get("results") or resume_failure(task["actions"], result["results"]) is not None
+        if (retryable and self.config.get("retry_failed_tasks", True) and 
+            self.retry_policy.should_retry(task.get("retry_count", 0), error_type)):
+            self._record_result("retried", result)
+            self._schedule_retry(task, error_type, result)
+            self._journal_record(task["task_id"], "retried", result=self._result_summary(result))
+        else:
+            self._record_result("failed", result)
+            self._finalize_task(task, "failed", result)
+    
+    def _record_result(self, state, result):
+        """
+        记录一次任务执行结果
+        
+        Args:
+            state: completed、failed、retried（失败后已安排重试）或skipped（依赖失败）
+            result: 任务结果字典
+        """
+        self.result_counters.add(state, result)
+        if self.result_sink:
+            self.result_sink.write(state, result)
+        elif state == "completed":
+            self.completed_tasks.append(result)
+        else:
+            self.failed_tasks.append(result)
+    
+    def _result_summary(self, result):
+        """任务结果摘要（不含逐个动作的结果）"""
+        return {key: value for key, value in result.items() if key != "results"}
+    
+    def _on_task_timeout(self, task_id):
+        """看门狗超时回调（看门狗线程）"""
+        with self.lock:
+            self.expired_task_ids.add(task_id)
+        self.wakeup_event.set()
+    
+    def _pop_expired(self, in_flight):
+        """找出已超时但仍在运行的任务"""
+        with self.lock:
+            if not self.expired_task_ids:
+                return []
+            expired_ids = self.expired_task_ids
+            self.expired_task_ids = set()
+        return [future for future, task in in_flight.items()
+                if task["task_id"] in expired_ids and not future.done()]
+    
+    def _handle_task_timeout(self, future, task):
+        """
+        记录超时结果并按策略安排重试
+        线程可能仍在操作该Chrome实例，实例通道在线程退出后才释放，
+        避免指定同一实例的重试任务与其同时执行
+        """
+        self.stuck_tasks[future] = task
+        if self.rate_limiter:
+            self.rate_limiter.release(task)
+        
+        started_at = task.get("started_at", time.time())
+        result = {
+            "task_id": task["task_id"],
+            "chrome_num": task.get("assigned_chrome", task["chrome_num"]),
+            "status": "timeout",
+            "error": "任务执行超时",
+            "error_type": "timeout",
+            "completed_at": time.time(),
+            "duration": time.time() - started_at
+        }
+        print(f"⏰ 任务超时: {task['task_id']}")
+        if self.concurrency:
+            self.concurrency.record_result(result["duration"], False)
+        if self.instance_health:
+            self.instance_health.record_result(task["assigned_chrome"], result)
+        
+        self._retry_or_fail(task, result)
+    
+    def _release_stuck_lanes(self):
+        """释放线程已退出的超时任务占用的实例通道"""
+        for future in [f for f in self.stuck_tasks if f.done()]:
+            task = self.stuck_tasks.pop(future)
+            self.task_queue.release(task)
+            print(f"🔓 超时任务的线程已退出，释放 Chrome_{task['assigned_chrome']}: {task['task_id']}")
+    
+    def _schedule_retry(self, task, error_type, result=None):
+        """
+        按退避策略延迟重新入队失败的任务，重试次数随任务传递
+        已执行部分动作的任务按检查点从失败的动作继续，并固定在原实例上执行（页面状态保存在原实例中）
+        """
+        retry_count = task.get("retry_count", 0) + 1
+        original_id = task.get("retry_of", task["task_id"])
+        delay = self.retry_policy.compute_delay(retry_count, error_type)
+        
+        resume = None
+        if self.config.get("resume_from_checkpoint", True) and result and result.get("results"):
+            resume = plan_resume(task["actions"], result["results"],
+                                 result.get("resumed_from", 0), task.get("resume_marker"))
+        chrome_num = task["chrome_num"]
+        if resume:
+            chrome_num = task.get("assigned_chrome", chrome_num)
+        
+        detail = f"，从第{resume['resume_from']+1}个动作继续" if resume else ""
+        print(f"🔄 重试任务: {original_id} (第{retry_count}次，{delay:.1f}秒后，原因: {error_type}{detail})")
+        
+        retry_task = self.build_task(
+            f"{original_id}_retry_{retry_count}",
+            chrome_num,
+            task["actions"],
+            task["priority"],
+            task["metadata"],
+            **{key: task[key] for key in TASK_OPTIONS if key in task}
+        )
+        retry_task["retry_count"] = retry_count
+        retry_task["retry_of"] = original_id
+        if resume:
+            retry_task.update(resume)
+        if "remote_id" in task:
+            retry_task["remote_id"] = task["remote_id"]
+        self.retry_queue.push(retry_task, delay)
+        self._journal_record(retry_task["task_id"], "pending", task=retry_task)
     
     def get_status_report(self):
         """获取状态报告"""
@@ -261,8 +1156,22 @@ class TaskQueueManager:
         return {
             "pending_tasks": pending_count,
             "active_tasks": active_count,
-            "completed_tasks": len(self.completed_tasks),
-            "failed_tasks": len(self.failed_tasks),
+            "in_flight_tasks": self.in_flight_count,
+            "stuck_tasks": len(self.stuck_tasks),
+            "delayed_retries": len(self.retry_queue),
+            "rate_limited_tasks": len(self.rate_limited_queue),
+            "waiting_on_dependencies": len(self.dependency_graph),
+            "concurrency": self.concurrency.get_stats() if self.concurrency else None,
+            "instance_health": self.instance_health.get_status() if self.instance_health else None,
+            "rate_limits": self.rate_limiter.get_stats() if self.rate_limiter else None,
+            "task_sources": [{"name": source.name, "loaded": source.loaded} for source in self.task_sources],
+            "completed_tasks": self.result_counters.completed,
+            "failed_tasks": self.result_counters.failed,
+            "pending_by_category": self.task_queue.category_sizes(),
+            "dedup": self.deduplicator.get_stats() if self.deduplicator else None,
+            "selector_cache": self.selector_cache.get_stats() if self.selector_cache else None,
+            "resource_blocking_note": WEBDRIVER_BLOCKING_NOTE,
+            "lanes": self.task_queue.lane_status(),
             "active_task_details": list(self.active_tasks.keys())
         }
     
@@ -273,16 +1182,16 @@ class TaskQueueManager:
             filename = f"task_results_{timestamp}.json"
         
         results = {
-            "summary": {
-                "total_tasks": len(self.completed_tasks) + len(self.failed_tasks),
-                "completed_tasks": len(self.completed_tasks),
-                "failed_tasks": len(self.failed_tasks),
-                "success_rate": len(self.completed_tasks) / (len(self.completed_tasks) + len(self.failed_tasks)) if (len(self.completed_tasks) + len(self.failed_tasks)) > 0 else 0
-            },
-            "completed_tasks": self.completed_tasks,
-            "failed_tasks": self.failed_tasks,
+            "summary": self.result_counters.summary(),
             "generated_at": time.strftime("%Y-%m-%d %H:%M:%S")
         }
+        if self.result_sink:
+            # 单个任务结果已写入结果文件，这里只保存汇总和文件列表
+            self.result_sink.flush()
+            results["result_files"] = [str(path) for path in self.result_sink.files()]
+        else:
+            results["completed_tasks"] = self.completed_tasks
+            results["failed_tasks"] = self.failed_tasks
         
         try:
             with open(filename, 'w', encoding='utf-8') as f:
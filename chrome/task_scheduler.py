@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务优先级调度器
+基于堆的优先级队列，支持等待老化和按任务类别公平分配执行机会
+"""
+
+import time
+import heapq
+import itertools
+import threading
+
+DEFAULT_CATEGORY = "default"
+
+class PriorityTaskScheduler:
+    def __init__(self, aging_seconds=0, category_weights=None, clock=time.monotonic):
+        """
+        初始化优先级调度器
+
+        Args:
+            aging_seconds: 等待多少秒提升一个优先级 (0表示不老化)
+            category_weights: 各类别的权重，例如 {"search": 2, "visit": 1}
+            clock: 时间函数
+        """
+        # 老化：有效优先级 = priority - 等待时间 / aging_seconds
+        # 所有任务以相同速率老化，因此按 priority + 入队时间 / aging_seconds 排序即可，
+        # 入队后排序键不再变化，堆操作保持O(log n)
+        self.aging_rate = 1.0 / aging_seconds if aging_seconds else 0.0
+        self.category_weights = category_weights or {}
+        self.clock = clock
+
+        # 每个类别一个堆，元素为 (排序键, 序号, 任务)，序号保证同优先级先进先出
+        self.heaps = {}
+        # 步幅调度：每个类别的虚拟时间，每次出队增加 1/权重
+        self.passes = {}
+        self.virtual_time = 0.0
+
+        self.counter = itertools.count()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def _category_of(self, task):
+        """获取任务类别"""
+        metadata = task.get("metadata") or {}
+        return metadata.get("category") or DEFAULT_CATEGORY
+
+    def push(self, task):
+        """任务入队 O(log n)"""
+        category = self._category_of(task)
+        key = task.get("priority", 1) + self.aging_rate * self.clock()
+
+        with self.lock:
+            heap = self.heaps.get(category)
+            if not heap:
+                # 类别重新变为活跃时从当前虚拟时间开始，避免用积攒的份额抢占其他类别
+                heap = self.heaps.setdefault(category, [])
+                self.passes[category] = max(self.passes.get(category, 0.0), self.virtual_time)
+            heapq.heappush(heap, (key, next(self.counter), task))
+            self.size += 1
+
+    def _select_category(self):
+        """选择虚拟时间最小的非空类别（类别数量很少，线性扫描即可）"""
+        best = None
+        for category, heap in self.heaps.items():
+            if not heap:
+                continue
+            rank = (self.passes[category], heap[0][0], heap[0][1])
+            if best is None or rank < best[0]:
+                best = (rank, category)
+        return best[1] if best else None
+
+    def pop(self):
+        """取出下一个任务 O(log n)，队列为空时返回None"""
+        with self.lock:
+            category = self._select_category()
+            if category is None:
+                return None
+
+            key, seq, task = heapq.heappop(self.heaps[category])
+            self.size -= 1
+            self.virtual_time = self.passes[category]
+            self.passes[category] += 1.0 / self.category_weights.get(category, 1)
+            return task
+
+    def peek(self):
+        """查看下一个将被取出的任务及其排序键，队列为空时返回None"""
+        with self.lock:
+            category = self._select_category()
+            if category is None:
+                return None
+            key, seq, task = self.heaps[category][0]
+            return key, task
+
+    def qsize(self):
+        """待调度任务数"""
+        return self.size
+
+    def empty(self):
+        """队列是否为空"""
+        return self.size == 0
+
+    def __len__(self):
+        return self.size
+
+    def category_sizes(self):
+        """各类别的待调度任务数"""
+        with self.lock:
+            return {category: len(heap) for category, heap in self.heaps.items() if heap}
+
+class DelayedTaskQueue:
+    def __init__(self, clock=time.monotonic):
+        """
+        初始化延迟任务队列（定时堆），任务到期后才能取出
+
+        Args:
+            clock: 时间函数
+        """
+        self.clock = clock
+        self.heap = []
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def push(self, task, delay):
+        """加入延迟任务，delay秒后到期"""
+        with self.lock:
+            heapq.heappush(self.heap, (self.clock() + delay, next(self.counter), task))
+
+    def pop_due(self):
+        """取出所有已到期的任务"""
+        now = self.clock()
+        due = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                due.append(heapq.heappop(self.heap)[2])
+        return due
+
+    def next_due_in(self):
+        """距离最早到期任务的秒数，队列为空时返回None"""
+        with self.lock:
+            if not self.heap:
+                return None
+            return max(0.0, self.heap[0][0] - self.clock())
+
+    def qsize(self):
+        return len(self.heap)
+
+    def __len__(self):
+        return len(self.heap)
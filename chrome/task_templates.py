@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务模板展开
+automation_config.json中的task_templates在加载时编译一次，
+按参数矩阵（笛卡尔积，参数可来自列表、CSV或JSONL文件）逐个生成任务，
+生成器按需产出，不在内存中保存全部任务
+"""
+
+import csv
+import json
+import string
+from pathlib import Path
+
+# 模板中可以声明、复制到每个生成任务上的任务级选项
+TEMPLATE_TASK_OPTIONS = ("task_timeout", "resource_policy", "batch_actions")
+
+class TemplateError(ValueError):
+    """模板或参数错误"""
+
+def _compile_value(value):
+    """
+    编译模板中的值，返回render(params)函数
+    不含占位符的部分直接复用，不在每次渲染时复制
+    """
+    if isinstance(value, str):
+        parts = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(value):
+            if field is not None and (format_spec or conversion or not field.isidentifier()):
+                raise TemplateError(f"不支持的占位符: {{{field}}}")
+            parts.append((literal, field))
+
+        fields = [field for _, field in parts if field]
+        if not fields:
+            return lambda params: value, set()
+
+        # 整个字符串就是一个占位符时保留参数的原始类型
+        if len(parts) == 1 and not parts[0][0]:
+            field = parts[0][1]
+            return lambda params: params[field], {field}
+
+        def render_string(params):
+            return "".join(literal + (str(params[field]) if field else "") for literal, field in parts)
+        return render_string, set(fields)
+
+    if isinstance(value, dict):
+        compiled = {key: _compile_value(item) for key, item in value.items()}
+        fields = set().union(*(f for _, f in compiled.values())) if compiled else set()
+        if not fields:
+            return lambda params: value, set()
+        renderers = [(key, render) for key, (render, _) in compiled.items()]
+        return lambda params: {key: render(params) for key, render in renderers}, fields
+
+    if isinstance(value, list):
+        compiled = [_compile_value(item) for item in value]
+        fields = set().union(*(f for _, f in compiled)) if compiled else set()
+        if not fields:
+            return lambda params: value, set()
+        renderers = [render for render, _ in compiled]
+        return lambda params: [render(params) for render in renderers], fields
+
+    return lambda params: value, set()
+
+class CompiledTemplate:
+    def __init__(self, name, template):
+        """
+        编译任务模板
+
+        Args:
+            name: 模板名
+            template: 模板配置（含actions，可选priority、category、task_timeout、resource_policy、batch_actions）
+        """
+        if not isinstance(template.get("actions"), list) or not template["actions"]:
+            raise TemplateError(f"模板缺少actions: {name}")
+
+        self.name = name
+        self.template = template
+        self.render_actions, self.placeholders = _compile_value(template["actions"])
+
+    def render(self, params):
+        """用参数渲染动作序列"""
+        try:
+            return self.render_actions(params)
+        except KeyError as e:
+            raise TemplateError(f"模板 {self.name} 缺少参数: {e.args[0]}")
+
+def _iter_csv(path, columns=None):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            yield {key: row[key] for key in columns} if columns else row
+
+def _iter_jsonl(path, columns=None):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                row = json.loads(line)
+                yield {key: row[key] for key in columns} if columns else row
+
+def _is_row_source(spec):
+    """维度是否为整行读取的文件来源"""
+    return isinstance(spec, dict) and ("csv" in spec or "jsonl" in spec) and not spec.get("column")
+
+def _dimension(name, spec):
+    """
+    将一个参数维度转换为返回新迭代器的函数（文件来源每次重新打开，不缓存到内存）
+
+    支持的写法：
+        "search_term": ["a", "b"]                               取值列表
+        "search_term": {"csv": "keywords.csv", "column": "kw"}  CSV的一列
+        "account": {"csv": "accounts.csv"}                      CSV的每一行（列名即参数名）
+        "account": {"jsonl": "accounts.jsonl"}                  JSONL的每一行
+        "site": "https://github.com"                            固定值
+    """
+    if isinstance(spec, dict) and ("csv" in spec or "jsonl" in spec):
+        path = Path(spec.get("csv") or spec.get("jsonl"))
+        reader = _iter_csv if "csv" in spec else _iter_jsonl
+        column = spec.get("column")
+        if column:
+            return lambda: ({name: row[column]} for row in reader(path, [column]))
+        return lambda: reader(path, spec.get("columns"))
+
+    if isinstance(spec, (list, tuple)):
+        return lambda: ({name: value} for value in spec)
+
+    return lambda: iter([{name: spec}])
+
+def matrix_parameter_names(matrix):
+    """参数矩阵产出的参数名；含整行读取的文件来源时参数名在读取前未知，返回None"""
+    if any(_is_row_source(spec) for spec in (matrix or {}).values()):
+        return None
+    return set(matrix or {})
+
+def iter_parameter_matrix(matrix):
+    """
+    按参数矩阵产出参数字典（各维度的笛卡尔积，最后一个维度变化最快）
+
+    Args:
+        matrix: {维度名: 维度定义}，见_dimension
+    """
+    dimensions = [_dimension(name, spec) for name, spec in (matrix or {}).items()]
+
+    def product(index, params):
+        if index == len(dimensions):
+            yield params
+            return
+        for fragment in dimensions[index]():
+            yield from product(index + 1, {**params, **fragment})
+
+    yield from product(0, {})
+
+class TemplateLibrary:
+    def __init__(self, config_file="automation_config.json"):
+        """
+        加载并编译配置文件中的task_templates
+
+        Args:
+            config_file: 配置文件路径或配置字典
+        """
+        if isinstance(config_file, dict):
+            config = config_file
+        else:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+
+        self.templates = {
+            name: CompiledTemplate(name, template)
+            for name, template in config.get("task_templates", {}).items()
+        }
+
+    def get(self, name):
+        template = self.templates.get(name)
+        if template is None:
+            raise TemplateError(f"未知的任务模板: {name}")
+        return template
+
+    def expand(self, name, matrix=None, chrome_num="any", priority=None, task_id_format="{template}_{index}",
+               **options):
+        """
+        按参数矩阵展开模板
+
+        Args:
+            name: 模板名
+            matrix: 参数矩阵，见iter_parameter_matrix
+            chrome_num: Chrome实例编号，参数中包含chrome_num时以参数为准；
+                        默认"any"，执行时需要配置chrome_instances才能分配实例
+            priority: 任务优先级，默认取模板的priority
+            task_id_format: 任务ID格式，可使用{template}、{index}及任意参数
+            options: 任务级选项（如task_timeout）
+
+        Returns:
+            产出任务配置字典的生成器（可直接交给add_batch_tasks）
+        """
+        template = self.get(name)
+        # 整行读取的文件来源的参数名在读取前未知，此时在渲染时再检查
+        names = matrix_parameter_names(matrix)
+        if names is not None:
+            missing = template.placeholders - names
+            if missing:
+                raise TemplateError(f"模板 {name} 缺少参数: {sorted(missing)}")
+
+        metadata = {
+            "template": name,
+            "description": template.template.get("name", name),
+            "category": template.template.get("category", name)
+        }
+        if priority is None:
+            priority = template.template.get("priority", 1)
+
+        return self._generate(template, matrix, metadata, chrome_num, priority, task_id_format, options)
+
+    def _generate(self, template, matrix, metadata, chrome_num, priority, task_id_format, options):
+        name = template.name
+        for index, params in enumerate(iter_parameter_matrix(matrix)):
+            try:
+                task_id = task_id_format.format(template=name, index=index, **params)
+            except KeyError as e:
+                raise TemplateError(f"任务ID格式引用了不存在的参数: {e.args[0]}")
+
+            task_config = {
+                "task_id": task_id,
+                "chrome_num": params.get("chrome_num", chrome_num),
+                "actions": template.render(params),
+                "priority": priority,
+                "metadata": dict(metadata)
+            }
+            for option in TEMPLATE_TASK_OPTIONS:
+                if option in template.template:
+                    task_config[option] = template.template[option]
+            task_config.update(options)
+            yield task_config
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务看门狗
+为每个运行中的任务设置截止时间，超时后中断其浏览器会话并通知调度器
+"""
+
+import time
+import heapq
+import threading
+
+class TaskWatchdog:
+    def __init__(self, on_timeout=None, clock=time.time):
+        """
+        初始化看门狗
+
+        Args:
+            on_timeout: 任务超时回调 on_timeout(task_id)，在看门狗线程中调用
+            clock: 时钟函数
+        """
+        self.on_timeout = on_timeout
+        self.clock = clock
+        self.entries = {}     # task_id -> {"deadline", "abort_callbacks", "timed_out"}
+        self.deadlines = []   # (deadline, task_id) 最小堆
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+
+    def start_task(self, task_id, timeout):
+        """开始监视任务，timeout秒后视为超时"""
+        deadline = self.clock() + timeout
+        with self.condition:
+            self.entries[task_id] = {
+                "deadline": deadline,
+                "abort_callbacks": [],
+                "timed_out": False
+            }
+            heapq.heappush(self.deadlines, (deadline, task_id))
+            self._ensure_thread()
+            self.condition.notify()
+
+    def register_abort(self, task_id, callback):
+        """注册任务超时时用于中断浏览器会话的回调"""
+        with self.condition:
+            entry = self.entries.get(task_id)
+            if entry is None:
+                return
+            if not entry["timed_out"]:
+                entry["abort_callbacks"].append(callback)
+                return
+        # 注册时任务已经超时，立即中断
+        self._run_abort(task_id, callback)
+
+    def finish_task(self, task_id):
+        """
+        结束监视任务
+
+        Returns:
+            任务是否已经超时
+        """
+        with self.condition:
+            entry = self.entries.pop(task_id, None)
+        return bool(entry and entry["timed_out"])
+
+    def is_timed_out(self, task_id):
+        """任务是否已超时"""
+        with self.condition:
+            entry = self.entries.get(task_id)
+            return bool(entry and entry["timed_out"])
+
+    def stop(self):
+        """停止看门狗线程"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def _ensure_thread(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self.thread.start()
+
+    def _pop_expired(self, now):
+        """取出已到截止时间的任务（需持有condition）"""
+        expired = []
+        while self.deadlines and self.deadlines[0][0] <= now:
+            deadline, task_id = heapq.heappop(self.deadlines)
+            entry = self.entries.get(task_id)
+            # 忽略已结束或已重新登记的任务
+            if entry and not entry["timed_out"] and entry["deadline"] == deadline:
+                entry["timed_out"] = True
+                expired.append((task_id, entry["abort_callbacks"]))
+        return expired
+
+    def _expire(self, expired):
+        for task_id, callbacks in expired:
+            print(f"⏰ 任务超时，中断浏览器会话: {task_id}")
+            for callback in callbacks:
+                self._run_abort(task_id, callback)
+            if self.on_timeout:
+                self.on_timeout(task_id)
+
+    def check(self):
+        """
+        立即处理已到截止时间的任务（看门狗线程会自动处理，主要用于测试）
+
+        Returns:
+            超时的任务ID列表
+        """
+        with self.condition:
+            expired = self._pop_expired(self.clock())
+        self._expire(expired)
+        return [task_id for task_id, _ in expired]
+
+    def _watch_loop(self):
+        """等待最早的截止时间，处理超时任务"""
+        while True:
+            with self.condition:
+                if not self.running:
+                    return
+
+                now = self.clock()
+                expired = self._pop_expired(now)
+                if not expired:
+                    wait_time = self.deadlines[0][0] - now if self.deadlines else None
+                    self.condition.wait(wait_time)
+                    continue
+
+            self._expire(expired)
+
+    def _run_abort(self, task_id, callback):
+        try:
+            callback()
+        except Exception as e:
+            print(f"⚠️ 中断任务 {task_id} 的会话时出错: {e}")
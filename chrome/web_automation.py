@@ -14,6 +14,7 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from dom_waiter import wait_for_selectors, by_to_selector
 
 class WebAutomation:
     def __init__(self, chrome_num, timeout=10):
@@ -55,18 +56,26 @@ class WebAutomation:
             print(f"❌ 导航失败: {e}")
             return False
     
-    def find_element_safe(self, by, value, timeout=None):
-        """安全查找元素"""
-        timeout = timeout or self.timeout
+    def _wait_for_presence(self, by, value, timeout):
+        """等待元素出现：能转换为选择器时在页内事件驱动等待，否则使用WebDriverWait轮询"""
+        selector = by_to_selector(by, value)
+        if selector is not None:
+            element, _ = wait_for_selectors(self.driver, [selector], timeout)
+            return element
         try:
-            element = WebDriverWait(self.driver, timeout).until(
+            return WebDriverWait(self.driver, timeout).until(
                 EC.presence_of_element_located((by, value))
             )
-            return element
         except TimeoutException:
-            print(f"⚠️ 元素未找到: {by}={value}")
             return None
     
+    def find_element_safe(self, by, value, timeout=None):
+        """安全查找元素"""
+        element = self._wait_for_presence(by, value, timeout or self.timeout)
+        if element is None:
+            print(f"⚠️ 元素未找到: {by}={value}")
+        return element
+    
     def click_element(self, by, value, timeout=None):
         """点击元素"""
         element = self.find_element_safe(by, value, timeout)
@@ -114,16 +123,12 @@ class WebAutomation:
     
     def wait_for_element(self, by, value, timeout=None):
         """等待元素出现"""
-        timeout = timeout or self.timeout
-        try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((by, value))
-            )
+        element = self._wait_for_presence(by, value, timeout or self.timeout)
+        if element is not None:
             print(f"✅ 元素已出现: {by}={value}")
-            return element
-        except TimeoutException:
+        else:
             print(f"⏰ 等待超时: {by}={value}")
-            return None
+        return element
     
     def get_element_text(self, by, value):
         """获取元素文本"""
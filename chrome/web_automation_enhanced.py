@@ -9,17 +9,19 @@ import time
 import json
 from pathlib import Path
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException
 from chrome_popup_handler import ChromePopupHandler
+from action_checkpoint import page_matches
+from selector_resolver import resolve_selectors
+from dom_waiter import wait_for_selectors, wait_for_ready_state, SCRIPT_TIMEOUT_MARGIN
+from action_compiler import batch_end, compile_steps, SELENIUM_BATCH_SCRIPT
 
 class EnhancedWebAutomation:
-    def __init__(self, chrome_num, timeout=15, config_file=None):
+    def __init__(self, chrome_num, timeout=15, config_file=None, session_pool=None, selector_cache=None):
         """
         初始化增强版网页自动化操作
         
@@ -27,13 +29,23 @@ class EnhancedWebAutomation:
             chrome_num: Chrome实例编号
             timeout: 默认等待超时时间
             config_file: 配置文件路径
+            session_pool: WebDriver会话池，提供时复用会话而不是每次新建
+            selector_cache: 选择器排名缓存（SelectorCache），提供时优先尝试历史命中的选择器
         """
         self.chrome_num = chrome_num
         self.timeout = timeout
+        self.session_pool = session_pool
+        self.selector_cache = selector_cache
         self.driver = None
         self.wait = None
         self.popup_handler = None
         self.operation_log = []
+        self.aborted = False
+        self.start_index = 0
+        # 最近一次smart_find_element命中的选择器
+        self.last_selector = None
+        # 当前生效的网络资源拦截策略
+        self.resource_policy = None
         
         # 加载配置
         self.config = self.load_config(config_file)
@@ -50,7 +62,9 @@ class EnhancedWebAutomation:
             "retry_delay": 2,
             "implicit_wait": 10,
             "page_load_timeout": 30,
-            "element_wait_timeout": 15
+            "element_wait_timeout": 15,
+            "event_driven_waits": True,
+            "batch_actions": False
         }
     
     def connect_to_chrome(self):
@@ -61,7 +75,10 @@ class EnhancedWebAutomation:
         chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{debug_port}")
         
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            if self.session_pool:
+                self.driver = self.session_pool.checkout(debug_port)
+            else:
+                self.driver = webdriver.Chrome(options=chrome_options)
             self.driver.implicitly_wait(self.config.get("implicit_wait", 10))
             self.driver.set_page_load_timeout(self.config.get("page_load_timeout", 30))
             
@@ -74,6 +91,46 @@ class EnhancedWebAutomation:
             self.log_operation("connect", f"连接Chrome_{self.chrome_num}失败: {e}", "ERROR")
             return False
     
+    def apply_resource_policy(self, policy):
+        """
+        通过CDP Network.setBlockedURLs拦截策略中的资源（URL模式，资源类型按扩展名近似）
+        block_third_party和allow_urls无法执行，被拦截的请求也不计数（拦截统计仅CDP异步引擎提供）
+        
+        Args:
+            policy: ResourcePolicy，None表示不拦截
+        
+        Returns:
+            是否已生效
+        """
+        if policy is None:
+            return False
+        patterns = policy.blocked_url_patterns()
+        ignored = policy.webdriver_ignored_rules()
+        if ignored:
+            self.log_operation("resource_policy", f"WebDriver会话不支持以下规则，已忽略: {', '.join(ignored)}", "WARNING")
+        if not patterns:
+            return False
+        
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except Exception as e:
+            self.log_operation("resource_policy", f"设置资源拦截失败: {e}", "ERROR")
+            return False
+        self.resource_policy = policy
+        self.log_operation("resource_policy", f"已启用资源拦截: {policy.name} ({len(patterns)} 个URL模式)")
+        return True
+    
+    def clear_resource_policy(self):
+        """取消资源拦截（复用的会话归还前调用）"""
+        if self.resource_policy is None or not self.driver:
+            return
+        try:
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+        except Exception as e:
+            self.log_operation("resource_policy", f"取消资源拦截失败: {e}", "WARNING")
+        self.resource_policy = None
+    
     def log_operation(self, operation, message, level="INFO"):
         """记录操作日志"""
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
@@ -108,37 +165,46 @@ class EnhancedWebAutomation:
                 return False
         return False
     
-    def smart_find_element(self, selectors, timeout=None):
-        """智能元素查找 - 支持多种选择器"""
+    def smart_find_element(self, selectors, timeout=None, action="find"):
+        """
+        智能元素查找 - 支持多种选择器，所有选择器在同一次脚本调用中检查，共用一个超时
+        默认在页内通过MutationObserver等待元素出现，event_driven_waits为False时改为轮询
+        
+        Args:
+            selectors: 选择器或选择器列表（按优先级排列）
+            timeout: 等待超时（秒）
+            action: 动作类型，选择器排名缓存按页面和动作类型分别统计
+        """
         timeout = timeout or self.config.get("element_wait_timeout", 15)
-        wait = WebDriverWait(self.driver, timeout)
         
         if isinstance(selectors, str):
             selectors = [selectors]
         
-        for selector in selectors:
-            try:
-                # 尝试不同的定位方式
-                if selector.startswith("//"):
-                    element = wait.until(EC.presence_of_element_located((By.XPATH, selector)))
-                elif selector.startswith("#"):
-                    element = wait.until(EC.presence_of_element_located((By.ID, selector[1:])))
-                elif selector.startswith("."):
-                    element = wait.until(EC.presence_of_element_located((By.CLASS_NAME, selector[1:])))
-                else:
-                    element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                
-                self.log_operation("find_element", f"找到元素: {selector}")
-                return element
-            except TimeoutException:
-                continue
+        # 按历史命中调整选择器顺序
+        ordered = selectors
+        if self.selector_cache:
+            url = self.current_url()
+            ordered = self.selector_cache.rank(url, action, selectors)
+        
+        started = time.monotonic()
+        if self.config.get("event_driven_waits", True):
+            element, selector = wait_for_selectors(self.driver, ordered, timeout)
+        else:
+            element, selector = resolve_selectors(self.driver, ordered, timeout,
+                                                  self.config.get("poll_interval", 0.1))
+        if self.selector_cache:
+            self.selector_cache.record(url, action, selectors, ordered[0], selector, time.monotonic() - started)
+        self.last_selector = selector
+        if element is not None:
+            self.log_operation("find_element", f"找到元素: {selector} ({time.monotonic() - started:.2f}秒)")
+            return element
         
         self.log_operation("find_element", f"未找到任何元素: {selectors}", "ERROR")
         return None
     
     def smart_click(self, selectors, timeout=None):
         """智能点击 - 支持多种点击方式"""
-        element = self.smart_find_element(selectors, timeout)
+        element = self.smart_find_element(selectors, timeout, action="click")
         if not element:
             return False
         
@@ -165,7 +231,7 @@ class EnhancedWebAutomation:
     
     def smart_input(self, selectors, text, clear_first=True, timeout=None):
         """智能输入文本"""
-        element = self.smart_find_element(selectors, timeout)
+        element = self.smart_find_element(selectors, timeout, action="input")
         if not element:
             return False
         
@@ -181,58 +247,182 @@ class EnhancedWebAutomation:
     
     def wait_for_page_load(self, timeout=30):
         """等待页面完全加载"""
-        try:
-            WebDriverWait(self.driver, timeout).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
+        if wait_for_ready_state(self.driver, timeout):
             self.log_operation("page_load", "页面加载完成")
             return True
-        except TimeoutException:
-            self.log_operation("page_load", "页面加载超时", "ERROR")
-            return False
+        self.log_operation("page_load", "页面加载超时", "ERROR")
+        return False
+    
+    def current_url(self):
+        """当前页面URL，获取失败时返回None"""
+        try:
+            return self.driver.current_url
+        except Exception:
+            return None
     
-    def execute_action_sequence(self, actions):
-        """执行动作序列"""
+    def execute_action_sequence(self, actions, start_index=0, resume_marker=None, resume_fallback=0, batch=None):
+        """
+        执行动作序列
+        
+        Args:
+            actions: 动作列表
+            start_index: 从第几个动作开始执行（重试时从检查点继续）
+            resume_marker: 从检查点继续前当前页面应满足的URL标记
+            resume_fallback: 页面不符合标记时改为从该位置开始
+            batch: 是否将连续的输入/点击动作合并为一次脚本执行，None表示按配置batch_actions
+        
+        Returns:
+            动作结果列表，成功的动作带有检查点url
+        """
         results = []
+        use_batch = self.config.get("batch_actions", False) if batch is None else batch
+        
+        if start_index and resume_marker and not page_matches(resume_marker, self.current_url()):
+            self.log_operation("resume", f"页面状态与检查点不符，从第{resume_fallback+1}个动作重新开始", "WARNING")
+            start_index = resume_fallback
+        elif start_index:
+            self.log_operation("resume", f"从检查点继续执行: 第{start_index+1}个动作")
+        self.start_index = start_index
         
-        for i, action in enumerate(actions):
-            action_type = action.get("type")
-            success = False
+        # 批量脚本无法执行的动作位置，该动作改为逐步执行
+        single_step_at = None
+        i = start_index
+        while i < len(actions):
+            action = actions[i]
+            
+            if self.aborted:
+                self.log_operation("sequence", "会话已被中断，停止执行", "ERROR")
+                break
+            
+            end = batch_end(actions, i) if use_batch and i != single_step_at else i + 1
+            if end - i > 1:
+                batch_results = self.execute_action_batch(actions, i, end)
+                results.extend(batch_results)
+                i += len(batch_results)
+                if batch_results and not batch_results[-1]["success"]:
+                    failed = batch_results[-1]
+                    if "error" in failed or actions[failed["action_index"]].get("required", True):
+                        self.log_operation("sequence", f"必需动作失败，停止执行: {failed['action_type']}", "ERROR")
+                        break
+                if i < end:
+                    single_step_at = i
+                continue
             
             try:
-                if action_type == "navigate":
-                    success = self.navigate_to_with_retry(action["url"])
-                elif action_type == "click":
-                    success = self.smart_click(action["selectors"])
-                elif action_type == "input":
-                    success = self.smart_input(action["selectors"], action["text"])
-                elif action_type == "wait":
-                    time.sleep(action.get("seconds", 1))
-                    success = True
-                elif action_type == "wait_element":
-                    element = self.smart_find_element(action["selectors"])
-                    success = element is not None
+                action_result = self._execute_action(i, action)
+                results.append(action_result)
                 
-                results.append({
-                    "action_index": i,
-                    "action_type": action_type,
-                    "success": success
-                })
-                
-                if not success and action.get("required", True):
-                    self.log_operation("sequence", f"必需动作失败，停止执行: {action_type}", "ERROR")
+                if not action_result["success"] and action.get("required", True):
+                    self.log_operation("sequence", f"必需动作失败，停止执行: {action.get('type')}", "ERROR")
                     break
                     
             except Exception as e:
                 self.log_operation("sequence", f"动作执行异常: {e}", "ERROR")
                 results.append({
                     "action_index": i,
-                    "action_type": action_type,
+                    "action_type": action.get("type"),
                     "success": False,
                     "error": str(e)
                 })
                 break
+            i += 1
+        
+        return results
+    
+    def _execute_action(self, i, action):
+        """逐步执行单个动作"""
+        action_type = action.get("type")
+        success = False
+        
+        if action_type == "navigate":
+            success = self.navigate_to_with_retry(action["url"])
+        elif action_type == "click":
+            success = self.smart_click(action["selectors"])
+        elif action_type == "input":
+            success = self.smart_input(action["selectors"], action["text"])
+        elif action_type == "wait":
+            time.sleep(action.get("seconds", 1))
+            success = True
+        elif action_type == "wait_element":
+            element = self.smart_find_element(action["selectors"], action="wait_element")
+            success = element is not None
+        
+        action_result = {
+            "action_index": i,
+            "action_type": action_type,
+            "success": success
+        }
+        if "selectors" in action and self.last_selector:
+            action_result["selector"] = self.last_selector
+        if success:
+            self._check_page(action, action_result)
+        return action_result
+    
+    def _check_page(self, action, action_result):
+        """检查点：动作完成后的页面，声明了expect_url时校验页面状态"""
+        url = self.current_url()
+        action_result["url"] = url
+        if action.get("expect_url") and not page_matches(action["expect_url"], url):
+            self.log_operation("checkpoint", f"页面状态不符: 期望 {action['expect_url']}，实际 {url}", "ERROR")
+            action_result["success"] = False
+    
+    def execute_action_batch(self, actions, start, end):
+        """
+        在一次注入脚本中执行actions[start:end]（由action_compiler.batch_end确定的范围）
+        
+        Returns:
+            已执行动作的结果；少于批次动作数时，其后的动作需要逐步执行
+        """
+        url = self.current_url() if self.selector_cache else None
+        selector_order = None
+        if self.selector_cache:
+            selector_order = lambda action, selectors: self.selector_cache.rank(url, action["type"], selectors)
+        steps = compile_steps(actions, start, end, selector_order)
+        timeout = self.config.get("element_wait_timeout", 15)
+        
+        started = time.monotonic()
+        try:
+            self.driver.set_script_timeout(timeout * len(steps) + SCRIPT_TIMEOUT_MARGIN)
+            outcomes = self.driver.execute_async_script(SELENIUM_BATCH_SCRIPT, steps, int(timeout * 1000))
+        except Exception as e:
+            outcomes = None
+            if any(step["type"] == "click" for step in steps):
+                # 点击可能已经生效，不能再逐步重复执行
+                self.log_operation("batch", f"批量执行异常: {e}", "ERROR")
+                return [{"action_index": start, "action_type": steps[0]["type"], "success": False, "error": str(e)}]
+            self.log_operation("batch", f"批量执行异常，改为逐步执行: {e}", "WARNING")
+        if not outcomes:
+            return []
+        
+        results = []
+        for offset, outcome in enumerate(outcomes):
+            action = actions[start + offset]
+            candidates = steps[offset]["selectors"]
+            selector = candidates[outcome["selector"]] if outcome["success"] else None
+            if self.selector_cache:
+                self.selector_cache.record(url, action["type"], action["selectors"], candidates[0], selector,
+                                           outcome["ms"] / 1000)
+            action_result = {
+                "action_index": start + offset,
+                "action_type": action["type"],
+                "success": outcome["success"],
+                "batched": True
+            }
+            if selector:
+                action_result["selector"] = selector
+            results.append(action_result)
+        
+        page_url = self.current_url()
+        for action_result in results:
+            if action_result["success"]:
+                action_result["url"] = page_url
+        last = results[-1]
+        if last["success"]:
+            self._check_page(actions[last["action_index"]], last)
         
+        succeeded = sum(1 for r in results if r["success"])
+        self.log_operation("batch", f"批量执行第{start+1}-{start+len(results)}个动作: "
+                                    f"{succeeded}/{len(results)} 成功 ({time.monotonic() - started:.2f}秒)")
         return results
     
     def save_operation_log(self, filename=None):
@@ -250,9 +440,47 @@ class EnhancedWebAutomation:
             print(f"❌ 保存日志失败: {e}")
             return False
     
-    def close(self):
-        """关闭连接"""
+    def abort(self):
+        """
+        中断当前会话（任务超时时由看门狗调用）
+        结束chromedriver进程，使阻塞中的WebDriver调用立即失败
+        """
+        self.aborted = True
+        driver = self.driver
+        if not driver:
+            return
+        
+        if self.session_pool:
+            self.session_pool.discard(driver, quit_driver=False)
+        
+        try:
+            driver.service.process.kill()
+        except Exception:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.log_operation("abort", "任务超时，已中断WebDriver会话", "ERROR")
+    
+    def close(self, healthy=True):
+        """
+        关闭连接
+        
+        Args:
+            healthy: 会话是否仍可用（使用会话池时，不可用的会话不再复用）
+        """
+        if self.aborted:
+            self.driver = None
+            return
+        
         if self.driver:
+            self.clear_resource_policy()
+            if self.session_pool:
+                self.session_pool.checkin(self.driver, healthy=healthy)
+                self.driver = None
+                self.log_operation("close", "已归还WebDriver会话")
+                return
+            
             try:
                 self.driver.quit()
                 self.log_operation("close", "已关闭WebDriver连接")
@@ -265,4 +493,4 @@ class EnhancedWebAutomation:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """上下文管理器出口"""
-        self.close()
+        self.close(healthy=exc_type is None)
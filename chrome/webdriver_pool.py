@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebDriver会话池
+按Chrome调试端口复用WebDriver会话，避免每个任务都启动chromedriver和新建会话
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+def create_chrome_driver(debug_port):
+    """连接到指定调试端口的Chrome实例"""
+    chrome_options = Options()
+    chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{debug_port}")
+    return webdriver.Chrome(options=chrome_options)
+
+class PooledSession:
+    def __init__(self, debug_port, driver):
+        self.debug_port = debug_port
+        self.driver = driver
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.use_count = 0
+
+    def age(self):
+        return time.time() - self.created_at
+
+    def idle_time(self):
+        return time.time() - self.last_used
+
+class WebDriverSessionPool:
+    def __init__(self, max_sessions_per_port=1, max_idle_seconds=300, max_age_seconds=1800,
+                 checkout_timeout=60, driver_factory=create_chrome_driver):
+        """
+        初始化会话池
+
+        Args:
+            max_sessions_per_port: 每个调试端口最多同时存在的会话数
+            max_idle_seconds: 空闲超过该时间的会话被回收
+            max_age_seconds: 创建超过该时间的会话在归还时被回收重建
+            checkout_timeout: 端口会话全部被占用时的最长等待时间（秒）
+            driver_factory: 根据调试端口创建WebDriver的函数
+        """
+        self.max_sessions_per_port = max_sessions_per_port
+        self.max_idle_seconds = max_idle_seconds
+        self.max_age_seconds = max_age_seconds
+        self.checkout_timeout = checkout_timeout
+        self.driver_factory = driver_factory
+
+        self.idle_sessions = {}      # debug_port -> [PooledSession]
+        self.checked_out = {}        # id(driver) -> PooledSession
+        self.session_counts = {}     # debug_port -> 会话总数（空闲 + 借出）
+
+        self.stats = {
+            "created": 0,
+            "reused": 0,
+            "evicted": 0,
+            "unhealthy": 0
+        }
+
+        self.condition = threading.Condition()
+
+    def checkout(self, debug_port, timeout=None):
+        """
+        借出指定端口的WebDriver会话，优先复用空闲且健康的会话
+
+        Args:
+            debug_port: Chrome调试端口
+            timeout: 等待可用会话的超时时间（秒）
+
+        Returns:
+            WebDriver实例
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+
+        while True:
+            self._quit_sessions(self._evict_expired())
+            with self.condition:
+                idle = self.idle_sessions.get(debug_port)
+                session = idle.pop() if idle else None
+                can_create = session is None and self.session_counts.get(debug_port, 0) < self.max_sessions_per_port
+                if can_create:
+                    # 先占用名额，在锁外创建会话
+                    self.session_counts[debug_port] = self.session_counts.get(debug_port, 0) + 1
+                elif session is None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError(f"等待调试端口 {debug_port} 的WebDriver会话超时")
+                    self.condition.wait(remaining)
+                    continue
+
+            if session is not None:
+                if self._is_healthy(session):
+                    self._count("reused")
+                    return self._lend(session)
+                self._count("unhealthy")
+                self._discard_session(session)
+                continue
+
+            try:
+                driver = self.driver_factory(debug_port)
+            except Exception:
+                self._release_slot(debug_port)
+                raise
+            self._count("created")
+            return self._lend(PooledSession(debug_port, driver))
+
+    def checkin(self, driver, healthy=True):
+        """
+        归还WebDriver会话
+
+        Args:
+            driver: checkout借出的WebDriver实例
+            healthy: 会话是否仍可用，不可用的会话直接关闭
+        """
+        with self.condition:
+            session = self.checked_out.pop(id(driver), None)
+        if session is None:
+            return
+
+        session.last_used = time.time()
+        if not healthy or (self.max_age_seconds and session.age() > self.max_age_seconds):
+            self._count("evicted")
+            self._discard_session(session)
+            return
+
+        with self.condition:
+            self.idle_sessions.setdefault(session.debug_port, []).append(session)
+            self.condition.notify_all()
+
+    def discard(self, driver, quit_driver=True):
+        """从池中移除借出的会话（例如浏览器已被关闭）"""
+        with self.condition:
+            session = self.checked_out.pop(id(driver), None)
+        if session is not None:
+            self._discard_session(session, quit_driver)
+
+    def invalidate(self, debug_port):
+        """关闭指定端口的所有空闲会话，借出中的会话归还时照常处理"""
+        with self.condition:
+            sessions = self.idle_sessions.pop(debug_port, [])
+        for session in sessions:
+            self._discard_session(session)
+
+    @contextmanager
+    def session(self, debug_port, timeout=None):
+        """借出会话的上下文管理器，发生异常时丢弃会话"""
+        driver = self.checkout(debug_port, timeout)
+        try:
+            yield driver
+        except Exception:
+            self.checkin(driver, healthy=False)
+            raise
+        else:
+            self.checkin(driver)
+
+    def evict_idle(self):
+        """回收空闲或过期的会话"""
+        self._quit_sessions(self._evict_expired())
+
+    def close_all(self):
+        """关闭所有空闲会话"""
+        with self.condition:
+            sessions = [s for idle in self.idle_sessions.values() for s in idle]
+            self.idle_sessions.clear()
+        for session in sessions:
+            self._discard_session(session)
+
+    def get_stats(self):
+        """会话池统计信息"""
+        with self.condition:
+            return {
+                **self.stats,
+                "idle": sum(len(idle) for idle in self.idle_sessions.values()),
+                "checked_out": len(self.checked_out),
+                "ports": dict(self.session_counts)
+            }
+
+    def _count(self, key):
+        with self.condition:
+            self.stats[key] += 1
+
+    def _lend(self, session):
+        session.use_count += 1
+        session.last_used = time.time()
+        with self.condition:
+            self.checked_out[id(session.driver)] = session
+        return session.driver
+
+    def _is_healthy(self, session):
+        """健康检查：会话可通信，且当前窗口仍然存在"""
+        try:
+            handles = session.driver.window_handles
+            if not handles:
+                return False
+            try:
+                session.driver.current_window_handle
+            except Exception:
+                # 当前标签页已被关闭，切换到仍存在的标签页
+                session.driver.switch_to.window(handles[-1])
+            return True
+        except Exception:
+            return False
+
+    def _evict_expired(self):
+        """取出需要回收的空闲会话（调用方在锁外关闭）"""
+        expired = []
+        with self.condition:
+            for debug_port, idle in self.idle_sessions.items():
+                keep = []
+                for session in idle:
+                    if ((self.max_idle_seconds and session.idle_time() > self.max_idle_seconds) or
+                            (self.max_age_seconds and session.age() > self.max_age_seconds)):
+                        expired.append(session)
+                    else:
+                        keep.append(session)
+                idle[:] = keep
+            self.stats["evicted"] += len(expired)
+        return expired
+
+    def _quit_sessions(self, sessions):
+        for session in sessions:
+            self._discard_session(session)
+
+    def _discard_session(self, session, quit_driver=True):
+        if quit_driver:
+            try:
+                session.driver.quit()
+            except Exception:
+                pass
+        self._release_slot(session.debug_port)
+
+    def _release_slot(self, debug_port):
+        with self.condition:
+            count = self.session_counts.get(debug_port, 0) - 1
+            if count > 0:
+                self.session_counts[debug_port] = count
+            else:
+                self.session_counts.pop(debug_port, None)
+            self.condition.notify_all()
+
+# 全局会话池实例
+_global_pool = None
+_global_pool_lock = threading.Lock()
+
+def get_session_pool(**settings):
+    """
+    获取全局WebDriver会话池
+    
+    Args:
+        settings: 首次创建会话池时使用的参数，见WebDriverSessionPool
+    """
+    global _global_pool
+    with _global_pool_lock:
+        if _global_pool is None:
+            _global_pool = WebDriverSessionPool(**settings)
+        return _global_pool
@@ -0,0 +1,80 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from action_checkpoint import plan_resume, resume_failure, is_idempotent
+
+ACTIONS = [
+    {"type": "navigate", "url": "https://example.com/login"},
+    {"type": "input", "selectors": ["#user"], "text": "me"},
+    {"type": "click", "selectors": ["#next"], "expect_url": "/password"},
+    {"type": "input", "selectors": ["#password"], "text": "secret"},
+    {"type": "click", "selectors": ["#submit"]}
+]
+
+def results(failed_index, start=0, error=False):
+    items = [{"action_index": i, "success": True, "url": f"https://example.com/{i}"}
+             for i in range(start, failed_index)]
+    failed = {"action_index": failed_index, "success": False}
+    if error:
+        failed["error"] = "stale element"
+    return items + [failed]
+
+class TestPlanResume(unittest.TestCase):
+    def test_default_idempotency(self):
+        self.assertTrue(is_idempotent(ACTIONS[1]))
+        self.assertFalse(is_idempotent(ACTIONS[2]))
+        self.assertTrue(is_idempotent(dict(ACTIONS[2], idempotent=True)))
+
+    def test_resume_after_click_uses_expect_url(self):
+        plan = plan_resume(ACTIONS, results(3))
+        self.assertEqual(plan, {"resume_from": 3, "resume_fallback": 0, "resume_marker": "/password"})
+
+    def test_resume_uses_recorded_checkpoint(self):
+        plan = plan_resume(ACTIONS, results(2))
+        self.assertEqual(plan, {"resume_from": 2, "resume_fallback": 0, "resume_marker": "https://example.com/1"})
+
+    def test_non_idempotent_exception_rewinds(self):
+        self.assertIsNone(plan_resume(ACTIONS, results(4, error=True)))
+        actions = ACTIONS[:2] + [{"type": "navigate", "url": "https://example.com/app"},
+                                 {"type": "click", "selectors": ["#buy"]}]
+        plan = plan_resume(actions, results(3, error=True))
+        self.assertEqual(plan, {"resume_from": 2, "resume_fallback": 0, "resume_marker": None})
+
+    def test_failure_at_resume_point_keeps_marker(self):
+        plan = plan_resume(ACTIONS, results(3, start=3), start_index=3, start_marker="/password")
+        self.assertEqual(plan["resume_marker"], "/password")
+
+    def test_failed_optional_actions_are_skipped(self):
+        actions = [
+            {"type": "navigate", "url": "https://example.com/cart"},
+            {"type": "click", "selectors": ["#close-banner"], "required": False},
+            {"type": "click", "selectors": ["#checkout"], "expect_url": "/checkout"},
+            {"type": "input", "selectors": ["#coupon"], "text": "SAVE", "required": False},
+            {"type": "click", "selectors": ["#pay"]}
+        ]
+        optional_failed = [{"action_index": i, "success": i not in (1, 3), "url": f"https://example.com/{i}"}
+                           for i in range(4)]
+
+        # 序列因必需动作失败而停止：从该动作继续，之前失败的可选动作不再重试
+        stopped = optional_failed + [{"action_index": 4, "success": False}]
+        self.assertEqual(plan_resume(actions, stopped),
+                         {"resume_from": 4, "resume_fallback": 0, "resume_marker": "https://example.com/3"})
+
+        # 只有可选动作失败：从已成功的#checkout之后的失败动作继续，不重复点击
+        waited = actions[:4] + [{"type": "wait", "seconds": 1}]
+        finished = optional_failed + [{"action_index": 4, "success": True}]
+        self.assertEqual(plan_resume(waited, finished),
+                         {"resume_from": 3, "resume_fallback": 0, "resume_marker": "/checkout"})
+
+        # 失败的可选动作都在已成功的#pay之前，没有可以安全重试的动作
+        self.assertIsNone(resume_failure(actions, finished))
+
+    def test_first_action_failure_restarts(self):
+        self.assertIsNone(plan_resume(ACTIONS, results(0)))
+        self.assertIsNone(plan_resume(ACTIONS, [{"action_index": 0, "success": True}]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from action_compiler import batch_end, compile_steps, is_batchable
+
+def action(action_type, selector=None, **fields):
+    result = {"type": action_type, **fields}
+    if selector:
+        result["selectors"] = [selector]
+    return result
+
+class TestActionCompiler(unittest.TestCase):
+    def test_inputs_and_trailing_click_form_one_batch(self):
+        actions = [
+            action("navigate", url="https://x.com"),
+            action("input", "#user", text="me"),
+            action("input", "#pass", text="pw"),
+            action("click", "#submit"),
+            action("input", "#next", text="x")
+        ]
+        self.assertEqual(batch_end(actions, 0), 1)
+        self.assertEqual(batch_end(actions, 1), 4)
+        # 批次末尾只剩一个动作时不合并
+        self.assertEqual(batch_end(actions, 4), 5)
+
+    def test_batch_boundaries(self):
+        actions = [
+            action("input", "#a", text="1"),
+            action("input", "#b", text="2", expect_url="/step2"),
+            action("input", "#c", text="3"),
+            action("input", "#d", text="4", trusted=True),
+            action("wait", seconds=1)
+        ]
+        self.assertEqual(batch_end(actions, 0), 2)
+        self.assertEqual(batch_end(actions, 2), 3)
+        self.assertFalse(is_batchable(actions[3]))
+        self.assertFalse(is_batchable(actions[4]))
+
+    def test_compile_steps(self):
+        actions = [action("input", "#a", text="1", required=False), action("click", "#go")]
+        actions[1]["selectors"] = ["#go", "//button"]
+        steps = compile_steps(actions, 0, 2, selector_order=lambda a, selectors: list(reversed(selectors)))
+        self.assertEqual(steps[0], {"type": "input", "selectors": ["#a"], "text": "1", "clear": True,
+                                    "required": False})
+        self.assertEqual(steps[1]["selectors"], ["//button", "#go"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import sys
+import asyncio
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from cdp_async_engine import AsyncCDPEngine, CDPConnection, CDPTab, CDPError, FIND_ELEMENT_JS
+from resource_blocking import ResourcePolicy, BlockingCounters
+
+class FakeConnection(CDPConnection):
+    """不经过WebSocket，按方法名返回预设结果的CDP连接"""
+    def __init__(self, evaluate_results=None):
+        super().__init__("ws://fake")
+        self.sent = []
+        self.evaluate_results = list(evaluate_results or [])
+
+    async def send(self, method, params=None, session_id=None, timeout=30):
+        self.sent.append((method, params))
+        if method == "Target.createTarget":
+            return {"targetId": "T1"}
+        if method == "Target.attachToTarget":
+            return {"sessionId": "S1"}
+        if method == "Runtime.evaluate":
+            result = self.evaluate_results.pop(0) if self.evaluate_results else 0
+            if isinstance(result, Exception):
+                raise result
+            return {"result": {"value": result}}
+        return {}
+
+    async def close(self):
+        pass
+
+    def methods(self):
+        return [method for method, _ in self.sent]
+
+class FakeEngine(AsyncCDPEngine):
+    async def get_connection(self, chrome_num):
+        connection = self.connections.get(chrome_num)
+        if connection is None:
+            connection = self.connections[chrome_num] = FakeConnection()
+            self.instance_limits[chrome_num] = asyncio.Semaphore(self.max_tabs_per_instance)
+        return connection
+
+def make_tab(connection):
+    return CDPTab(connection, "T1", "S1", 11, {"element_wait_timeout": 1})
+
+class TestCDPTab(unittest.TestCase):
+    def test_click_is_deferred(self):
+        self.assertIn("setTimeout(function() { element.click(); }, 0)", FIND_ELEMENT_JS)
+
+    def test_find_retries_after_context_destroyed(self):
+        connection = FakeConnection([CDPError("Execution context was destroyed"), 1])
+        selector = asyncio.run(make_tab(connection).find(["#a", "#b"], action="click"))
+        self.assertEqual(selector, "#b")
+        self.assertEqual(connection.methods(), ["Runtime.evaluate", "Runtime.evaluate"])
+
+    def test_find_not_found(self):
+        connection = FakeConnection([-1])
+        self.assertIsNone(asyncio.run(make_tab(connection).find("#a")))
+
+    def test_resource_policy_fails_blocked_requests(self):
+        async def run():
+            connection = FakeConnection()
+            tab = make_tab(connection)
+            counters = BlockingCounters()
+            await tab.apply_resource_policy(ResourcePolicy.resolve("minimal"), counters)
+            tab.page_url = "https://shop.com/"
+            for url, resource_type in [("https://shop.com/a.png", "Image"), ("https://ads.net/x.js", "Script"),
+                                       ("https://cdn.shop.com/app.js", "Script")]:
+                for callback in connection.listeners[("S1", "Fetch.requestPaused")]:
+                    callback({"requestId": url, "resourceType": resource_type, "request": {"url": url}})
+            await asyncio.sleep(0)
+            await tab.close()
+            return connection, counters
+
+        connection, counters = asyncio.run(run())
+        self.assertEqual(connection.methods(), ["Fetch.enable", "Fetch.failRequest", "Fetch.failRequest",
+                                                "Fetch.continueRequest", "Target.closeTarget"])
+        self.assertEqual(counters.summary()["blocked_requests"], 2)
+        self.assertEqual(connection.listeners[("S1", "Fetch.requestPaused")], [])
+
+class TestAsyncCDPEngine(unittest.TestCase):
+    def test_any_instance_tasks_spread_across_instances(self):
+        engine = FakeEngine(config_file={"chrome_instances": [11, 12]})
+        tasks = [{"task_id": f"t{i}", "chrome_num": "any", "actions": [{"type": "wait", "seconds": 0.05}]}
+                 for i in range(4)]
+        results = engine.run(tasks)
+        self.assertEqual([r["status"] for r in results], ["completed"] * 4)
+        self.assertEqual(sorted(r["chrome_num"] for r in results), [11, 11, 12, 12])
+        self.assertEqual(engine.open_tabs, {11: 0, 12: 0})
+
+    def test_any_instance_without_instances_fails_up_front(self):
+        engine = FakeEngine(config_file={})
+        results = engine.run([{"task_id": "t", "chrome_num": "any", "actions": []},
+                              {"task_id": "p", "chrome_num": 11, "actions": []}])
+        self.assertEqual((results[0]["status"], results[0]["error_type"]), ("failed", "no_instances"))
+        self.assertEqual(results[1]["chrome_num"], 11)
+
+if __name__ == "__main__":
+    unittest.main()
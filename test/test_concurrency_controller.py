@@ -0,0 +1,44 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from concurrency_controller import AdaptiveConcurrencyController
+
+def metrics(cpu=20, memory=50, available_gb=8):
+    return {"system": {"cpu_percent": cpu, "memory_percent": memory, "memory_available_gb": available_gb}}
+
+class TestAdaptiveConcurrencyController(unittest.TestCase):
+    def setUp(self):
+        self.controller = AdaptiveConcurrencyController(10, initial_limit=4, window=4)
+
+    def test_additive_increase_only_when_saturated(self):
+        self.controller.note_in_flight(2)
+        self.assertEqual(self.controller.adjust(metrics()), 4)
+        self.controller.note_in_flight(4)
+        self.assertEqual(self.controller.adjust(metrics()), 5)
+
+    def test_multiplicative_decrease_on_pressure(self):
+        self.controller.limit = 10
+        self.assertEqual(self.controller.adjust(metrics(cpu=95)), 7)
+        for _ in range(4):
+            self.controller.record_result(1.0, False)
+        self.assertEqual(self.controller.adjust(metrics()), 4)
+
+    def test_latency_above_baseline(self):
+        for _ in range(4):
+            self.controller.record_result(1.0, True)
+        self.controller.adjust(metrics())
+        for _ in range(4):
+            self.controller.record_result(5.0, True)
+        self.assertEqual(self.controller.adjust(metrics()), 2)
+
+    def test_memory_exhaustion_closes_admission(self):
+        self.controller.adjust(metrics(memory=97))
+        self.assertFalse(self.controller.admission_open)
+        self.controller.adjust(metrics(available_gb=4))
+        self.assertTrue(self.controller.admission_open)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+import dom_waiter
+from dom_waiter import wait_for_selectors, wait_for_ready_state, by_to_selector
+
+try:
+    import selenium
+    from selenium.common.exceptions import JavascriptException, InvalidSessionIdException
+except ImportError:
+    selenium = None
+
+class FakeDriver:
+    def __init__(self, results):
+        self.results = list(results)
+        self.script_timeouts = []
+        self.calls = []
+
+    def set_script_timeout(self, seconds):
+        self.script_timeouts.append(seconds)
+
+    def execute_async_script(self, script, *args):
+        self.calls.append(args)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestDomWaiter(unittest.TestCase):
+    def test_waits_once_in_page(self):
+        driver = FakeDriver([[1, "element"]])
+        self.assertEqual(wait_for_selectors(driver, ["#a", "#b"], timeout=2), ("element", "#b"))
+        self.assertEqual(len(driver.calls), 1)
+        selectors, timeout_ms = driver.calls[0]
+        self.assertEqual(selectors, ["#a", "#b"])
+        self.assertLessEqual(timeout_ms, 2000)
+        # 脚本超时留有余量，页内计时先到
+        self.assertGreater(driver.script_timeouts[0], 2)
+
+    def test_rewaits_after_navigation(self):
+        driver = FakeDriver([JavascriptException("document unloaded while waiting for result"), [0, "element"]])
+        self.assertEqual(wait_for_selectors(driver, "#a", timeout=2), ("element", "#a"))
+        self.assertEqual(len(driver.calls), 2)
+
+    def test_dead_session_not_retried(self):
+        driver = FakeDriver([InvalidSessionIdException("invalid session id"), [0, "element"]])
+        started = time.monotonic()
+        with self.assertRaises(InvalidSessionIdException):
+            wait_for_selectors(driver, "#a", timeout=5)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(len(driver.calls), 1)
+
+    def test_timeout(self):
+        self.assertEqual(wait_for_selectors(FakeDriver([None]), ["#a"], timeout=0.1), (None, None))
+        self.assertFalse(wait_for_ready_state(FakeDriver([False]), timeout=0.1))
+        self.assertTrue(wait_for_ready_state(FakeDriver([True]), timeout=0.1))
+
+class TestSelectorConversion(unittest.TestCase):
+    def test_by_to_selector(self):
+        self.assertEqual(by_to_selector("id", "kw"), '//*[@id="kw"]')
+        self.assertEqual(by_to_selector("xpath", "/html/body"), "(/html/body)")
+        self.assertEqual(by_to_selector("class name", "btn-primary"), ".btn-primary")
+        self.assertEqual(by_to_selector("css selector", "div > a"), "div > a")
+        self.assertIsNone(by_to_selector("xpath", "./a"))
+        self.assertIsNone(by_to_selector("id", 'a"b'))
+
+    def test_script_wraps_wait_function(self):
+        self.assertIn("MutationObserver", dom_waiter.SELENIUM_WAIT_FOR_SELECTORS)
+        self.assertIn("arguments[arguments.length - 1]", dom_waiter.SELENIUM_WAIT_FOR_READY_STATE)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from instance_health import CircuitBreaker, InstanceHealthMonitor, CLOSED, OPEN, HALF_OPEN
+from execution_lanes import LaneScheduler
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=3, window=10, open_seconds=10,
+                                      max_open_seconds=30, clock=self.clock)
+
+    def test_opens_after_consecutive_hard_failures(self):
+        for _ in range(3):
+            self.breaker.record_success()
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.breaker.record_success()
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.can_dispatch())
+
+    def test_opens_on_action_failure_rate(self):
+        for _ in range(4):
+            self.breaker.record_failure(hard=False)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.record_failure(hard=False)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_half_open_trial(self):
+        self.breaker.trip()
+        self.clock.now = 10
+        self.assertTrue(self.breaker.can_dispatch())
+        self.breaker.on_dispatch()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.can_dispatch())
+
+        # 试探失败，冷却时间翻倍
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.clock.now = 25
+        self.assertFalse(self.breaker.can_dispatch())
+        self.clock.now = 30
+        self.breaker.on_dispatch()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.down_for(), 0)
+
+class TestInstanceHealthMonitor(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.down = {2}
+        self.monitor = InstanceHealthMonitor(
+            probe=lambda port, timeout: None if port - 10000 in self.down else 0.01,
+            probe_interval=0, give_up_seconds=60, open_seconds=10, clock=self.clock
+        )
+
+    def test_probe_opens_and_recovers(self):
+        latencies = self.monitor.probe_all([1, 2])
+        self.assertIsNone(latencies[2])
+        self.assertFalse(self.monitor.can_dispatch(2))
+        self.assertEqual(self.monitor.health_score(2), 0.0)
+
+        self.down.clear()
+        self.monitor.probe_all([1, 2])
+        self.assertTrue(self.monitor.can_dispatch(2))
+
+    def test_given_up(self):
+        self.monitor.probe_all([2])
+        self.clock.now = 59
+        self.assertFalse(self.monitor.is_given_up(2))
+        self.clock.now = 61
+        self.assertTrue(self.monitor.is_given_up(2))
+
+    def test_scheduler_routes_around_open_instance(self):
+        lanes = LaneScheduler(chrome_instances=[1, 2], health=self.monitor)
+        self.monitor.probe_all([1, 2])
+        for i in range(3):
+            lanes.push({"task_id": f"t{i}", "chrome_num": "any", "priority": 1})
+        lanes.push({"task_id": "p2", "chrome_num": 2, "priority": 1})
+
+        task = lanes.pop()
+        self.assertEqual(task["assigned_chrome"], 1)
+        self.assertIsNone(lanes.pop())
+
+        # 不可用实例的专属任务被取出，可迁移任务保留
+        evicted = lanes.evict_lane(2)
+        self.assertEqual([t["task_id"] for t in evicted], ["p2"])
+        self.assertEqual(lanes.qsize(), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from rate_limiter import DomainRateLimiter, task_domains
+
+def make_task(url, category=None):
+    return {
+        "task_id": url,
+        "actions": [{"type": "navigate", "url": url}, {"type": "wait", "seconds": 1}],
+        "metadata": {"category": category} if category else {}
+    }
+
+class TestDomainRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.limiter = DomainRateLimiter(
+            domains={"google.com": {"rate": 1, "burst": 1}},
+            categories={"login": {"max_concurrent": 1}},
+            clock=lambda: self.now
+        )
+
+    def test_task_domains(self):
+        self.assertEqual(task_domains(make_task("https://www.google.com/search?q=x")), ["www.google.com"])
+
+    def test_deferred_tasks_keep_reservation_order(self):
+        first, second, third = (make_task("https://www.google.com/") for _ in range(3))
+        self.assertEqual(self.limiter.acquire(first), 0)
+        self.assertEqual(self.limiter.acquire(second), 1.0)
+        self.assertEqual(self.limiter.acquire(third), 2.0)
+
+        self.now = 1.0
+        self.assertEqual(self.limiter.acquire(second), 0)
+        self.assertEqual(self.limiter.get_stats()["domain:google.com"], {"active": 2, "deferred": 2})
+
+    def test_concurrency_cap(self):
+        first, second = make_task("https://a.com/", "login"), make_task("https://b.com/", "login")
+        self.assertEqual(self.limiter.acquire(first), 0)
+        self.assertGreater(self.limiter.acquire(second), 0)
+        self.limiter.release(first)
+        self.assertEqual(self.limiter.acquire(second), 0)
+
+    def test_unlimited_domain(self):
+        self.assertEqual(self.limiter.acquire(make_task("https://github.com/")), 0)
+
+if __name__ == "__main__":
+    unittest.main()
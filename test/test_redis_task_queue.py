@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Redis分布式任务队列测试（需要本地运行 redis-server）
+"""
+
+import os
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from redis_task_queue import RedisTaskQueue, redis
+
+try:
+    import selenium
+    from task_queue_manager import TaskQueueManager
+except ImportError:
+    selenium = None
+
+def connect_local_redis():
+    """连接本地Redis，优先使用REDIS_PASSWORD（默认与redis_test.py相同）"""
+    for password in (os.environ.get("REDIS_PASSWORD", "gj"), None):
+        try:
+            client = redis.Redis(host='localhost', port=6379, db=0, password=password, decode_responses=True)
+            client.ping()
+            return client
+        except redis.AuthenticationError:
+            continue
+        except redis.ResponseError:
+            continue
+        except redis.ConnectionError:
+            return None
+    return None
+
+@unittest.skipIf(redis is None, "未安装redis")
+class TestRedisTaskQueue(unittest.TestCase):
+    def setUp(self):
+        client = connect_local_redis()
+        if client is None:
+            self.skipTest("本地Redis不可用")
+        self.queue = RedisTaskQueue(client=client, namespace=f"rpa_test_{os.getpid()}", visibility_timeout=1)
+        self.queue.clear()
+
+    def tearDown(self):
+        self.queue.clear()
+
+    def make_tasks(self, count):
+        return [{"task_id": f"task_{i}", "chrome_num": "any", "actions": [], "priority": 1} for i in range(count)]
+
+    def test_push_claim_ack(self):
+        self.assertEqual(self.queue.push_tasks(self.make_tasks(5), batch_size=2), 5)
+        claimed = self.queue.claim(3)
+        self.assertEqual([task["task_id"] for task in claimed], ["task_0", "task_1", "task_2"])
+        self.assertEqual(self.queue.get_stats()["processing"], 3)
+
+        for task in claimed:
+            self.queue.ack(task["remote_id"], {"task_id": task["task_id"], "status": "completed"})
+
+        last_id, results = self.queue.read_results()
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.queue.get_stats(), {"pending": 2, "processing": 0, "results": 3})
+
+    def test_expired_tasks_are_requeued(self):
+        self.queue.push_tasks(self.make_tasks(2))
+        claimed = self.queue.claim(2)
+        self.queue.extend([claimed[0]["remote_id"]])
+        time.sleep(1.1)
+        self.queue.extend([claimed[0]["remote_id"]])
+        self.assertEqual(self.queue.requeue_expired(), 1)
+        self.assertEqual([task["task_id"] for task in self.queue.claim(5)], ["task_1"])
+
+    def test_late_ack_removes_requeued_task(self):
+        self.queue.push_tasks([{"task_id": "slow", "chrome_num": 12, "actions": []}])
+        claimed = self.queue.claim(1)
+        time.sleep(1.1)
+        self.assertEqual(self.queue.requeue_expired(), 1)
+
+        self.queue.ack(claimed[0]["remote_id"], {"task_id": "slow", "status": "completed"})
+        self.assertEqual(self.queue.get_stats(), {"pending": 0, "processing": 0, "results": 1})
+        self.assertEqual(self.queue.claim(1), [])
+
+    def test_claim_only_own_instances(self):
+        self.queue.push_tasks([
+            {"task_id": "on_11", "chrome_num": 11, "actions": []},
+            {"task_id": "on_12", "chrome_num": 12, "actions": []},
+            {"task_id": "shared", "chrome_num": "any", "actions": []}
+        ])
+        self.assertEqual(self.queue.pending_count([11]), 2)
+        self.assertEqual([task["task_id"] for task in self.queue.claim(5, chrome_instances=[11])],
+                         ["on_11", "shared"])
+        self.assertEqual(self.queue.claim(5, chrome_instances=[13]), [])
+        self.assertEqual([task["task_id"] for task in self.queue.claim(5)], ["on_12"])
+
+    def test_expired_pinned_task_returns_to_its_instance(self):
+        self.queue.push_tasks([{"task_id": "on_12", "chrome_num": 12, "actions": []}])
+        self.queue.claim(1)
+        time.sleep(1.1)
+        self.assertEqual(self.queue.requeue_expired(), 1)
+        self.assertEqual(self.queue.claim(1, chrome_instances=[11]), [])
+        self.assertEqual([task["task_id"] for task in self.queue.claim(1, chrome_instances=[12])], ["on_12"])
+
+    def test_duplicate_task_ids_rejected(self):
+        self.assertEqual(self.queue.push_tasks(self.make_tasks(2)), 2)
+        duplicate = dict(self.make_tasks(1)[0], actions=[{"type": "wait"}])
+        self.assertEqual(self.queue.push_tasks([duplicate]), 0)
+        claimed = self.queue.claim(5)
+        self.assertEqual(len(claimed), 2)
+        self.assertEqual(claimed[0]["actions"], [])
+
+        # 确认后任务ID可以重新使用
+        self.queue.ack(claimed[0]["remote_id"], {"status": "completed"})
+        self.assertEqual(self.queue.push_tasks([duplicate]), 1)
+
+@unittest.skipIf(redis is None or selenium is None, "未安装redis或selenium")
+class TestRedisTaskQueueManager(unittest.TestCase):
+    def setUp(self):
+        client = connect_local_redis()
+        if client is None:
+            self.skipTest("本地Redis不可用")
+        self.queue = RedisTaskQueue(client=client, namespace=f"rpa_test_manager_{os.getpid()}")
+        self.queue.clear()
+
+    def tearDown(self):
+        self.queue.clear()
+
+    def test_claimed_tasks_are_normalized_and_retried(self):
+        # sample_tasks.json格式，没有priority和metadata
+        self.queue.push_tasks([
+            {"task_id": "flaky", "chrome_num": 11, "actions": [{"type": "wait", "seconds": 0}]},
+            {"task_id": "broken", "chrome_num": 11, "actions": []}
+        ])
+        manager = TaskQueueManager(max_workers=1, config_file={
+            "save_logs": False, "reuse_sessions": False, "dispatch_poll_interval": 0.05,
+            "redis_poll_interval": 0, "retry_failed_tasks": True, "max_retries": 1, "retry_delay": 0,
+            "retry_policy": {"jitter": 0}
+        })
+        manager.attach_redis_queue(self.queue)
+        attempts = []
+
+        def execute_task(task):
+            attempts.append(task["task_id"])
+            failed = len(attempts) == 1
+            return {"task_id": task["task_id"], "chrome_num": 11, "status": "failed" if failed else "completed",
+                    "error_type": "exception" if failed else None, "completed_at": time.time(), "duration": 0}
+
+        manager.execute_task = execute_task
+        manager.run_tasks(timeout=10)
+
+        self.assertEqual(attempts, ["flaky", "flaky_retry_1"])
+        summary = manager.result_counters.summary()
+        self.assertEqual((summary["completed_tasks"], summary["retried_tasks"], summary["failed_tasks"]), (1, 1, 1))
+        self.assertEqual(summary["by_error_type"], {"exception": 1})
+        _, results = self.queue.read_results()
+        self.assertEqual(sorted((r["task_id"], r["status"]) for r in results),
+                         [("broken", "failed"), ("flaky_retry_1", "completed")])
+        self.assertEqual(self.queue.get_stats()["pending"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
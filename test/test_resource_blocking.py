@@ -0,0 +1,88 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from resource_blocking import ResourcePolicy, BlockingCounters, ESTIMATED_BYTES, is_third_party
+
+PAGE = "https://www.shop.com/item/1"
+
+class TestResourcePolicy(unittest.TestCase):
+    def test_resolve_preset(self):
+        policy = ResourcePolicy.resolve("text_only")
+        self.assertEqual(policy.name, "text_only")
+        self.assertEqual(policy.block_types, {"Image", "Media", "Font"})
+        self.assertFalse(policy.block_third_party)
+        self.assertIsNone(ResourcePolicy.resolve(None))
+
+    def test_resolve_unknown_preset(self):
+        with self.assertRaises(ValueError):
+            ResourcePolicy.resolve("no_such_preset")
+
+    def test_resolve_invalid_dict(self):
+        with self.assertRaises(ValueError):
+            ResourcePolicy.resolve({"block_images": True})
+
+    def test_resolve_list_and_extends(self):
+        policy = ResourcePolicy.resolve(["no_media", "no_third_party"])
+        self.assertEqual(policy.name, "no_media+no_third_party")
+        self.assertEqual(policy.block_types, {"Media"})
+        self.assertTrue(policy.block_third_party)
+
+        presets = {"ads": {"extends": "no_media", "block_urls": ["*doubleclick.net*"]}}
+        policy = ResourcePolicy.resolve("ads", presets)
+        self.assertEqual(policy.block_types, {"Media"})
+        self.assertEqual(policy.block_urls, ["*doubleclick.net*"])
+
+    def test_should_block(self):
+        policy = ResourcePolicy(block_types=["Image"], block_third_party=True,
+                                block_urls=["*tracker*"], allow_urls=["*cdn.other.com/app.js"])
+        self.assertEqual(policy.should_block("https://www.shop.com/a.png", "Image", PAGE), "type")
+        self.assertEqual(policy.should_block("https://www.shop.com/tracker.js", "Script", PAGE), "url")
+        self.assertEqual(policy.should_block("https://ads.other.com/x.js", "Script", PAGE), "third_party")
+        self.assertIsNone(policy.should_block("https://cdn.other.com/app.js", "Script", PAGE))
+        self.assertIsNone(policy.should_block("https://img.shop.com/x.js", "Script", PAGE))
+        self.assertIsNone(policy.should_block("https://other.com/", "Document", PAGE))
+
+    def test_webdriver_ignored_rules(self):
+        self.assertEqual(ResourcePolicy.resolve("text_only").webdriver_ignored_rules(), [])
+        self.assertEqual(ResourcePolicy.resolve("minimal").webdriver_ignored_rules(), ["block_third_party"])
+        policy = ResourcePolicy(block_urls=["*ads*"], allow_urls=["*ads.shop.com*"])
+        self.assertEqual(policy.webdriver_ignored_rules(), ["allow_urls"])
+
+    def test_is_third_party(self):
+        self.assertFalse(is_third_party("https://static.shop.com/a.css", PAGE))
+        self.assertTrue(is_third_party("https://shop.net/a.css", PAGE))
+        self.assertFalse(is_third_party("data:image/png;base64,AA", PAGE))
+        self.assertFalse(is_third_party("https://shop.net/a.css", None))
+
+    def test_patterns(self):
+        policy = ResourcePolicy.resolve("no_media")
+        self.assertIn("*.mp4", policy.blocked_url_patterns())
+        self.assertIn("*.mp4?*", policy.blocked_url_patterns())
+        self.assertEqual(policy.fetch_patterns(),
+                         [{"urlPattern": "*", "resourceType": "Media", "requestStage": "Request"}])
+        self.assertEqual(ResourcePolicy.resolve("minimal").fetch_patterns(),
+                         [{"urlPattern": "*", "requestStage": "Request"}])
+
+class TestBlockingCounters(unittest.TestCase):
+    def test_summary_and_merge(self):
+        counters = BlockingCounters()
+        counters.record_blocked("Image", "type")
+        counters.record_blocked("Script", "third_party")
+        counters.record_allowed()
+
+        total = BlockingCounters()
+        total.merge(counters)
+        total.merge(counters)
+        summary = total.summary()
+        self.assertEqual(summary["blocked_requests"], 4)
+        self.assertEqual(summary["allowed_requests"], 2)
+        self.assertEqual(summary["by_type"], {"Image": 2, "Script": 2})
+        self.assertEqual(summary["by_reason"], {"type": 2, "third_party": 2})
+        self.assertEqual(summary["estimated_blocked_bytes"],
+                         2 * (ESTIMATED_BYTES["Image"] + ESTIMATED_BYTES["Script"]))
+
+if __name__ == "__main__":
+    unittest.main()
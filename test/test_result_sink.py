@@ -0,0 +1,45 @@
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from result_sink import JsonlResultSink, ResultCounters, read_results, rebuild_summary
+
+class TestJsonlResultSink(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_rotates_and_rebuilds_summary(self):
+        sink = JsonlResultSink(self.directory, max_file_size=300)
+        counters = ResultCounters()
+        for i in range(20):
+            state = "completed" if i % 4 else "failed"
+            result = {"task_id": f"t{i}", "status": state, "duration": 1.0,
+                      "results": [{"action_index": 0, "success": True}]}
+            sink.write(state, result)
+            counters.add(state, result)
+        sink.close()
+
+        self.assertGreater(len(sink.files()), 1)
+        results = list(read_results(self.directory))
+        self.assertEqual(len(results), 20)
+        self.assertNotIn("results", results[0])
+        self.assertEqual(len(list(read_results(self.directory, state="failed"))), 5)
+        self.assertEqual(rebuild_summary(self.directory), counters.summary())
+
+    def test_skips_truncated_line(self):
+        sink = JsonlResultSink(self.directory)
+        sink.write("completed", {"task_id": "a", "status": "completed"})
+        sink.close()
+        with open(sink.files()[0], 'a', encoding='utf-8') as f:
+            f.write('{"state":"comp')
+        self.assertEqual(rebuild_summary(self.directory)["completed_tasks"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from selector_cache import SelectorCache, url_pattern
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestSelectorCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = Path(self.directory) / "selector_cache.json"
+        self.clock = FakeClock()
+        self.selectors = ["input[name='q']", "//input[@name='q']", "#q"]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_cache(self):
+        return SelectorCache(self.path, half_life=100, save_interval=3600, clock=self.clock)
+
+    def test_url_pattern(self):
+        self.assertEqual(url_pattern("https://shop.com/item/123?ref=a"), "shop.com/item/*")
+        self.assertEqual(url_pattern("https://shop.com/u/5f3a9c2e1b7d/orders"), "shop.com/u/*/orders")
+        self.assertEqual(url_pattern(None), "*")
+
+    def test_winner_ranked_first_and_persisted(self):
+        cache = self.make_cache()
+        url = "https://shop.com/item/1"
+        self.assertEqual(cache.rank(url, "input", self.selectors), self.selectors)
+
+        cache.record(url, "input", self.selectors, self.selectors[0], "#q", 0.02)
+        ranked = cache.rank("https://shop.com/item/2", "input", self.selectors)
+        self.assertEqual(ranked, ["#q", "input[name='q']", "//input[@name='q']"])
+        # 不同动作类型分别统计
+        self.assertEqual(cache.rank(url, "click", self.selectors), self.selectors)
+
+        cache.record(url, "input", self.selectors, ranked[0], "#q", 0.01)
+        self.assertEqual(cache.get_stats()["hits"], 1)
+        self.assertEqual(cache.get_stats()["misses"], 1)
+
+        cache.save()
+        self.assertEqual(self.make_cache().rank(url, "input", self.selectors)[0], "#q")
+
+    def test_stale_winner_decays(self):
+        cache = self.make_cache()
+        url = "https://shop.com/search"
+        for _ in range(3):
+            cache.record(url, "input", self.selectors, self.selectors[0], "#q", 0.01)
+        # 页面改版后"#q"不再命中，衰减后新的命中者超过旧排名
+        self.clock.now += 300
+        cache.record(url, "input", self.selectors, "#q", "//input[@name='q']", 0.01)
+        self.assertEqual(cache.rank(url, "input", self.selectors)[0], "//input[@name='q']")
+
+if __name__ == "__main__":
+    unittest.main()
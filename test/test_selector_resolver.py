@@ -0,0 +1,44 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from selector_resolver import resolve_selectors, SELENIUM_RESOLVE_SCRIPT
+
+class FakeDriver:
+    def __init__(self, matches):
+        # 每次轮询的返回值，用完后一直返回最后一个
+        self.matches = list(matches)
+        self.calls = 0
+
+    def execute_script(self, script, selectors):
+        assert script == SELENIUM_RESOLVE_SCRIPT
+        self.calls += 1
+        match = self.matches[min(self.calls, len(self.matches)) - 1]
+        if isinstance(match, Exception):
+            raise match
+        return match
+
+class TestResolveSelectors(unittest.TestCase):
+    def test_returns_winning_selector(self):
+        driver = FakeDriver([None, RuntimeError("navigating"), [2, "element"]])
+        element, selector = resolve_selectors(driver, ["#a", ".b", "//c"], timeout=1, poll_interval=0.01)
+        self.assertEqual((element, selector), ("element", "//c"))
+        self.assertEqual(driver.calls, 3)
+
+    def test_single_deadline_for_all_selectors(self):
+        driver = FakeDriver([None])
+        started = time.monotonic()
+        element, selector = resolve_selectors(driver, ["#a", ".b", "//c"], timeout=0.1, poll_interval=0.02)
+        self.assertIsNone(element)
+        self.assertIsNone(selector)
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_string_selector(self):
+        element, selector = resolve_selectors(FakeDriver([[0, "element"]]), "#a", timeout=0)
+        self.assertEqual(selector, "#a")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from sharded_executor import ShardedTaskRunner, assign_shards
+
+def echo_shard(shard_index, chrome_instances, config, max_workers, task_queue, result_queue):
+    """替代_run_shard的子进程入口：不启动浏览器，直接返回任务所在的分片"""
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        if task.get("crash"):
+            os._exit(1)
+        # 模拟子进程内重试后才到达终态
+        task_id = task["task_id"] + ("_retry_2" if task.get("fail") else "")
+        state = "failed" if task.get("fail") else "completed"
+        result_queue.put(("result", shard_index, state,
+                          {"task_id": task_id, "shard": shard_index, "instances": chrome_instances}))
+    result_queue.put(("done", shard_index, None, None))
+
+def make_task(task_id, chrome_num="any", **extra):
+    return dict({"task_id": task_id, "chrome_num": chrome_num, "actions": []}, **extra)
+
+class TestShardedTaskRunner(unittest.TestCase):
+    def test_assign_shards(self):
+        self.assertEqual(assign_shards([13, 11, 12], 2), {11: 0, 12: 1, 13: 0})
+
+    def test_routes_pinned_tasks_to_owning_shard(self):
+        runner = ShardedTaskRunner(2, [11, 12, 13], shard_target=echo_shard)
+        tasks = [make_task("a", 11), make_task("b", 12), make_task("c", 13), make_task("d"),
+                 make_task("e", 12, fail=True)]
+        results = {task["task_id"]: (state, result) for task, state, result in runner.run(tasks)}
+
+        self.assertEqual(sorted(results), ["a", "b", "c", "d", "e"])
+        self.assertEqual(results["a"][1]["shard"], 0)
+        self.assertEqual(results["b"][1]["shard"], 1)
+        self.assertEqual(results["c"][1]["instances"], [11, 13])
+        self.assertEqual(results["e"][0], "failed")
+        self.assertEqual(results["e"][1]["task_id"], "e_retry_2")
+        self.assertEqual(runner.in_flight, 0)
+
+    def test_streams_with_bounded_in_flight(self):
+        runner = ShardedTaskRunner(2, [11, 12], shard_target=echo_shard)
+        in_flight_at_pull = []
+
+        def tasks():
+            for i in range(20):
+                in_flight_at_pull.append(runner.in_flight)
+                yield make_task(f"t{i}")
+
+        results = list(runner.run(tasks(), max_in_flight=3))
+        self.assertEqual(len(results), 20)
+        self.assertLess(max(in_flight_at_pull), 3)
+
+    def test_crashed_shard_fails_outstanding_tasks(self):
+        runner = ShardedTaskRunner(1, [11], shard_target=echo_shard)
+        results = list(runner.run([make_task("boom", 11, crash=True)]))
+        self.assertEqual(len(results), 1)
+        task, state, result = results[0]
+        self.assertEqual((task["task_id"], state, result["error_type"]), ("boom", "failed", "shard_exited"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+try:
+    import selenium
+    from task_daemon import TaskDaemon, TaskDaemonClient, matches_task
+    from task_journal import TaskJournal
+except ImportError:
+    selenium = None
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestTaskDaemon(unittest.TestCase):
+    def setUp(self):
+        self.daemon = TaskDaemon(port=0, max_workers=1, config_file={"save_logs": False})
+        self.client = TaskDaemonClient(self.daemon.url)
+
+    def tearDown(self):
+        self.daemon._close()
+
+    def test_submit_validates_tasks(self):
+        accepted, rejected = self.daemon.submit([
+            {"task_id": "ok", "chrome_num": "any", "actions": [{"type": "wait", "seconds": 0}]},
+            {"task_id": "bad", "chrome_num": 1}
+        ])
+        self.assertEqual(accepted, ["ok"])
+        self.assertEqual(rejected[0]["task_id"], "bad")
+
+    def test_submit_rejects_journaled_task_ids(self):
+        self.daemon._close()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        journal_file = str(Path(directory) / "journal.db")
+        # 之前运行中已完成的任务
+        journal = TaskJournal(journal_file)
+        journal.record("done", "completed")
+        journal.close()
+
+        self.daemon = TaskDaemon(port=0, max_workers=1, config_file={"save_logs": False, "journal_file": journal_file})
+        self.addCleanup(self.daemon.manager.journal.close)
+        accepted, rejected = self.daemon.submit([
+            {"task_id": task_id, "chrome_num": "any", "actions": [{"type": "wait", "seconds": 0}]}
+            for task_id in ("done", "new")
+        ])
+        self.assertEqual(accepted, ["new"])
+        self.assertEqual(rejected, [{"task_id": "done", "error": "duplicate_task_id"}])
+
+    def test_submit_rejects_duplicate_task_ids(self):
+        task = {"task_id": "dup", "chrome_num": "any", "actions": [{"type": "wait", "seconds": 0}]}
+        self.assertEqual(self.daemon.submit([task, task]),
+                         (["dup"], [{"task_id": "dup", "error": "duplicate_task_id"}]))
+        self.assertEqual(self.daemon.submit([task])[1], [{"task_id": "dup", "error": "duplicate_task_id"}])
+
+    def test_invalid_task_payload(self):
+        self.daemon.start()
+        self.addCleanup(self.daemon.manager.stop)
+        for payload in (5, "x", {"tasks": "x"}):
+            response = self.client._request("/tasks", payload)
+            self.assertIn("error", response)
+            self.assertNotIn("accepted", response)
+
+    def test_invalid_results_query(self):
+        self.daemon.start()
+        self.addCleanup(self.daemon.manager.stop)
+        self.assertIn("error", self.client._request("/results?since=abc"))
+        self.assertIn("error", self.client._request("/results?wait=soon"))
+        self.assertEqual(self.client._request("/results?since=0")["results"], [])
+
+    def test_results_long_poll(self):
+        self.daemon._on_result("failed", {"task_id": "a_retry_2", "status": "failed"})
+        self.daemon._on_result("completed", {"task_id": "b", "status": "completed"})
+
+        results, last_seq, dropped = self.daemon.get_results(0, ["a"])
+        self.assertEqual([r["task_id"] for r in results], ["a_retry_2"])
+        self.assertEqual(last_seq, 2)
+        self.assertFalse(dropped)
+        self.assertEqual(self.daemon.get_results(last_seq, wait=0.05)[0], [])
+
+    def test_matches_task(self):
+        self.assertTrue(matches_task({"task_id": "t1_retry_1"}, ["t1"]))
+        self.assertFalse(matches_task({"task_id": "t10"}, ["t1"]))
+
+if __name__ == "__main__":
+    unittest.main()
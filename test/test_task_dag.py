@@ -0,0 +1,42 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from task_dag import TaskDependencyGraph
+
+def make_task(task_id, depends_on=None):
+    return {"task_id": task_id, "chrome_num": 11, "actions": [], "depends_on": depends_on or []}
+
+class TestTaskDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = TaskDependencyGraph()
+
+    def test_child_ready_after_all_parents(self):
+        self.assertEqual(self.graph.add(make_task("report", ["a", "b"])), ("waiting", None))
+        self.assertEqual(self.graph.resolve("a", True), ([], []))
+        ready, skipped = self.graph.resolve("b", True)
+        self.assertEqual([t["task_id"] for t in ready], ["report"])
+        self.assertEqual(len(self.graph), 0)
+
+    def test_failed_parent_skips_children(self):
+        self.graph.add(make_task("search", ["login"]))
+        self.graph.add(make_task("other", ["login", "x"]))
+        ready, skipped = self.graph.resolve("login", False)
+        self.assertEqual(ready, [])
+        self.assertEqual(sorted(t["task_id"] for t in skipped), ["other", "search"])
+        self.assertEqual(self.graph.unresolved(), {})
+
+    def test_finished_parent_is_remembered(self):
+        self.graph.resolve("login", True)
+        self.graph.resolve("broken", False)
+        self.assertEqual(self.graph.add(make_task("search", ["login"])), ("ready", None))
+        self.assertEqual(self.graph.add(make_task("late", ["broken"])), ("skipped", "broken"))
+
+    def test_self_dependency(self):
+        with self.assertRaises(ValueError):
+            self.graph.add(make_task("a", ["a"]))
+
+if __name__ == "__main__":
+    unittest.main()
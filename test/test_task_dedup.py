@@ -0,0 +1,43 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from task_dedup import TaskDeduplicator, compute_idempotency_key
+
+def make_task(task_id, url="https://github.com", chrome_num=11):
+    return {"task_id": task_id, "chrome_num": chrome_num, "actions": [{"type": "navigate", "url": url}]}
+
+class TestTaskDeduplicator(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        self.dedup = TaskDeduplicator(result_ttl=60, clock=lambda: self.now)
+
+    def test_key_depends_on_content(self):
+        self.assertEqual(compute_idempotency_key(make_task("a")), compute_idempotency_key(make_task("b")))
+        self.assertNotEqual(compute_idempotency_key(make_task("a")),
+                            compute_idempotency_key(make_task("a", chrome_num=12)))
+        self.assertEqual(compute_idempotency_key(dict(make_task("a"), idempotency_key="k")), "k")
+
+    def test_followers_share_leader_result(self):
+        leader, follower = make_task("a"), make_task("b")
+        self.assertEqual(self.dedup.admit(leader), ("run", None))
+        self.assertEqual(self.dedup.admit(follower), ("coalesced", "a"))
+
+        retry = dict(leader, task_id="a_retry_1", retry_of="a")
+        self.assertTrue(self.dedup.is_leader(retry))
+        self.assertEqual(self.dedup.complete(retry, "completed", {"status": "completed"}), [follower])
+
+        self.assertEqual(self.dedup.admit(make_task("c")), ("cached", {"status": "completed"}))
+        self.now = 61
+        self.assertEqual(self.dedup.admit(make_task("d")), ("run", None))
+
+    def test_failed_result_is_not_cached(self):
+        task = make_task("a")
+        self.dedup.admit(task)
+        self.dedup.complete(task, "failed", {"status": "failed"})
+        self.assertEqual(self.dedup.admit(make_task("b")), ("run", None))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from task_journal import TaskJournal
+
+def make_task(task_id, **extra):
+    return dict({"task_id": task_id, "chrome_num": 11, "actions": [], "status": "pending"}, **extra)
+
+class TestTaskJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_file = Path(self.directory) / "journal.db"
+        self.journals = []
+
+    def tearDown(self):
+        for journal in self.journals:
+            journal.close()
+        shutil.rmtree(self.directory)
+
+    def open_journal(self, **settings):
+        journal = TaskJournal(self.db_file, **settings)
+        self.journals.append(journal)
+        return journal
+
+    def stored(self, journal):
+        return {task_id: state for task_id, state in journal.conn.execute("SELECT task_id, state FROM tasks")}
+
+    def test_records_are_written_in_batches(self):
+        journal = self.open_journal(batch_size=3, flush_interval=3600)
+        journal.record("a", "pending", task=make_task("a"))
+        journal.record("b", "pending", task=make_task("b"))
+        self.assertEqual(self.stored(journal), {})
+
+        journal.record("a", "running")
+        self.assertEqual(self.stored(journal), {"a": "running", "b": "pending"})
+        self.assertEqual(journal.buffer, [])
+
+    def test_upsert_keeps_task_payload(self):
+        journal = self.open_journal()
+        journal.record("a", "pending", task=make_task("a"))
+        journal.record("a", "completed", result={"status": "completed"})
+        journal.flush()
+        task, result = journal.conn.execute("SELECT task, result FROM tasks WHERE task_id = 'a'").fetchone()
+        self.assertIn('"task_id": "a"', task)
+        self.assertIn('"completed"', result)
+        self.assertEqual(journal.get_final_state("a"), "completed")
+
+    def test_known_task_ids_after_restart(self):
+        journal = self.open_journal()
+        journal.record("a", "completed", task=make_task("a"))
+        journal.record("b", "pending", task=make_task("b"))
+        journal.close()
+        self.journals.remove(journal)
+
+        self.assertEqual(self.open_journal().known_task_ids, {"a", "b"})
+
+    def test_recovers_non_terminal_tasks(self):
+        journal = self.open_journal()
+        journal.record("done", "completed", task=make_task("done"))
+        journal.record("queued", "pending", task=make_task("queued"))
+        journal.record("interrupted", "pending",
+                       task=make_task("interrupted", started_at=1.0, assigned_chrome=11, status="running"))
+        journal.record("interrupted", "running")
+        journal.record("gave_up", "failed", task=make_task("gave_up"))
+        journal.record("gave_up_retry_1", "pending", task=make_task("gave_up_retry_1", retry_of="gave_up"))
+        journal.flush()
+
+        tasks = self.open_journal().load_recoverable_tasks()
+        self.assertEqual([t["task_id"] for t in tasks], ["queued", "interrupted", "gave_up_retry_1"])
+        interrupted = tasks[1]
+        self.assertEqual(interrupted["status"], "pending")
+        self.assertNotIn("started_at", interrupted)
+        self.assertNotIn("assigned_chrome", interrupted)
+        self.assertEqual(journal.get_final_state("gave_up"), "pending")
+
+if __name__ == "__main__":
+    unittest.main()
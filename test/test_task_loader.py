@@ -0,0 +1,47 @@
+import io
+import sys
+import gzip
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from task_loader import TaskSource, iter_json_array
+
+def make_config(i):
+    return {"task_id": f"t{i}", "chrome_num": 11, "actions": [{"type": "wait", "seconds": 1}]}
+
+class TestTaskLoader(unittest.TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_json_array_is_parsed_across_chunks(self):
+        configs = [make_config(i) for i in range(50)]
+        items = list(iter_json_array(io.StringIO(json.dumps(configs, indent=2)), chunk_size=7))
+        self.assertEqual(items, configs)
+
+    def test_gzip_jsonl_skips_invalid_lines(self):
+        path = self.directory / "tasks.jsonl.gz"
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            for i in range(5):
+                f.write(json.dumps(make_config(i)) + "\n")
+            f.write("{broken\n")
+            f.write(json.dumps({"task_id": "no_actions", "chrome_num": 11}) + "\n")
+
+        source = TaskSource(str(path), progress_interval=0)
+        first = source.take(3)
+        self.assertEqual([c["task_id"] for c in first], ["t0", "t1", "t2"])
+        self.assertFalse(source.exhausted)
+        rest = source.take(10)
+        self.assertEqual(len(rest), 2)
+        self.assertTrue(source.exhausted)
+        self.assertEqual((source.loaded, source.invalid), (5, 2))
+
+if __name__ == "__main__":
+    unittest.main()
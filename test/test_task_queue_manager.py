@@ -0,0 +1,619 @@
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from queue import Full
+from unittest import mock
+from collections import deque
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+try:
+    import selenium
+    from task_queue_manager import TaskQueueManager
+except ImportError:
+    selenium = None
+
+ACTIONS = [{"type": "wait", "seconds": 0}]
+CONFIG_FILE = Path(__file__).resolve().parent.parent / "chrome" / "automation_config.json"
+
+def make_manager(max_workers=2, **config):
+    settings = {"save_logs": False, "reuse_sessions": False, "dispatch_poll_interval": 0.05,
+                "retry_failed_tasks": False}
+    settings.update(config)
+    return TaskQueueManager(max_workers=max_workers, config_file=settings)
+
+def completed(task):
+    return {"task_id": task["task_id"], "chrome_num": task["assigned_chrome"], "status": "completed",
+            "completed_at": time.time(), "duration": 0}
+
+class InlineRunner:
+    """在本进程内立即完成任务的分片执行器替身"""
+    def __init__(self, num_shards, chrome_instances, config=None, workers_per_shard=None):
+        self.num_shards = max(1, min(num_shards, len(chrome_instances) or 1))
+        self.results = deque()
+        self.submitted = []
+
+    @property
+    def in_flight(self):
+        return len(self.results)
+
+    def shard_workers(self, shard_index):
+        return 1
+
+    def start(self):
+        pass
+
+    def close(self):
+        pass
+
+    def submit(self, task):
+        self.submitted.append(task["task_id"])
+        state = "failed" if task["metadata"].get("fail") else "completed"
+        self.results.append((task, state, {"task_id": task["task_id"], "status": state}))
+
+    def get_result(self, timeout=None):
+        return self.results.popleft() if self.results else None
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestRunTasks(unittest.TestCase):
+    def test_tasks_added_while_running_are_dispatched(self):
+        manager = make_manager(max_workers=2, chrome_instances=[11, 12])
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def execute_task(task):
+            with lock:
+                running.append(task["task_id"])
+                peak.append(len(running))
+            if task["task_id"] == "first":
+                manager.add_task("added_later", "any", ACTIONS)
+            time.sleep(0.05)
+            with lock:
+                running.remove(task["task_id"])
+            return completed(task)
+
+        manager.execute_task = execute_task
+        manager.add_task("first", "any", ACTIONS)
+        for i in range(4):
+            manager.add_task(f"t{i}", "any", ACTIONS)
+        manager.run_tasks(timeout=10)
+
+        self.assertEqual(manager.result_counters.completed, 6)
+        self.assertIn("added_later", {r["task_id"] for r in manager.completed_tasks})
+        self.assertLessEqual(max(peak), 2)
+
+    def test_failed_task_retried_in_same_run(self):
+        manager = make_manager(chrome_instances=[11], retry_failed_tasks=True, max_retries=1,
+                               retry_policy={"base_delay": 0, "jitter": 0})
+        manager.execute_task = lambda task: dict(completed(task), status="failed", error_type="action_failed") \
+            if "retry" not in task["task_id"] else completed(task)
+        manager.add_task("flaky", "any", ACTIONS)
+        manager.run_tasks(timeout=10)
+        self.assertEqual([r["task_id"] for r in manager.completed_tasks], ["flaky_retry_1"])
+
+    def test_priority_respected_across_lanes(self):
+        manager = make_manager(max_workers=1, chrome_instances=[11, 12, 13])
+        executed = []
+        manager.execute_task = lambda task: executed.append(task["task_id"]) or completed(task)
+        manager.add_task("bulk11_0", 11, ACTIONS, priority=10)
+        manager.add_task("bulk11_1", 11, ACTIONS, priority=10)
+        manager.add_task("urgent12", 12, ACTIONS, priority=0)
+        manager.add_task("bulk13", 13, ACTIONS, priority=10)
+        manager.run_tasks(timeout=10)
+        self.assertEqual(executed[0], "urgent12")
+        self.assertEqual(len(executed), 4)
+
+    def test_partial_success_not_retried_past_completed_clicks(self):
+        actions = [{"type": "click", "selectors": ["#banner"], "required": False},
+                   {"type": "click", "selectors": ["#buy"]},
+                   {"type": "input", "selectors": ["#note"], "text": "x", "required": False},
+                   {"type": "wait", "seconds": 0}]
+        manager = make_manager(chrome_instances=[11], retry_failed_tasks=True, max_retries=2,
+                               retry_policy={"base_delay": 0, "jitter": 0})
+        executed = []
+
+        def execute_task(task):
+            executed.append((task["task_id"], task.get("resume_from", 0)))
+            failing = (0,) if task["task_id"] == "banner_only" else (0, 2)
+            results = [{"action_index": i, "success": i not in failing, "url": "https://shop.com/"}
+                       for i in range(task.get("resume_from", 0), len(actions))]
+            if "retry" in task["task_id"]:
+                return completed(task)
+            return dict(completed(task), status="partial_success", error_type="action_failed", results=results)
+
+        manager.execute_task = execute_task
+        manager.add_task("banner_only", 11, actions)
+        manager.add_task("note_failed", 11, actions)
+        manager.run_tasks(timeout=10)
+
+        # 只有#buy之前的可选动作失败：不重试；#buy之后的可选动作失败：从该动作继续
+        self.assertEqual(sorted(executed), [("banner_only", 0), ("note_failed", 0), ("note_failed_retry_1", 2)])
+
+    def test_backpressure_blocks_add_task(self):
+        manager = make_manager(max_workers=1, chrome_instances=[11], max_queue_size=2)
+        release = threading.Event()
+        manager.execute_task = lambda task: release.wait(5) and completed(task)
+        manager.add_task("a", "any", ACTIONS)
+        manager.add_task("b", "any", ACTIONS)
+        with self.assertRaises(Full):
+            manager.add_task("c", "any", ACTIONS, block=False)
+
+        runner = threading.Thread(target=manager.run_tasks, kwargs={"keep_alive": True})
+        runner.start()
+        # 调度循环取走a后腾出位置，阻塞的add_task得以返回
+        manager.add_task("c", "any", ACTIONS, timeout=5)
+        release.set()
+        manager.finish()
+        runner.join(10)
+        self.assertFalse(runner.is_alive())
+        self.assertEqual(manager.result_counters.completed, 3)
+
+    def test_keep_alive_wakes_up_for_new_tasks(self):
+        manager = make_manager(chrome_instances=[11], dispatch_poll_interval=5)
+        done = threading.Event()
+        manager.execute_task = completed
+        manager.add_result_listener(lambda state, result: done.set())
+
+        runner = threading.Thread(target=manager.run_tasks, kwargs={"keep_alive": True})
+        runner.start()
+        time.sleep(0.1)
+        started = time.time()
+        manager.add_task("late", "any", ACTIONS)
+        self.assertTrue(done.wait(2))
+        self.assertLess(time.time() - started, 1)
+
+        manager.finish()
+        runner.join(10)
+        self.assertFalse(runner.is_alive())
+
+    def test_any_tasks_fail_fast_without_instances(self):
+        manager = make_manager()
+        executed = []
+        manager.execute_task = lambda task: executed.append(task) or completed(task)
+        for i in range(3):
+            manager.add_task(f"t{i}", "any", ACTIONS)
+
+        started = time.time()
+        manager.run_tasks(timeout=10)
+        self.assertLess(time.time() - started, 2)
+        self.assertEqual(executed, [])
+        self.assertEqual(manager.result_counters.failed, 3)
+        self.assertEqual({r["error_type"] for r in manager.failed_tasks}, {"no_instances"})
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestOptionalFeatures(unittest.TestCase):
+    def test_true_and_empty_dict_enable_defaults(self):
+        manager = make_manager(task_dedup=True, adaptive_concurrency={}, instance_health=True,
+                               selector_cache={"path": None})
+        self.assertIsNotNone(manager.deduplicator)
+        self.assertIsNotNone(manager.concurrency)
+        self.assertIsNotNone(manager.instance_health)
+        self.assertIsNotNone(manager.selector_cache)
+
+    def test_none_and_false_disable(self):
+        manager = make_manager(task_dedup=False, adaptive_concurrency=None, instance_health=False,
+                               selector_cache=None)
+        self.assertIsNone(manager.deduplicator)
+        self.assertIsNone(manager.concurrency)
+        self.assertIsNone(manager.instance_health)
+        self.assertIsNone(manager.selector_cache)
+
+class FakeAutomation:
+    """WebDriver自动化替身：连接总是成功，动作全部成功"""
+    def __init__(self, chrome_num, **kwargs):
+        self.resource_policy = None
+        self.start_index = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def connect_to_chrome(self):
+        return True
+
+    def abort(self):
+        pass
+
+    def apply_resource_policy(self, policy):
+        if policy and policy.blocked_url_patterns():
+            self.resource_policy = policy
+
+    def execute_action_sequence(self, actions, **kwargs):
+        return [{"success": True} for _ in actions]
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestWebDriverResourcePolicy(unittest.TestCase):
+    def run_task(self, **config):
+        manager = make_manager(**config)
+        task = manager.build_task("t", 11, ACTIONS)
+        task["assigned_chrome"] = 11
+        with mock.patch("task_queue_manager.EnhancedWebAutomation", FakeAutomation):
+            return manager.execute_task(task)
+
+    def test_result_marks_blocking_counters_unavailable(self):
+        result = self.run_task(resource_policy="minimal")
+        self.assertEqual(result["resource_policy"], "minimal")
+        self.assertEqual(result["resource_policy_ignored"], ["block_third_party"])
+        self.assertIsNone(result["resource_blocking"])
+        self.assertIn("CDP", result["resource_blocking_note"])
+
+    def test_third_party_only_policy_reported_as_ignored(self):
+        result = self.run_task(resource_policy="no_third_party")
+        self.assertIsNone(result["resource_policy"])
+        self.assertEqual(result["resource_policy_ignored"], ["block_third_party"])
+
+    def test_unknown_policy_rejected_on_enqueue(self):
+        manager = make_manager(chrome_instances=[11], resource_policies={"ads": {"block_urls": ["*ads*"]}})
+        with self.assertRaises(ValueError):
+            manager.add_task("bad", 11, ACTIONS, resource_policy="no_such_preset")
+        manager.add_task("custom", 11, ACTIONS, resource_policy="ads")
+
+        executed = []
+        manager.execute_task = lambda task: executed.append(task["task_id"]) or completed(task)
+        manager.add_batch_tasks([{"task_id": "bad_batch", "chrome_num": 11, "actions": ACTIONS,
+                                  "resource_policy": ["text_only", "typo"]}])
+        manager.run_tasks(timeout=10)
+        self.assertEqual(executed, ["custom"])
+
+        with self.assertRaises(ValueError):
+            make_manager(resource_policy="typo")
+
+    def test_no_policy(self):
+        result = self.run_task()
+        self.assertEqual(result["resource_policy_ignored"], [])
+        self.assertIsNone(result["resource_blocking_note"])
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestTaskDedup(unittest.TestCase):
+    def test_identical_tasks_coalesce_and_share_retried_result(self):
+        manager = make_manager(chrome_instances=[11], task_dedup=True, retry_failed_tasks=True, max_retries=1,
+                               retry_policy={"base_delay": 0, "jitter": 0})
+        executed = []
+
+        def execute_task(task):
+            executed.append(task["task_id"])
+            if task["task_id"] == "a":
+                return dict(completed(task), status="failed", error_type="action_failed")
+            return completed(task)
+
+        manager.execute_task = execute_task
+        manager.add_task("a", "any", ACTIONS)
+        manager.add_task("b", "any", ACTIONS)
+        manager.add_task("c", "any", [{"type": "wait", "seconds": 1}])
+        manager.run_tasks(timeout=10)
+
+        self.assertEqual(sorted(executed), ["a", "a_retry_1", "c"])
+        follower = next(r for r in manager.completed_tasks if r["task_id"] == "b")
+        self.assertEqual(follower["coalesced_with"], "a")
+
+        # 成功结果缓存期内重复提交直接返回缓存结果
+        manager.add_task("d", "any", ACTIONS)
+        self.assertTrue(manager.completed_tasks[-1]["cached"])
+        self.assertEqual(manager.result_counters.completed, 4)
+        self.assertEqual(manager.get_status_report()["dedup"]["cache_hits"], 1)
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestRateLimits(unittest.TestCase):
+    def test_domain_concurrency_shared_across_instances(self):
+        manager = make_manager(max_workers=3, chrome_instances=[11, 12, 13], rate_limits={
+            "domains": {"shop.com": {"max_concurrent": 1}}, "concurrency_retry_interval": 0.02
+        })
+        running = {}
+        peak = {}
+        lock = threading.Lock()
+
+        def execute_task(task):
+            domain = task["metadata"]["domain"]
+            with lock:
+                running[domain] = running.get(domain, 0) + 1
+                peak[domain] = max(peak.get(domain, 0), running[domain])
+            time.sleep(0.05)
+            with lock:
+                running[domain] -= 1
+            return completed(task)
+
+        manager.execute_task = execute_task
+        for i in range(3):
+            manager.add_task(f"shop{i}", "any", [{"type": "navigate", "url": f"https://www.shop.com/item/{i}"}],
+                             metadata={"domain": "shop.com"})
+        manager.add_task("other", "any", [{"type": "navigate", "url": "https://other.com/"}],
+                         metadata={"domain": "other.com"})
+        manager.run_tasks(timeout=10)
+
+        self.assertEqual(manager.result_counters.completed, 4)
+        self.assertEqual(peak["shop.com"], 1)
+        self.assertGreater(manager.get_status_report()["rate_limits"]["domain:shop.com"]["deferred"], 0)
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestAdaptiveConcurrency(unittest.TestCase):
+    def test_pauses_under_memory_pressure_then_ramps_up(self):
+        metrics = {"system": {"memory_percent": 99, "cpu_percent": 10}}
+        manager = make_manager(max_workers=4, chrome_instances=[11, 12, 13, 14], adaptive_concurrency={
+            "initial_limit": 1, "adjust_interval": 0.02, "metrics_source": lambda: metrics
+        })
+        manager.concurrency.adjust(metrics)
+        running = []
+        peak = [0]
+        lock = threading.Lock()
+
+        def execute_task(task):
+            with lock:
+                running.append(task["task_id"])
+                peak[0] = max(peak[0], len(running))
+            time.sleep(0.03)
+            with lock:
+                running.remove(task["task_id"])
+            return completed(task)
+
+        manager.execute_task = execute_task
+        for i in range(40):
+            manager.add_task(f"t{i}", "any", ACTIONS)
+        runner = threading.Thread(target=manager.run_tasks, kwargs={"timeout": 20})
+        runner.start()
+
+        # 内存即将耗尽时不派发任务
+        time.sleep(0.2)
+        self.assertEqual(manager.result_counters.completed, 0)
+        self.assertFalse(manager.get_status_report()["concurrency"]["admission_open"])
+
+        metrics = {"system": {"memory_percent": 40, "cpu_percent": 10}}
+        runner.join(20)
+        self.assertEqual(manager.result_counters.completed, 40)
+        # 并发从1逐步增加，不超过max_workers
+        self.assertGreater(peak[0], 1)
+        self.assertLessEqual(peak[0], 4)
+        self.assertGreater(manager.concurrency.limit, 1)
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestInstanceHealth(unittest.TestCase):
+    def make_manager(self, down=()):
+        return make_manager(chrome_instances=[11, 12], instance_health={
+            "probe": lambda port, timeout: None if port - 10000 in down else 0.01,
+            "probe_interval": 0, "failure_threshold": 1, "open_seconds": 60
+        })
+
+    def run_any_tasks(self, manager, count):
+        executed = []
+
+        def execute_task(task):
+            executed.append(task["assigned_chrome"])
+            if task["assigned_chrome"] == 12:
+                return dict(completed(task), status="failed", error="连接失败", error_type="connect")
+            return completed(task)
+
+        manager.execute_task = execute_task
+        for i in range(count):
+            manager.add_task(f"t{i}", "any", ACTIONS)
+        manager.run_tasks(timeout=10)
+        return executed
+
+    def test_failing_instance_is_quarantined(self):
+        manager = self.make_manager()
+        executed = self.run_any_tasks(manager, 6)
+
+        # Chrome_12连接失败后熔断，其余任务都派发到Chrome_11
+        self.assertEqual(executed.count(12), 1)
+        self.assertEqual(executed.count(11), 5)
+        self.assertEqual((manager.result_counters.completed, manager.result_counters.failed), (5, 1))
+        health = manager.get_status_report()["instance_health"]
+        self.assertEqual(health[12]["state"], "open")
+        self.assertEqual(health[11]["state"], "closed")
+
+    def test_unreachable_instance_skipped_from_start(self):
+        manager = self.make_manager(down=(12,))
+        executed = self.run_any_tasks(manager, 4)
+
+        self.assertEqual(executed, [11, 11, 11, 11])
+        self.assertEqual(manager.result_counters.completed, 4)
+        self.assertIsNone(manager.get_status_report()["instance_health"][12]["probe_latency"])
+
+class CachingAutomation(FakeAutomation):
+    """按选择器缓存排序候选选择器，只有"#new"能找到元素"""
+    tried_first = []
+
+    def __init__(self, chrome_num, selector_cache=None, **kwargs):
+        super().__init__(chrome_num, **kwargs)
+        self.selector_cache = selector_cache
+
+    def execute_action_sequence(self, actions, **kwargs):
+        selectors = actions[0]["selector"]
+        ranked = self.selector_cache.rank("https://example.com/item/1", "click", selectors)
+        self.tried_first.append(ranked[0])
+        self.selector_cache.record("https://example.com/item/1", "click", selectors, ranked[0], "#new", 0.01)
+        return [{"success": True}]
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestSelectorCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        CachingAutomation.tried_first = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_later_tasks_try_learned_selector_first(self):
+        cache_file = Path(self.directory) / "selector_cache.json"
+        manager = make_manager(max_workers=1, chrome_instances=[11], selector_cache={"path": str(cache_file)})
+        actions = [{"type": "click", "selector": ["#old", "#new"]}]
+        for i in range(3):
+            manager.add_task(f"t{i}", "any", actions)
+        with mock.patch("task_queue_manager.EnhancedWebAutomation", CachingAutomation):
+            manager.run_tasks(timeout=10)
+
+        self.assertEqual(manager.result_counters.completed, 3)
+        self.assertEqual(CachingAutomation.tried_first, ["#old", "#new", "#new"])
+        stats = manager.get_status_report()["selector_cache"]
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (2, 1, 1))
+        # 运行结束时保存缓存文件
+        self.assertTrue(cache_file.exists())
+
+class BatchRecordingAutomation(FakeAutomation):
+    """记录每个任务的动作序列是否按批执行"""
+    batches = {}
+
+    def execute_action_sequence(self, actions, batch=False, **kwargs):
+        self.batches[actions[0]["text"]] = batch
+        return [{"success": True, "batched": batch} for _ in actions]
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestBatchActions(unittest.TestCase):
+    def setUp(self):
+        BatchRecordingAutomation.batches = {}
+
+    def run_tasks(self, **config):
+        manager = make_manager(chrome_instances=[11, 12], **config)
+        manager.add_task("default", "any", [{"type": "input", "selector": "#q", "text": "default"}])
+        manager.add_task("off", "any", [{"type": "input", "selector": "#q", "text": "off"}], batch_actions=False)
+        manager.add_task("on", "any", [{"type": "input", "selector": "#q", "text": "on"}], batch_actions=True)
+        with mock.patch("task_queue_manager.EnhancedWebAutomation", BatchRecordingAutomation):
+            manager.run_tasks(timeout=10)
+        return manager
+
+    def test_task_option_overrides_config(self):
+        manager = self.run_tasks(batch_actions=True)
+        self.assertEqual(BatchRecordingAutomation.batches, {"default": True, "off": False, "on": True})
+        self.assertEqual(manager.result_counters.completed, 3)
+
+    def test_disabled_by_default(self):
+        self.run_tasks()
+        self.assertEqual(BatchRecordingAutomation.batches, {"default": False, "off": False, "on": True})
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestTemplateTasks(unittest.TestCase):
+    def test_expanded_tasks_run_on_configured_instances(self):
+        manager = make_manager(chrome_instances=[11, 12])
+        executed = []
+        manager.execute_task = lambda task: executed.append(task) or completed(task)
+        manager.add_template_tasks("google_search", {"search_term": ["python", "selenium", "asyncio"]},
+                                   templates_file=str(CONFIG_FILE), task_id_format="search_{search_term}")
+        manager.run_tasks(timeout=10)
+
+        self.assertEqual(sorted(task["task_id"] for task in executed),
+                         ["search_asyncio", "search_python", "search_selenium"])
+        self.assertEqual({task["assigned_chrome"] for task in executed}, {11, 12})
+        self.assertEqual({task["metadata"]["template"] for task in executed}, {"google_search"})
+        self.assertEqual(manager.result_counters.completed, 3)
+
+    def test_any_instance_requires_chrome_instances(self):
+        manager = make_manager()
+        with self.assertRaises(ValueError):
+            manager.add_template_tasks("github_visit", templates_file=str(CONFIG_FILE))
+        self.assertEqual(manager.task_sources, [])
+
+        manager.execute_task = completed
+        manager.add_template_tasks("github_visit", templates_file=str(CONFIG_FILE), chrome_num=11)
+        manager.add_template_tasks("github_visit", {"chrome_num": [12, 13]}, templates_file=str(CONFIG_FILE),
+                                   task_id_format="visit_{chrome_num}")
+        manager.run_tasks(timeout=10)
+        self.assertEqual(sorted(r["chrome_num"] for r in manager.completed_tasks), [11, 12, 13])
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestJournalRecovery(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.journal_file = str(Path(self.directory) / "journal.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_restart_skips_finished_and_resumes_pending(self):
+        first = make_manager(chrome_instances=[11], journal_file=self.journal_file)
+        first.execute_task = completed
+        first.add_task("done", "any", ACTIONS)
+        first.run_tasks(timeout=10)
+        # 模拟中断：已登记但未执行
+        first.add_task("queued", "any", ACTIONS)
+        first.journal.close()
+
+        second = make_manager(chrome_instances=[11], journal_file=self.journal_file)
+        executed = []
+        second.execute_task = lambda task: executed.append(task["task_id"]) or completed(task)
+        second.add_task("done", "any", ACTIONS)
+        second.add_task("queued", "any", ACTIONS)
+        second.run_tasks(timeout=10)
+        second.journal.close()
+
+        self.assertEqual(executed, ["queued"])
+        self.assertEqual(second.journal.known_task_ids, {"done", "queued"})
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestTaskTimeout(unittest.TestCase):
+    def test_lane_stays_busy_until_timed_out_thread_exits(self):
+        manager = make_manager(chrome_instances=[11], retry_failed_tasks=True, max_retries=1,
+                               retry_policy={"base_delay": 0, "jitter": 0})
+        unblock = threading.Event()
+        events = []
+
+        def execute_task(task):
+            # 阻塞的任务：看门狗超时后线程仍在运行，直到unblock
+            manager.watchdog.start_task(task["task_id"], 0.1)
+            events.append(("start", task["task_id"]))
+            if task["task_id"] == "hang":
+                unblock.wait(5)
+            events.append(("end", task["task_id"]))
+            manager.watchdog.finish_task(task["task_id"])
+            return completed(task)
+
+        manager.execute_task = execute_task
+        manager.add_task("hang", 11, ACTIONS)
+        threading.Timer(0.5, unblock.set).start()
+        manager.run_tasks(timeout=10)
+
+        self.assertEqual(events, [("start", "hang"), ("end", "hang"),
+                                  ("start", "hang_retry_1"), ("end", "hang_retry_1")])
+        self.assertEqual(manager.result_counters.completed, 1)
+        self.assertEqual(manager.stuck_tasks, {})
+        self.assertFalse(manager.task_queue.lane_status()[11]["busy"])
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestRunSharded(unittest.TestCase):
+    def run_sharded(self, manager, num_processes):
+        runners = []
+        with mock.patch("sharded_executor.ShardedTaskRunner",
+                        lambda *args, **kwargs: runners.append(InlineRunner(*args, **kwargs)) or runners[-1]):
+            manager.run_sharded(num_processes)
+        return runners[0]
+
+    def test_results_are_finalized_and_release_dependents(self):
+        manager = make_manager(chrome_instances=[11, 12])
+        finalized = []
+        manager.add_result_listener(lambda state, result: finalized.append((result["task_id"], state)))
+        manager.add_batch_tasks([
+            {"task_id": "child", "chrome_num": 11, "actions": ACTIONS, "depends_on": "parent"},
+            {"task_id": "parent", "chrome_num": 11, "actions": ACTIONS},
+            {"task_id": "loop", "chrome_num": 11, "actions": ACTIONS, "depends_on": "loop"},
+            {"task_id": "broken", "chrome_num": 12, "actions": ACTIONS, "metadata": {"fail": True}},
+            {"task_id": "after_broken", "chrome_num": 12, "actions": ACTIONS, "depends_on": "broken"}
+        ])
+
+        runner = self.run_sharded(manager, 4)
+
+        self.assertEqual(runner.num_shards, 2)
+        self.assertEqual(runner.submitted, ["parent", "broken", "child"])
+        self.assertEqual(sorted(finalized), [("after_broken", "skipped"), ("broken", "failed"),
+                                             ("child", "completed"), ("parent", "completed")])
+        self.assertEqual(len(manager.dependency_graph), 0)
+
+    def test_sources_require_chrome_instances(self):
+        manager = make_manager()
+        manager.add_batch_tasks([{"task_id": "a", "chrome_num": 11, "actions": ACTIONS}])
+        with self.assertRaises(ValueError):
+            self.run_sharded(manager, 4)
+
+    def test_shards_from_queued_task_instances(self):
+        manager = make_manager()
+        for i, chrome_num in enumerate([11, 12, 13]):
+            manager.add_task(f"t{i}", chrome_num, ACTIONS)
+        runner = self.run_sharded(manager, 4)
+        self.assertEqual(runner.num_shards, 3)
+        self.assertEqual(manager.result_counters.completed, 3)
+
+if __name__ == "__main__":
+    unittest.main()
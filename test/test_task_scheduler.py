@@ -0,0 +1,138 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from task_scheduler import PriorityTaskScheduler, DelayedTaskQueue
+from execution_lanes import LaneScheduler
+
+def make_task(task_id, priority=1, category=None, chrome_num=11):
+    return {
+        "task_id": task_id,
+        "chrome_num": chrome_num,
+        "priority": priority,
+        "metadata": {"category": category} if category else {}
+    }
+
+class TestPriorityTaskScheduler(unittest.TestCase):
+    def test_priority_order_is_stable(self):
+        scheduler = PriorityTaskScheduler()
+        for task_id, priority in [("a", 2), ("b", 1), ("c", 2), ("d", 1)]:
+            scheduler.push(make_task(task_id, priority))
+        order = [scheduler.pop()["task_id"] for _ in range(4)]
+        self.assertEqual(order, ["b", "d", "a", "c"])
+        self.assertIsNone(scheduler.pop())
+
+    def test_categories_share_capacity(self):
+        scheduler = PriorityTaskScheduler(category_weights={"search": 2})
+        for i in range(6):
+            scheduler.push(make_task(f"visit_{i}", 1, "visit"))
+        for i in range(6):
+            scheduler.push(make_task(f"search_{i}", 1, "search"))
+        first_six = [scheduler.pop()["task_id"].split("_")[0] for _ in range(6)]
+        self.assertEqual(first_six.count("search"), 4)
+        self.assertEqual(first_six.count("visit"), 2)
+
+    def test_aging_promotes_waiting_tasks(self):
+        now = [0.0]
+        scheduler = PriorityTaskScheduler(aging_seconds=1, clock=lambda: now[0])
+        scheduler.push(make_task("old", 5))
+        now[0] = 10.0
+        scheduler.push(make_task("new", 1))
+        self.assertEqual(scheduler.pop()["task_id"], "old")
+        self.assertEqual(scheduler.pop()["task_id"], "new")
+
+class TestDelayedTaskQueue(unittest.TestCase):
+    def test_tasks_released_when_due(self):
+        now = [0.0]
+        delayed = DelayedTaskQueue(clock=lambda: now[0])
+        delayed.push(make_task("late"), 10)
+        delayed.push(make_task("soon"), 2)
+        self.assertEqual(delayed.pop_due(), [])
+        self.assertEqual(delayed.next_due_in(), 2)
+        now[0] = 5.0
+        self.assertEqual([t["task_id"] for t in delayed.pop_due()], ["soon"])
+        self.assertEqual(len(delayed), 1)
+
+class TestLaneScheduler(unittest.TestCase):
+    def test_lane_runs_one_task_at_a_time(self):
+        lanes = LaneScheduler()
+        lanes.push(make_task("a"))
+        lanes.push(make_task("b"))
+        first = lanes.pop()
+        self.assertEqual(first["assigned_chrome"], 11)
+        self.assertIsNone(lanes.pop())
+        lanes.release(first)
+        self.assertEqual(lanes.pop()["task_id"], "b")
+
+    def test_idle_lane_steals_any_instance_tasks(self):
+        lanes = LaneScheduler(chrome_instances=[11, 12])
+        for i in range(4):
+            lanes.push(make_task(f"any_{i}", chrome_num="any"))
+        lanes.lanes[11].shared.push(lanes.lanes[12].shared.pop())
+        lanes.lanes[11].shared.push(lanes.lanes[12].shared.pop())
+        assigned = {lanes.pop()["assigned_chrome"], lanes.pop()["assigned_chrome"]}
+        self.assertEqual(assigned, {11, 12})
+        self.assertEqual(lanes.lanes[12].stolen_count, 1)
+
+    def test_pinned_tasks_are_not_stolen(self):
+        lanes = LaneScheduler(chrome_instances=[11, 12])
+        lanes.push(make_task("a", chrome_num=11))
+        lanes.push(make_task("b", chrome_num=11))
+        self.assertEqual(lanes.pop()["assigned_chrome"], 11)
+        self.assertIsNone(lanes.pop())
+
+    def test_priority_respected_across_lanes(self):
+        lanes = LaneScheduler(chrome_instances=[11, 12, 13])
+        lanes.push(make_task("bulk11_0", priority=10, chrome_num=11))
+        lanes.push(make_task("bulk11_1", priority=10, chrome_num=11))
+        lanes.push(make_task("urgent12", priority=0, chrome_num=12))
+        lanes.push(make_task("bulk13", priority=10, chrome_num=13))
+
+        order = []
+        for _ in range(4):
+            task = lanes.pop()
+            order.append(task["task_id"])
+            lanes.release(task)
+        self.assertEqual(order[0], "urgent12")
+        self.assertEqual(sorted(order[1:]), ["bulk11_0", "bulk11_1", "bulk13"])
+
+    def test_equal_priority_rotates_lanes(self):
+        lanes = LaneScheduler(chrome_instances=[11, 12])
+        for i in range(2):
+            lanes.push(make_task(f"a{i}", chrome_num=11))
+            lanes.push(make_task(f"b{i}", chrome_num=12))
+
+        assigned = []
+        for _ in range(4):
+            task = lanes.pop()
+            assigned.append(task["assigned_chrome"])
+            lanes.release(task)
+        self.assertEqual(assigned, [11, 12, 11, 12])
+
+    def test_high_priority_task_stolen_from_busy_lane(self):
+        lanes = LaneScheduler(chrome_instances=[11, 12])
+        lanes.push(make_task("pinned12", priority=5, chrome_num=12))
+        busy = lanes.pop()
+        self.assertEqual(busy["assigned_chrome"], 12)
+        lanes.lanes[12].shared.push(make_task("urgent", priority=0, chrome_num="any"))
+        lanes.push(make_task("low11", priority=5, chrome_num=11))
+
+        task = lanes.pop()
+        self.assertEqual((task["task_id"], task["assigned_chrome"]), ("urgent", 11))
+        self.assertEqual(lanes.lanes[11].stolen_count, 1)
+
+    def test_any_tasks_unroutable_without_lanes(self):
+        lanes = LaneScheduler()
+        lanes.push(make_task("a", chrome_num="any"))
+        self.assertIsNone(lanes.pop())
+        self.assertEqual([t["task_id"] for t in lanes.take_unroutable()], ["a"])
+        self.assertTrue(lanes.empty())
+
+        lanes = LaneScheduler(chrome_instances=[11])
+        lanes.push(make_task("b", chrome_num="any"))
+        self.assertEqual(lanes.take_unroutable(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from task_templates import TemplateLibrary, TemplateError
+
+CONFIG_FILE = Path(__file__).resolve().parent.parent / "chrome" / "automation_config.json"
+
+class TestTemplateLibrary(unittest.TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.library = TemplateLibrary(str(CONFIG_FILE))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_csv_column_times_instances(self):
+        keywords = self.directory / "keywords.csv"
+        keywords.write_text("keyword\npython\nselenium\nasyncio\n", encoding="utf-8")
+        tasks = list(self.library.expand(
+            "google_search",
+            {"search_term": {"csv": str(keywords), "column": "keyword"}, "chrome_num": [11, 12]},
+            task_id_format="search_{search_term}_{chrome_num}"
+        ))
+        self.assertEqual(len(tasks), 6)
+        self.assertEqual(tasks[1]["task_id"], "search_python_12")
+        self.assertEqual(tasks[1]["chrome_num"], 12)
+        self.assertEqual(tasks[1]["actions"][1]["text"], "python")
+        # 不含占位符的动作直接复用
+        self.assertIs(tasks[0]["actions"][0], tasks[5]["actions"][0])
+
+    def test_jsonl_rows_fill_multiple_placeholders(self):
+        accounts = self.directory / "accounts.jsonl"
+        accounts.write_text('{"email": "a@x.com", "password": "p1"}\n{"email": "b@x.com", "password": "p2"}\n',
+                            encoding="utf-8")
+        tasks = list(self.library.expand("google_login", {"account": {"jsonl": str(accounts)}}))
+        self.assertEqual([t["actions"][1]["text"] for t in tasks], ["a@x.com", "b@x.com"])
+        self.assertEqual(tasks[1]["actions"][4]["text"], "p2")
+        self.assertEqual(tasks[0]["chrome_num"], "any")
+
+    def test_missing_parameter(self):
+        with self.assertRaises(TemplateError):
+            self.library.expand("google_search", {"keyword": ["python"]})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+from task_watchdog import TaskWatchdog
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestTaskWatchdog(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.timed_out = []
+        self.watchdog = TaskWatchdog(on_timeout=self.timed_out.append, clock=self.clock)
+
+    def tearDown(self):
+        self.watchdog.stop()
+
+    def test_task_times_out_at_deadline(self):
+        aborted = []
+        self.watchdog.start_task("a", 10)
+        self.watchdog.register_abort("a", lambda: aborted.append("a"))
+
+        self.clock.now += 5
+        self.assertEqual(self.watchdog.check(), [])
+        self.assertFalse(self.watchdog.is_timed_out("a"))
+
+        self.clock.now += 6
+        self.assertEqual(self.watchdog.check(), ["a"])
+        self.assertEqual(aborted, ["a"])
+        self.assertEqual(self.timed_out, ["a"])
+        self.assertTrue(self.watchdog.finish_task("a"))
+
+    def test_finished_task_does_not_time_out(self):
+        self.watchdog.start_task("a", 10)
+        self.assertFalse(self.watchdog.finish_task("a"))
+        self.clock.now += 20
+        self.assertEqual(self.watchdog.check(), [])
+
+    def test_restarted_task_uses_new_deadline(self):
+        self.watchdog.start_task("a", 10)
+        self.clock.now += 8
+        self.watchdog.start_task("a", 10)
+        self.clock.now += 5
+        self.assertEqual(self.watchdog.check(), [])
+        self.clock.now += 6
+        self.assertEqual(self.watchdog.check(), ["a"])
+
+    def test_abort_registered_after_timeout_runs_immediately(self):
+        aborted = []
+        self.watchdog.start_task("a", 1)
+        self.clock.now += 2
+        self.watchdog.check()
+        self.watchdog.register_abort("a", lambda: aborted.append("a"))
+        self.assertEqual(aborted, ["a"])
+
+if __name__ == "__main__":
+    unittest.main()
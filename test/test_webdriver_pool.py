@@ -0,0 +1,111 @@
+import sys
+import time
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chrome"))
+
+try:
+    import selenium
+    from webdriver_pool import WebDriverSessionPool
+except ImportError:
+    selenium = None
+
+PORT = 10011
+
+class FakeDriver:
+    def __init__(self, debug_port):
+        self.debug_port = debug_port
+        self.window_handles = ["tab-1"]
+        self.current_window_handle = "tab-1"
+        self.quit_count = 0
+
+    def quit(self):
+        self.quit_count += 1
+
+class BrokenDriver(FakeDriver):
+    @property
+    def window_handles(self):
+        raise RuntimeError("chrome not reachable")
+
+    @window_handles.setter
+    def window_handles(self, value):
+        pass
+
+@unittest.skipIf(selenium is None, "未安装selenium")
+class TestWebDriverSessionPool(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+        self.factory_class = FakeDriver
+
+    def factory(self, debug_port):
+        driver = self.factory_class(debug_port)
+        self.created.append(driver)
+        return driver
+
+    def make_pool(self, **settings):
+        return WebDriverSessionPool(driver_factory=self.factory, **settings)
+
+    def test_checkin_then_checkout_reuses_session(self):
+        pool = self.make_pool()
+        driver = pool.checkout(PORT)
+        pool.checkin(driver)
+        self.assertIs(pool.checkout(PORT), driver)
+        stats = pool.get_stats()
+        self.assertEqual((stats["created"], stats["reused"], stats["checked_out"]), (1, 1, 1))
+
+    def test_unhealthy_checkin_quits_session(self):
+        pool = self.make_pool()
+        driver = pool.checkout(PORT)
+        pool.checkin(driver, healthy=False)
+        self.assertEqual(driver.quit_count, 1)
+        self.assertIsNot(pool.checkout(PORT), driver)
+        self.assertEqual(pool.get_stats()["evicted"], 1)
+
+    def test_unreachable_idle_session_is_replaced(self):
+        pool = self.make_pool()
+        self.factory_class = BrokenDriver
+        broken = pool.checkout(PORT)
+        pool.checkin(broken)
+        self.factory_class = FakeDriver
+        driver = pool.checkout(PORT)
+        self.assertIsNot(driver, broken)
+        self.assertEqual(broken.quit_count, 1)
+        self.assertEqual(pool.get_stats()["unhealthy"], 1)
+
+    def test_discard_frees_slot(self):
+        pool = self.make_pool()
+        driver = pool.checkout(PORT)
+        pool.discard(driver, quit_driver=False)
+        self.assertEqual(driver.quit_count, 0)
+        self.assertEqual(pool.get_stats()["ports"], {})
+        self.assertIsNot(pool.checkout(PORT, timeout=0), driver)
+
+    def test_invalidate_quits_idle_sessions(self):
+        pool = self.make_pool()
+        driver = pool.checkout(PORT)
+        pool.checkin(driver)
+        pool.invalidate(PORT)
+        self.assertEqual(driver.quit_count, 1)
+        self.assertEqual(pool.get_stats()["idle"], 0)
+
+    def test_checkout_times_out_when_port_busy(self):
+        pool = self.make_pool(max_sessions_per_port=1)
+        driver = pool.checkout(PORT)
+        with self.assertRaises(TimeoutError):
+            pool.checkout(PORT, timeout=0.05)
+
+        threading.Timer(0.05, pool.checkin, args=(driver,)).start()
+        self.assertIs(pool.checkout(PORT, timeout=5), driver)
+
+    def test_expired_session_recreated_on_checkin(self):
+        pool = self.make_pool(max_age_seconds=0.01)
+        driver = pool.checkout(PORT)
+        time.sleep(0.02)
+        pool.checkin(driver)
+        self.assertEqual(driver.quit_count, 1)
+        self.assertEqual(pool.get_stats()["idle"], 0)
+
+if __name__ == "__main__":
+    unittest.main()